@@ -157,11 +157,21 @@ PLUGINS_CONFIG = {
         "per_feature_bar_width": float(os.environ.get("PER_FEATURE_BAR_WIDTH", 0.15)),
         "per_feature_width": int(os.environ.get("PER_FEATURE_WIDTH", 13)),
         "per_feature_height": int(os.environ.get("PER_FEATURE_HEIGHT", 4)),
+        "chart_format": os.environ.get("CHART_FORMAT", "png"),
         "enable_backup": is_truthy(os.environ.get("ENABLE_BACKUP", True)),
         "enable_compliance": is_truthy(os.environ.get("ENABLE_COMPLIANCE", True)),
         "enable_intended": is_truthy(os.environ.get("ENABLE_INTENDED", True)),
         "enable_sotagg": is_truthy(os.environ.get("ENABLE_SOTAGG", True)),
         "sot_agg_transposer": os.environ.get("SOT_AGG_TRANSPOSER"),
+        "compliance_process_workers": int(os.environ.get("COMPLIANCE_PROCESS_WORKERS", 0)),
+        "sot_agg_batch_size": int(os.environ.get("SOT_AGG_BATCH_SIZE", 0)),
+        "compliance_diff_max_seconds": int(os.environ.get("COMPLIANCE_DIFF_MAX_SECONDS", 60)),
+        "compliance_diff_max_lines": int(os.environ.get("COMPLIANCE_DIFF_MAX_LINES", 100000)),
+        "backup_engine": os.environ.get("BACKUP_ENGINE", "nornir"),
+        "backup_async_known_hosts": os.environ.get("BACKUP_ASYNC_KNOWN_HOSTS"),
+        "git_fetch_interval": int(os.environ.get("GIT_FETCH_INTERVAL", 0)),
+        "compliance_read_from_git": is_truthy(os.environ.get("COMPLIANCE_READ_FROM_GIT", False)),
+        "config_blob_compression": os.environ.get("CONFIG_BLOB_COMPRESSION", "zlib"),
         # The platform_slug_map maps an arbitrary platform slug to its corresponding parser.
         # Use this if the platform slug names in your Nautobot instance don't correspond exactly
         # to the Nornir driver names ("arista_eos", "cisco_ios", etc.).
@@ -23,8 +23,25 @@ class GoldenConfig(PluginConfig):
         "per_feature_bar_width": 0.3,
         "per_feature_width": 13,
         "per_feature_height": 4,
+        "chart_format": "png",
         "get_custom_compliance": None,
+        "compliance_process_workers": 0,
+        "sot_agg_batch_size": 0,
+        "compliance_diff_max_seconds": 60,
+        "compliance_diff_max_lines": 100000,
+        "backup_engine": "nornir",
+        "backup_async_limits": {"global": 500, "site": 50, "platform": 200},
+        "backup_async_timeout": 60,
+        "backup_async_known_hosts": None,
+        "git_fetch_interval": 0,
+        "compliance_read_from_git": False,
+        "config_blob_compression": "zlib",
     }
 
+    def ready(self):
+        """Connect the signal handlers of the plugin."""
+        super().ready()
+        from nautobot_golden_config import signals  # pylint: disable=import-outside-toplevel,unused-import
+
 
 config = GoldenConfig  # pylint:disable=invalid-name
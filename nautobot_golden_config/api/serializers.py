@@ -43,23 +43,33 @@ class ComplianceRuleSerializer(TaggedObjectSerializer, CustomFieldModelSerialize
 class ConfigComplianceSerializer(TaggedObjectSerializer, CustomFieldModelSerializer):
     """Serializer for ConfigCompliance object."""
 
+    actual = serializers.JSONField(required=False, help_text="Actual Configuration for feature")
+    intended = serializers.JSONField(required=False, help_text="Intended Configuration for feature")
+
     class Meta:
         """Set Meta Data for ConfigCompliance, will serialize fields."""
 
         model = models.ConfigCompliance
-        fields = "__all__"
+        exclude = ["actual_blob", "intended_blob"]
 
 
 class GoldenConfigSerializer(TaggedObjectSerializer, CustomFieldModelSerializer):
     """Serializer for GoldenConfig object."""
 
     url = serializers.HyperlinkedIdentityField(view_name="plugins-api:nautobot_golden_config-api:goldenconfig-detail")
+    backup_config = serializers.CharField(required=False, allow_blank=True, help_text="Full backup config for device.")
+    intended_config = serializers.CharField(
+        required=False, allow_blank=True, help_text="Intended config for the device."
+    )
+    compliance_config = serializers.CharField(
+        required=False, allow_blank=True, help_text="Full config diff for device."
+    )
 
     class Meta:
         """Set Meta Data for GoldenConfig, will serialize all fields."""
 
         model = models.GoldenConfig
-        fields = "__all__"
+        exclude = ["backup_config_blob", "intended_config_blob", "compliance_config_blob"]
 
 
 class GoldenConfigSettingSerializer(TaggedObjectSerializer, CustomFieldModelSerializer):
@@ -98,3 +108,22 @@ class ConfigReplaceSerializer(TaggedObjectSerializer, CustomFieldModelSerializer
 
         model = models.ConfigReplace
         fields = "__all__"
+
+
+class ConfigComplianceHistorySerializer(serializers.ModelSerializer):
+    """Serializer for ConfigComplianceHistory object."""
+
+    class Meta:
+        """Set Meta Data for ConfigComplianceHistory, will serialize all fields."""
+
+        model = models.ConfigComplianceHistory
+        fields = "__all__"
+
+
+class ComplianceTrendSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Serializer for a point of a compliance trend."""
+
+    timestamp = serializers.DateTimeField()
+    count = serializers.IntegerField()
+    compliant = serializers.IntegerField()
+    non_compliant = serializers.IntegerField()
@@ -10,6 +10,7 @@ router.APIRootView = views.GoldenConfigRootView
 router.register("compliance-feature", views.ComplianceFeatureViewSet)
 router.register("compliance-rule", views.ComplianceRuleViewSet)
 router.register("config-compliance", views.ConfigComplianceViewSet)
+router.register("config-compliance-history", views.ConfigComplianceHistoryViewSet)
 router.register("golden-config", views.GoldenConfigViewSet)
 router.register("golden-config-settings", views.GoldenConfigSettingViewSet)
 router.register("config-remove", views.ConfigRemoveViewSet)
@@ -1,16 +1,20 @@
 """View for Golden Config APIs."""
 import json
 
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.routers import APIRootView
 from rest_framework.permissions import AllowAny
+from nautobot.core.api.views import ReadOnlyModelViewSet
 from nautobot.extras.api.views import CustomFieldModelViewSet
 from nautobot.dcim.models import Device
 
 from nautobot_golden_config.api import serializers
 from nautobot_golden_config import models
 from nautobot_golden_config import filters
+from nautobot_golden_config.utilities.compliance_history import get_compliance_trend
 from nautobot_golden_config.utilities.graphql import graph_ql_query
 
 
@@ -55,15 +59,44 @@ class ComplianceFeatureViewSet(CustomFieldModelViewSet):  # pylint:disable=too-m
 class ConfigComplianceViewSet(CustomFieldModelViewSet):  # pylint:disable=too-many-ancestors
     """API viewset for interacting with ConfigCompliance objects."""
 
-    queryset = models.ConfigCompliance.objects.all()
+    queryset = models.ConfigCompliance.objects.select_related("actual_blob", "intended_blob")
     serializer_class = serializers.ConfigComplianceSerializer
     filterset_class = filters.ConfigComplianceFilterSet
 
 
+class ConfigComplianceHistoryViewSet(ReadOnlyModelViewSet):  # pylint:disable=too-many-ancestors
+    """API viewset for reading the ConfigComplianceHistory transitions, and the compliance trends built from them."""
+
+    queryset = models.ConfigComplianceHistory.objects.all()
+    serializer_class = serializers.ConfigComplianceHistorySerializer
+    filterset_class = filters.ConfigComplianceHistoryFilterSet
+
+    @action(detail=False, methods=["get"])
+    def trend(self, request):
+        """Return the number of results, and of compliant results, after each compliance job that changed any.
+
+        The filters select the transitions, e.g. of a feature or of a site, and `start` and `end` the time span, as the
+        counts are aggregated from the first transition of the results.
+        """
+        filterset = self.filterset_class(request.GET, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        params = request.GET.copy()
+        for name in ("start", "end"):
+            params.pop(name, None)
+        queryset = self.filterset_class(params, queryset=self.get_queryset(), request=request).qs
+        series = get_compliance_trend(
+            queryset, filterset.form.cleaned_data.get("start"), filterset.form.cleaned_data.get("end")
+        )
+        return Response(serializers.ComplianceTrendSerializer(series, many=True).data)
+
+
 class GoldenConfigViewSet(CustomFieldModelViewSet):  # pylint:disable=too-many-ancestors
     """API viewset for interacting with GoldenConfig objects."""
 
-    queryset = models.GoldenConfig.objects.all()
+    queryset = models.GoldenConfig.objects.select_related(
+        "backup_config_blob", "intended_config_blob", "compliance_config_blob"
+    )
     serializer_class = serializers.GoldenConfigSerializer
     filterset_class = filters.GoldenConfigFilterSet
 
@@ -8,7 +8,7 @@ from nautobot.dcim.models import Device, Platform, Region, Site, DeviceRole, Dev
 from nautobot.extras.models import Status
 from nautobot.extras.filters import StatusFilter, CustomFieldModelFilterSet
 from nautobot.tenancy.models import Tenant, TenantGroup
-from nautobot.utilities.filters import TreeNodeMultipleChoiceFilter
+from nautobot.utilities.filters import BaseFilterSet, TreeNodeMultipleChoiceFilter
 
 from nautobot_golden_config import models
 
@@ -283,3 +283,46 @@ class ConfigReplaceFilterSet(GenericPlatformFilterSet):
 
         model = models.ConfigReplace
         fields = ["id", "name"]
+
+
+class ConfigComplianceHistoryFilterSet(BaseFilterSet):
+    """Filter capabilities for ConfigComplianceHistory instances, on the site and feature as of each transition."""
+
+    device_id = django_filters.ModelMultipleChoiceFilter(
+        queryset=Device.objects.all(),
+        label="Device ID",
+    )
+    device = django_filters.ModelMultipleChoiceFilter(
+        field_name="device__name",
+        queryset=Device.objects.all(),
+        to_field_name="name",
+        label="Device Name",
+    )
+    site_id = django_filters.ModelMultipleChoiceFilter(
+        queryset=Site.objects.all(),
+        label="Site (ID)",
+    )
+    site = django_filters.ModelMultipleChoiceFilter(
+        field_name="site__slug",
+        queryset=Site.objects.all(),
+        to_field_name="slug",
+        label="Site name (slug)",
+    )
+    feature_id = django_filters.ModelMultipleChoiceFilter(
+        queryset=models.ComplianceFeature.objects.all(),
+        label="Feature (ID)",
+    )
+    feature = django_filters.ModelMultipleChoiceFilter(
+        field_name="feature__slug",
+        queryset=models.ComplianceFeature.objects.all(),
+        to_field_name="slug",
+        label="Feature (slug)",
+    )
+    start = django_filters.IsoDateTimeFilter(field_name="timestamp", lookup_expr="gte", label="Since")
+    end = django_filters.IsoDateTimeFilter(field_name="timestamp", lookup_expr="lte", label="Until")
+
+    class Meta:
+        """Meta class attributes for ConfigComplianceHistoryFilterSet."""
+
+        model = models.ConfigComplianceHistory
+        fields = ["id", "rule", "compliance_int"]
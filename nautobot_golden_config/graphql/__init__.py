@@ -0,0 +1 @@
+"""GraphQL types of the Golden Config models."""
@@ -0,0 +1,39 @@
+"""GraphQL types of the models whose configurations are stored in blobs, with the same fields as before."""
+
+import graphene
+from graphene.types.json import JSONString
+from graphene_django import DjangoObjectType
+
+from nautobot_golden_config import filters, models
+
+
+class ConfigComplianceType(DjangoObjectType):
+    """GraphQL type of the ConfigCompliance model."""
+
+    actual = JSONString(required=True, description="Actual Configuration for feature")
+    intended = JSONString(required=True, description="Intended Configuration for feature")
+
+    class Meta:
+        """Meta information for ConfigComplianceType."""
+
+        model = models.ConfigCompliance
+        filterset_class = filters.ConfigComplianceFilterSet
+        exclude = ["actual_blob", "intended_blob"]
+
+
+class GoldenConfigType(DjangoObjectType):
+    """GraphQL type of the GoldenConfig model."""
+
+    backup_config = graphene.String(required=True, description="Full backup config for device.")
+    intended_config = graphene.String(required=True, description="Intended config for the device.")
+    compliance_config = graphene.String(required=True, description="Full config diff for device.")
+
+    class Meta:
+        """Meta information for GoldenConfigType."""
+
+        model = models.GoldenConfig
+        filterset_class = filters.GoldenConfigFilterSet
+        exclude = ["backup_config_blob", "intended_config_blob", "compliance_config_blob"]
+
+
+graphql_types = [ConfigComplianceType, GoldenConfigType]
@@ -3,9 +3,8 @@ import logging
 
 from datetime import datetime
 
-from nautobot.extras.jobs import Job, MultiObjectVar, ObjectVar, BooleanVar
+from nautobot.extras.jobs import Job, MultiObjectVar, ObjectVar, BooleanVar, StringVar, TextVar
 from nautobot.extras.models import Tag
-from nautobot.extras.datasources.git import ensure_git_repository
 from nautobot.dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site, Platform, Region, Rack, RackGroup
 from nautobot.tenancy.models import Tenant, TenantGroup
 
@@ -14,7 +13,7 @@ from nautobot_golden_config.nornir_plays.config_intended import config_intended
 from nautobot_golden_config.nornir_plays.config_backup import config_backup
 from nautobot_golden_config.nornir_plays.config_compliance import config_compliance
 from nautobot_golden_config.utilities.constant import ENABLE_BACKUP, ENABLE_COMPLIANCE, ENABLE_INTENDED
-from nautobot_golden_config.utilities.git import GitRepo
+from nautobot_golden_config.utilities.git import push_repos, repository_manager
 
 LOGGER = logging.getLogger(__name__)
 
@@ -22,8 +21,11 @@ LOGGER = logging.getLogger(__name__)
 name = "Golden Configuration"  # pylint: disable=invalid-name
 
 
-def git_wrapper(obj, repository_record, git_type):
-    """Small wrapper to pull latest branch, and return a GitRepo plugin specific object."""
+def git_wrapper(obj, repository_record, git_type, commit=False):
+    """Small wrapper to pull latest branch, and return a GitRepo plugin specific object, shared by the jobs of a worker.
+
+    The repositories the job commits to are always pulled, so the commits can be pushed.
+    """
     if not repository_record:
         obj.log_failure(
             obj,
@@ -31,11 +33,31 @@ def git_wrapper(obj, repository_record, git_type):
         )
         raise  # pylint: disable=misplaced-bare-raise
 
-    ensure_git_repository(repository_record, obj.job_result)
-    git_repo = GitRepo(repository_record)
+    git_repo = repository_manager.ensure(repository_record, obj.job_result, commit)
     return git_repo
 
 
+def get_repository_changed_files(repository_commits):
+    """Return the files changed in the commit ranges provided as `<repository slug> <previous commit> [<new commit>]` lines."""
+    golden_settings = GoldenConfigSetting.objects.first()
+    repositories = {
+        repo.slug: repo
+        for repo in list(golden_settings.backup_repository.all()) + list(golden_settings.intended_repository.all())
+    }
+    changed_files = []
+    for line in repository_commits.splitlines():
+        if not line.strip():
+            continue
+        slug, *commits = line.split()
+        if slug not in repositories or len(commits) not in [1, 2] or any(commit.startswith("-") for commit in commits):
+            raise ValueError(
+                f"Invalid repository commits line `{line}`, expected `<repository slug> <previous commit> [<new commit>]` "
+                "with the slug of a backup or intended repository."
+            )
+        changed_files.extend(repository_manager.get(repositories[slug]).changed_files(*commits))
+    return changed_files
+
+
 def commit_check(method):
     """Decorator to check if a "dry-run" attempt was made."""
 
@@ -84,6 +106,17 @@ class ComplianceJob(Job, FormEntry):
     device = FormEntry.device
     tag = FormEntry.tag
     debug = FormEntry.debug
+    force = BooleanVar(description="Run compliance even for devices whose backup, intended and rules are unchanged")
+    repository_commits = TextVar(
+        required=False,
+        description="Only run compliance for the devices whose files changed in the given commits, one "
+        "`<repository slug> <previous commit> [<new commit>]` per line.",
+    )
+    revision = StringVar(
+        required=False,
+        description="Read the backup and intended configurations from this git revision, e.g. a tag or `HEAD~1`, "
+        "rather than from the working trees.",
+    )
 
     class Meta:
         """Meta object boilerplate for compliance."""
@@ -96,6 +129,8 @@ class ComplianceJob(Job, FormEntry):
         """Run config compliance report script."""
         # pylint: disable-msg=too-many-locals
         # pylint: disable=unused-argument
+        if data.get("repository_commits"):
+            data["changed_files"] = get_repository_changed_files(data["repository_commits"])
         config_compliance(self, data)
 
 
@@ -133,16 +168,23 @@ class IntendedJob(Job, FormEntry):
         LOGGER.debug("Pull Intended config repo.")
         golden_config = GoldenConfigSetting.objects.first()
         # Instantiate a GitRepo object for each GitRepository in GoldenConfigSettings.
-        intended_repos = [git_wrapper(self, repo, "intended") for repo in golden_config.intended_repository.all()]
+        intended_repos = [
+            git_wrapper(self, repo, "intended", commit=True) for repo in golden_config.intended_repository.all()
+        ]
+        previous_commits = [intended_repo.head for intended_repo in intended_repos]
 
         LOGGER.debug("Run config intended nornir play.")
-        config_intended(self, data, jinja_repo.path)
+        written_files = config_intended(self, data, jinja_repo.path)
 
-        # Commit / Push each repo after job is completed.
-        for intended_repo in intended_repos:
-            LOGGER.debug("Push new intended configs to repo %s.", intended_repo.url)
-            intended_repo.commit_with_added(f"INTENDED CONFIG CREATION JOB - {now}")
-            intended_repo.push()
+        # Commit the files written to each repo after job is completed, then push the repos at once.
+        for intended_repo, previous_commit in zip(intended_repos, previous_commits):
+            LOGGER.debug("Commit new intended configs to repo %s.", intended_repo.url)
+            new_commit = intended_repo.commit_files(written_files, f"INTENDED CONFIG CREATION JOB - {now}")
+            # Set by jobs chaining an incremental compliance run.
+            if "changed_files" in data:
+                data["changed_files"].extend(intended_repo.changed_files(previous_commit, new_commit))
+        LOGGER.debug("Push new intended configs to the repos.")
+        push_repos(intended_repos)
 
 
 class BackupJob(Job, FormEntry):
@@ -176,17 +218,24 @@ class BackupJob(Job, FormEntry):
         golden_settings = GoldenConfigSetting.objects.first()
 
         # Instantiate a GitRepo object for each GitRepository in GoldenConfigSettings.
-        backup_repos = [git_wrapper(self, repo, "backup") for repo in golden_settings.backup_repository.all()]
+        backup_repos = [
+            git_wrapper(self, repo, "backup", commit=True) for repo in golden_settings.backup_repository.all()
+        ]
+        previous_commits = [backup_repo.head for backup_repo in backup_repos]
         LOGGER.debug("Starting backup jobs to the following repos: %s", backup_repos)
 
         LOGGER.debug("Run nornir play.")
-        config_backup(self, data)
+        written_files = config_backup(self, data)
 
-        # Commit / Push each repo after job is completed.
-        for backup_repo in backup_repos:
-            LOGGER.debug("Pushing Backup config repo %s.", backup_repo.url)
-            backup_repo.commit_with_added(f"BACKUP JOB {now}")
-            backup_repo.push()
+        # Commit the files written to each repo after job is completed, then push the repos at once.
+        for backup_repo, previous_commit in zip(backup_repos, previous_commits):
+            LOGGER.debug("Commit Backup config repo %s.", backup_repo.url)
+            new_commit = backup_repo.commit_files(written_files, f"BACKUP JOB {now}")
+            # Set by jobs chaining an incremental compliance run.
+            if "changed_files" in data:
+                data["changed_files"].extend(backup_repo.changed_files(previous_commit, new_commit))
+        LOGGER.debug("Pushing Backup config repos.")
+        push_repos(backup_repos)
 
 
 class AllGoldenConfig(Job):
@@ -204,12 +253,14 @@ class AllGoldenConfig(Job):
     @commit_check
     def run(self, data, commit):
         """Run all jobs."""
-        if ENABLE_INTENDED:
-            IntendedJob().run.__func__(self, data, True)
-        if ENABLE_BACKUP:
-            BackupJob().run.__func__(self, data, True)
-        if ENABLE_COMPLIANCE:
-            ComplianceJob().run.__func__(self, data, True)
+        # The repositories are fetched once for all the jobs.
+        with repository_manager.session():
+            if ENABLE_INTENDED:
+                IntendedJob().run.__func__(self, data, True)
+            if ENABLE_BACKUP:
+                BackupJob().run.__func__(self, data, True)
+            if ENABLE_COMPLIANCE:
+                ComplianceJob().run.__func__(self, data, True)
 
 
 class AllDevicesGoldenConfig(Job):
@@ -228,6 +279,9 @@ class AllDevicesGoldenConfig(Job):
     device = FormEntry.device
     tag = FormEntry.tag
     debug = FormEntry.debug
+    incremental = BooleanVar(
+        description="Only run compliance for the devices whose backup or intended configuration changed during this job"
+    )
 
     class Meta:
         """Meta object boilerplate for all jobs to run against multiple devices."""
@@ -238,12 +292,17 @@ class AllDevicesGoldenConfig(Job):
     @commit_check
     def run(self, data, commit):
         """Run all jobs."""
-        if ENABLE_INTENDED:
-            IntendedJob().run.__func__(self, data, True)
-        if ENABLE_BACKUP:
-            BackupJob().run.__func__(self, data, True)
-        if ENABLE_COMPLIANCE:
-            ComplianceJob().run.__func__(self, data, True)
+        if data.get("incremental"):
+            # Collected by the intended and backup jobs as they commit.
+            data["changed_files"] = []
+        # The repositories are fetched once for all the jobs.
+        with repository_manager.session():
+            if ENABLE_INTENDED:
+                IntendedJob().run.__func__(self, data, True)
+            if ENABLE_BACKUP:
+                BackupJob().run.__func__(self, data, True)
+            if ENABLE_COMPLIANCE:
+                ComplianceJob().run.__func__(self, data, True)
 
 
 # Conditionally allow jobs based on whether or not turned on.
@@ -0,0 +1,20 @@
+"""Add the delete_unreferenced_blobs command to nautobot-server."""
+
+from django.core.management.base import BaseCommand
+
+from nautobot_golden_config.models import ConfigBlob
+
+
+class Command(BaseCommand):
+    """Boilerplate Command to inherit from BaseCommand."""
+
+    help = "Delete the stored configurations no longer referenced, to be scheduled, e.g. daily with cron."
+
+    def add_arguments(self, parser):
+        """Add arguments for delete_unreferenced_blobs."""
+        parser.add_argument("-b", "--batch-size", type=int, default=1000, help="The number of blobs checked per batch.")
+
+    def handle(self, *args, **kwargs):
+        """Add handler for delete_unreferenced_blobs."""
+        deleted = ConfigBlob.objects.delete_unreferenced(kwargs["batch_size"])
+        self.stdout.write(f"Deleted {deleted} unreferenced configuration blob(s).")
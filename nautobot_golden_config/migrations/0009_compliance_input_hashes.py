@@ -0,0 +1,28 @@
+# Generated by Django 3.1.14 on 2022-01-10 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nautobot_golden_config", "0008_multi_repo_support_final"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goldenconfig",
+            name="compliance_backup_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="goldenconfig",
+            name="compliance_intended_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="goldenconfig",
+            name="compliance_rules_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
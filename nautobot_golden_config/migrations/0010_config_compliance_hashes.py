@@ -0,0 +1,28 @@
+# Generated by Django 3.1.14 on 2022-01-17 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nautobot_golden_config", "0009_compliance_input_hashes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="configcompliance",
+            name="actual_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="configcompliance",
+            name="intended_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="configcompliance",
+            name="rule_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,173 @@
+# Generated by Django 3.1.14 on 2022-01-24 10:12
+
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def populate_summaries(apps, schema_editor):
+    """Count the existing compliance results in the summaries."""
+    ConfigCompliance = apps.get_model("nautobot_golden_config", "ConfigCompliance")
+    DeviceComplianceSummary = apps.get_model("nautobot_golden_config", "DeviceComplianceSummary")
+    SiteComplianceSummary = apps.get_model("nautobot_golden_config", "SiteComplianceSummary")
+    FeatureComplianceSummary = apps.get_model("nautobot_golden_config", "FeatureComplianceSummary")
+    FleetComplianceSummary = apps.get_model("nautobot_golden_config", "FleetComplianceSummary")
+
+    devices = {}
+    counts, compliants = Counter(), Counter()
+    for device_id, site_id, rule_id, feature_id, compliance in ConfigCompliance.objects.order_by().values_list(
+        "device_id", "device__site_id", "rule_id", "rule__feature_id", "compliance"
+    ):
+        devices.setdefault(device_id, (site_id, {}))[1][str(rule_id)] = [str(feature_id), compliance]
+        counts[site_id, feature_id] += 1
+        compliants[site_id, feature_id] += compliance is True
+
+    DeviceComplianceSummary.objects.bulk_create(
+        DeviceComplianceSummary(
+            device_id=device_id,
+            site_id=site_id,
+            count=len(results),
+            compliant=sum(compliance is True for _, compliance in results.values()),
+            results=results,
+        )
+        for device_id, (site_id, results) in devices.items()
+    )
+    SiteComplianceSummary.objects.bulk_create(
+        SiteComplianceSummary(
+            site_id=site_id, feature_id=feature_id, count=count, compliant=compliants[site_id, feature_id]
+        )
+        for (site_id, feature_id), count in counts.items()
+    )
+    feature_counts, feature_compliants = Counter(), Counter()
+    for (site_id, feature_id), count in counts.items():
+        feature_counts[feature_id] += count
+        feature_compliants[feature_id] += compliants[site_id, feature_id]
+    FeatureComplianceSummary.objects.bulk_create(
+        FeatureComplianceSummary(feature_id=feature_id, count=count, compliant=feature_compliants[feature_id])
+        for feature_id, count in feature_counts.items()
+    )
+    if devices:
+        FleetComplianceSummary.objects.create(
+            scope="fleet",
+            devices=len(devices),
+            compliant_devices=sum(
+                all(compliance is not False for _, compliance in results.values()) for _, results in devices.values()
+            ),
+            count=sum(counts.values()),
+            compliant=sum(compliants.values()),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dcim", "0004_initial_part_4"),
+        ("nautobot_golden_config", "0010_config_compliance_hashes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FleetComplianceSummary",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("scope", models.CharField(default="fleet", max_length=20, unique=True)),
+                ("devices", models.IntegerField(default=0)),
+                ("compliant_devices", models.IntegerField(default=0)),
+                ("count", models.IntegerField(default=0)),
+                ("compliant", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ("scope",),
+            },
+        ),
+        migrations.CreateModel(
+            name="FeatureComplianceSummary",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                ("compliant", models.IntegerField(default=0)),
+                (
+                    "feature",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="compliance_summary",
+                        to="nautobot_golden_config.compliancefeature",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("feature",),
+            },
+        ),
+        migrations.CreateModel(
+            name="SiteComplianceSummary",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                ("compliant", models.IntegerField(default=0)),
+                (
+                    "feature",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="nautobot_golden_config.compliancefeature",
+                    ),
+                ),
+                (
+                    "site",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="dcim.site"),
+                ),
+            ],
+            options={
+                "ordering": ("site", "feature"),
+                "unique_together": {("site", "feature")},
+            },
+        ),
+        migrations.CreateModel(
+            name="DeviceComplianceSummary",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                ("compliant", models.IntegerField(default=0)),
+                ("results", models.JSONField(default=dict)),
+                (
+                    "device",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="compliance_summary",
+                        to="dcim.device",
+                    ),
+                ),
+                (
+                    "site",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="dcim.site"),
+                ),
+            ],
+            options={
+                "ordering": ("device",),
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 3.1.14 on 2022-01-31 09:25
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+BATCH_SIZE = 1000
+
+
+def populate_history(apps, schema_editor):
+    """Record the existing compliance results as the first state of the history, a batch at a time."""
+    ConfigCompliance = apps.get_model("nautobot_golden_config", "ConfigCompliance")
+    ConfigComplianceHistory = apps.get_model("nautobot_golden_config", "ConfigComplianceHistory")
+
+    results = ConfigCompliance.objects.values(
+        "device_id",
+        "rule_id",
+        "rule__feature_id",
+        "device__site_id",
+        "last_updated",
+        "created",
+        "compliance_int",
+        "missing",
+        "extra",
+    )
+    history = []
+    for result in results.iterator(chunk_size=BATCH_SIZE):
+        # The same fingerprint as `ConfigCompliance.get_diff_hash`.
+        diff_hash = hashlib.sha256()
+        diff_hash.update(
+            json.dumps([result["missing"], result["extra"]], sort_keys=True, cls=DjangoJSONEncoder).encode("utf-8")
+        )
+        diff_hash.update(b"\0")
+        history.append(
+            ConfigComplianceHistory(
+                device_id=result["device_id"],
+                rule_id=result["rule_id"],
+                feature_id=result["rule__feature_id"],
+                site_id=result["device__site_id"],
+                timestamp=result["last_updated"] or result["created"],
+                compliance_int=result["compliance_int"] or 0,
+                diff_hash=diff_hash.hexdigest(),
+            )
+        )
+        if len(history) == BATCH_SIZE:
+            ConfigComplianceHistory.objects.bulk_create(history)
+            history = []
+    if history:
+        ConfigComplianceHistory.objects.bulk_create(history)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dcim", "0004_initial_part_4"),
+        ("nautobot_golden_config", "0011_compliance_summaries"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConfigComplianceHistory",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+                ("compliance_int", models.IntegerField()),
+                ("diff_hash", models.CharField(max_length=64)),
+                (
+                    "device",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="dcim.device"),
+                ),
+                (
+                    "feature",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="nautobot_golden_config.compliancefeature",
+                    ),
+                ),
+                (
+                    "rule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="nautobot_golden_config.compliancerule",
+                    ),
+                ),
+                (
+                    "site",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="dcim.site"),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "config compliance history",
+                "ordering": ("timestamp", "device", "rule"),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="configcompliancehistory",
+            index=models.Index(fields=["device", "rule", "timestamp"], name="golden_history_device_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="configcompliancehistory",
+            index=models.Index(fields=["feature", "timestamp"], name="golden_history_feature_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="configcompliancehistory",
+            index=models.Index(fields=["site", "timestamp"], name="golden_history_site_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="configcompliancehistory",
+            index=models.Index(fields=["timestamp"], name="golden_history_time_idx"),
+        ),
+        migrations.RunPython(populate_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,211 @@
+# Generated by Django 3.1.14 on 2022-02-07 14:03
+
+import hashlib
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+import uuid
+
+BATCH_SIZE = 500
+# The configurations of each model, and whether their content is a JSON value.
+BLOB_CONTENTS = {
+    "GoldenConfig": {"backup_config": False, "intended_config": False, "compliance_config": False},
+    "ConfigCompliance": {"actual": True, "intended": True},
+}
+
+
+def _encode(value, is_json):
+    """Encode a configuration the same as `encode_content`, None for an empty configuration."""
+    if is_json:
+        return None if value is None else json.dumps(value, sort_keys=True, cls=DjangoJSONEncoder).encode("utf-8")
+    return value.encode("utf-8") if value else None
+
+
+def _store_batch(ConfigBlob, objs, contents):
+    """Store the configurations of a batch of objects in blobs, and reference them."""
+    references, new_contents = {}, {}
+    for obj in objs:
+        for name, is_json in contents.items():
+            data = _encode(getattr(obj, name), is_json)
+            references[obj.pk, name] = None if data is None else hashlib.sha256(data).hexdigest()
+            if data is not None:
+                new_contents[references[obj.pk, name]] = data
+    blob_ids = dict(ConfigBlob.objects.filter(hash__in=list(new_contents)).values_list("hash", "pk"))
+    new_blobs = []
+    for content_hash, data in new_contents.items():
+        if content_hash in blob_ids:
+            continue
+        compressed = zlib.compress(data)
+        compression, data = ("zlib", compressed) if len(compressed) < len(data) else ("", data)
+        new_blobs.append(ConfigBlob(hash=content_hash, compression=compression, data=data, last_used=timezone.now()))
+    ConfigBlob.objects.bulk_create(new_blobs)
+    blob_ids.update((blob.hash, blob.pk) for blob in new_blobs)
+    for obj in objs:
+        for name in contents:
+            content_hash = references[obj.pk, name]
+            setattr(obj, f"{name}_blob_id", blob_ids[content_hash] if content_hash else None)
+    type(objs[0]).objects.bulk_update(objs, [f"{name}_blob" for name in contents])
+
+
+def move_to_blobs(apps, schema_editor):
+    """Store the configurations in blobs, once per distinct content."""
+    ConfigBlob = apps.get_model("nautobot_golden_config", "ConfigBlob")
+    for model_name, contents in BLOB_CONTENTS.items():
+        model = apps.get_model("nautobot_golden_config", model_name)
+        objs = []
+        for obj in model.objects.only("pk", *contents).iterator(chunk_size=BATCH_SIZE):
+            objs.append(obj)
+            if len(objs) == BATCH_SIZE:
+                _store_batch(ConfigBlob, objs, contents)
+                objs = []
+        if objs:
+            _store_batch(ConfigBlob, objs, contents)
+
+
+def restore_from_blobs(apps, schema_editor):
+    """Copy the configurations back from their blobs."""
+    for model_name, contents in BLOB_CONTENTS.items():
+        model = apps.get_model("nautobot_golden_config", model_name)
+        objs = []
+        for obj in model.objects.select_related(*[f"{name}_blob" for name in contents]).iterator(chunk_size=BATCH_SIZE):
+            for name, is_json in contents.items():
+                blob = getattr(obj, f"{name}_blob")
+                if blob is None:
+                    setattr(obj, name, None if is_json else "")
+                    continue
+                data = bytes(blob.data)
+                if blob.compression == "zlib":
+                    data = zlib.decompress(data)
+                elif blob.compression:
+                    raise ValueError(f"The {blob.compression} blobs can not be restored by this migration.")
+                setattr(obj, name, json.loads(data) if is_json else data.decode("utf-8"))
+            objs.append(obj)
+            if len(objs) == BATCH_SIZE:
+                model.objects.bulk_update(objs, list(contents))
+                objs = []
+        if objs:
+            model.objects.bulk_update(objs, list(contents))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nautobot_golden_config", "0012_config_compliance_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConfigBlob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("hash", models.CharField(max_length=64, unique=True)),
+                ("compression", models.CharField(blank=True, max_length=10)),
+                ("data", models.BinaryField()),
+                ("last_used", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ("hash",),
+            },
+        ),
+        migrations.AddField(
+            model_name="goldenconfig",
+            name="backup_config_blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="nautobot_golden_config.configblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="goldenconfig",
+            name="intended_config_blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="nautobot_golden_config.configblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="goldenconfig",
+            name="compliance_config_blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="nautobot_golden_config.configblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="configcompliance",
+            name="actual_blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="nautobot_golden_config.configblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="configcompliance",
+            name="intended_blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="nautobot_golden_config.configblob",
+            ),
+        ),
+        # Nullable, so the columns can be added back to the existing rows when the migration is reversed.
+        migrations.AlterField(
+            model_name="configcompliance",
+            name="actual",
+            field=models.JSONField(blank=True, null=True, help_text="Actual Configuration for feature"),
+        ),
+        migrations.AlterField(
+            model_name="configcompliance",
+            name="intended",
+            field=models.JSONField(blank=True, null=True, help_text="Intended Configuration for feature"),
+        ),
+        migrations.RunPython(move_to_blobs, restore_from_blobs),
+        migrations.RemoveField(
+            model_name="goldenconfig",
+            name="backup_config",
+        ),
+        migrations.RemoveField(
+            model_name="goldenconfig",
+            name="intended_config",
+        ),
+        migrations.RemoveField(
+            model_name="goldenconfig",
+            name="compliance_config",
+        ),
+        migrations.RemoveField(
+            model_name="configcompliance",
+            name="actual",
+        ),
+        migrations.RemoveField(
+            model_name="configcompliance",
+            name="intended",
+        ),
+    ]
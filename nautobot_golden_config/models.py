@@ -1,12 +1,17 @@
 """Django Models for tracking the configuration compliance per feature and device."""
 
+import copy
 import logging
 import json
+from datetime import timedelta
+from functools import lru_cache
+
 from deepdiff import DeepDiff
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.core.exceptions import ValidationError
 from django.core.serializers.json import DjangoJSONEncoder
 from django.shortcuts import reverse
+from django.utils import timezone
 from django.utils.module_loading import import_string
 from graphene_django.settings import graphene_settings
 from graphql import get_default_backend
@@ -15,17 +20,29 @@ from graphql.error import GraphQLSyntaxError
 from nautobot.dcim.models import Device
 from nautobot.extras.models import ObjectChange
 from nautobot.extras.utils import extras_features
+from nautobot.utilities.querysets import RestrictedQuerySet
 from nautobot.utilities.utils import get_filterset_for_model, serialize_object
+from nautobot.core.models import BaseModel
 from nautobot.core.models.generics import PrimaryModel
-from netutils.config.compliance import feature_compliance
 
 from nautobot_golden_config.choices import ComplianceRuleTypeChoice
-from nautobot_golden_config.utilities.utils import get_platform
+from nautobot_golden_config.utilities.blob_storage import (
+    compress,
+    decode_content,
+    decompress,
+    encode_content,
+    get_compression,
+    get_content_hash,
+)
+from nautobot_golden_config.utilities.config_parser import cli_compliance
+from nautobot_golden_config.utilities.utils import get_hash, get_platform
 from nautobot_golden_config.utilities.constant import PLUGIN_CFG
 
 
 LOGGER = logging.getLogger(__name__)
 GRAPHQL_STR_START = "query ($device_id: ID!)"
+# The number of distinct scopes kept with their validated filterset, a new entry is added each time the scope is edited.
+SCOPE_CACHE_SIZE = 16
 
 ERROR_MSG = (
     "There was an issue with the data that was returned by your get_custom_compliance function. "
@@ -63,23 +80,26 @@ def _get_cli_compliance(obj):
         "name": obj.rule,
     }
     feature.update({"section": obj.rule.match_config.splitlines()})
-    value = feature_compliance(feature, obj.actual, obj.intended, get_platform(obj.device.platform.slug))
-    compliance = value["compliant"]
-    if compliance:
-        compliance_int = 1
-        ordered = value["ordered_compliant"]
-    else:
-        compliance_int = 0
-        ordered = value["ordered_compliant"]
-    missing = _null_to_empty(value["missing"])
-    extra = _null_to_empty(value["extra"])
-    return {
-        "compliance": compliance,
-        "compliance_int": compliance_int,
-        "ordered": ordered,
-        "missing": missing,
-        "extra": extra,
-    }
+    return cli_compliance(feature, obj.actual, obj.intended, get_platform(obj.device.platform.slug))
+
+
+def _get_indexed_rule(rule_id):
+    """Return the `ComplianceRule` from the rule index shared by the compliance jobs, None when it is not indexed."""
+    # The index is built from the models, so it can only be imported once they are defined.
+    from nautobot_golden_config.utilities.rules import get_rule_index  # pylint: disable=import-outside-toplevel
+
+    rule = get_rule_index().rules.get(rule_id)
+    return rule["obj"] if rule else None
+
+
+@lru_cache(maxsize=SCOPE_CACHE_SIZE)
+def get_scope_queryset(scope):
+    """Return the Device queryset of a scope, given as JSON, validating the filterset of the scope only once.
+
+    The queryset is never evaluated here, callers get a copy of it so the devices are always queried fresh.
+    """
+    filterset_class = get_filterset_for_model(Device)
+    return filterset_class(json.loads(scope), Device.objects.all()).qs
 
 
 def _get_json_compliance(obj):
@@ -133,6 +153,10 @@ def _verify_get_custom_compliance_data(compliance_details):
             raise ValidationError(VALIDATION_MSG.format(val, "String or Json", compliance_details[val]))
 
 
+# The ConfigCompliance fields computed by the compliance check, and the fingerprints of the inputs of the check.
+COMPLIANCE_RESULT_FIELDS = ["compliance", "compliance_int", "ordered", "missing", "extra"]
+COMPLIANCE_HASH_FIELDS = ["actual_hash", "intended_hash", "rule_hash"]
+
 # The below maps the provided compliance types
 FUNC_MAPPER = {
     ComplianceRuleTypeChoice.TYPE_CLI: _get_cli_compliance,
@@ -150,6 +174,78 @@ if PLUGIN_CFG.get("get_custom_compliance"):
         )
         raise Exception(msg).with_traceback(error.__traceback__)
 
+# Marks a configuration set on an instance, and not stored in a blob yet.
+_UNSTORED = object()
+# How long an unreferenced blob is kept, so the jobs can still reference the blobs they found or stored.
+BLOB_GRACE_PERIOD = timedelta(days=1)
+
+
+def blob_content(name, is_json=False, help_text=""):
+    """Return the property of a configuration stored in the `ConfigBlob` referenced by the `<name>_blob` field.
+
+    The content is decoded once per instance, and the content set is only stored by `store_blob_contents`, along with
+    the contents of the other instances saved at once.
+    """
+    blob_field = f"{name}_blob"
+
+    def fget(self):
+        contents = self.__dict__.setdefault("_blob_contents", {})
+        blob_id = getattr(self, f"{blob_field}_id")
+        if name not in contents or contents[name][0] not in (_UNSTORED, blob_id):
+            blob = getattr(self, blob_field)
+            contents[name] = (blob_id, blob.get_content(is_json) if blob else None if is_json else "")
+        return contents[name][1]
+
+    def fset(self, value):
+        self.__dict__.setdefault("_blob_contents", {})[name] = (_UNSTORED, value)
+
+    return property(fget, fset, doc=help_text)
+
+
+def store_blob_contents(instances):
+    """Reference the blobs of the configurations set on the instances, storing the new contents with a bulk insert.
+
+    The configurations that were only read, and may have been changed in place, are compared with the fingerprint of
+    their blob, and the empty configurations do not reference any blob.
+
+    Args:
+        instances (list): The instances of a model with the `BlobContentMixin`, about to be saved.
+    """
+    pending, contents = [], {}
+    for instance in instances:
+        for name, (blob_id, value) in instance.__dict__.get("_blob_contents", {}).items():
+            data = encode_content(value, instance.blob_contents[name])
+            content_hash = None if data is None else get_content_hash(data)
+            if blob_id is not _UNSTORED:
+                blob = getattr(instance, f"{name}_blob") if blob_id else None
+                if content_hash == (blob.hash if blob else None):
+                    continue
+            if data is not None:
+                contents[content_hash] = data
+            pending.append((instance, name, content_hash, value))
+    blob_ids = ConfigBlob.objects.store(contents)
+    for instance, name, content_hash, value in pending:
+        blob_id = blob_ids[content_hash] if content_hash else None
+        setattr(instance, f"{name}_blob_id", blob_id)
+        instance.__dict__["_blob_contents"][name] = (blob_id, value)
+
+
+class BlobContentMixin:
+    """Store the configurations of the `blob_contents` properties in blobs, shared by all the equal configurations."""
+
+    # The name of each configuration property, and whether its content is a JSON value.
+    blob_contents = {}
+
+    @classmethod
+    def get_concrete_fields(cls, names):
+        """Return the fields to write for the field names, with the blob reference of each configuration property."""
+        return [f"{name}_blob" if name in cls.blob_contents else name for name in names]
+
+    def save(self, *args, **kwargs):
+        """Store the configurations set on the instance, then save it."""
+        store_blob_contents([self])
+        super().save(*args, **kwargs)
+
 
 @extras_features(
     "custom_fields",
@@ -270,23 +366,34 @@ class ComplianceRule(PrimaryModel):
     "custom_links",
     "custom_validators",
     "export_templates",
-    "graphql",
     "relationships",
     "webhooks",
 )
-class ConfigCompliance(PrimaryModel):
+class ConfigCompliance(BlobContentMixin, PrimaryModel):
     """Configuration compliance details."""
 
     device = models.ForeignKey(to="dcim.Device", on_delete=models.CASCADE, help_text="The device", blank=False)
     rule = models.ForeignKey(to="ComplianceRule", on_delete=models.CASCADE, blank=False, related_name="rule")
     compliance = models.BooleanField(null=True, blank=True)
-    actual = models.JSONField(blank=True, help_text="Actual Configuration for feature")
-    intended = models.JSONField(blank=True, help_text="Intended Configuration for feature")
+    actual_blob = models.ForeignKey(
+        to="ConfigBlob", on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name="+"
+    )
+    intended_blob = models.ForeignKey(
+        to="ConfigBlob", on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name="+"
+    )
     missing = models.JSONField(blank=True, help_text="Configuration that should be on the device.")
     extra = models.JSONField(blank=True, help_text="Configuration that should not be on the device.")
     ordered = models.BooleanField(default=True)
     # Used for django-pivot, both compliance and compliance_int should be set.
     compliance_int = models.IntegerField(null=True, blank=True)
+    # Fingerprints of the inputs the results were computed from, used to skip unchanged saves.
+    actual_hash = models.CharField(max_length=64, blank=True, editable=False)
+    intended_hash = models.CharField(max_length=64, blank=True, editable=False)
+    rule_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    actual = blob_content("actual", is_json=True, help_text="Actual Configuration for feature")
+    intended = blob_content("intended", is_json=True, help_text="Intended Configuration for feature")
+    blob_contents = {"actual": True, "intended": True}
 
     csv_headers = ["Device Name", "Feature", "Compliance"]
 
@@ -304,7 +411,7 @@ class ConfigCompliance(PrimaryModel):
             changed_object=self,
             object_repr=str(self),
             action=action,
-            object_data=serialize_object(self, exclude=["actual", "intended"]),
+            object_data=serialize_object(self, exclude=["actual_blob", "intended_blob", *COMPLIANCE_HASH_FIELDS]),
         )
 
     class Meta:
@@ -313,12 +420,58 @@ class ConfigCompliance(PrimaryModel):
         ordering = ["device"]
         unique_together = ("device", "rule")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Keep the loaded values, but the configurations which are covered by their fingerprints, to detect changes."""
+        instance = super().from_db(db, field_names, values)
+        instance._track_loaded_values(field_names)  # pylint: disable=protected-access
+        return instance
+
+    def _track_loaded_values(self, field_names):
+        """Copy the values of the fields as stored in the database."""
+        self._loaded_values = {  # pylint: disable=attribute-defined-outside-init
+            name: copy.deepcopy(getattr(self, name))
+            for name in field_names
+            if name not in ("actual_blob_id", "intended_blob_id", "last_updated")
+        }
+
+    def _use_indexed_rule(self):
+        """Take the rule from the shared rule index, rather than a query per save."""
+        if self.rule_id and not ConfigCompliance.rule.is_cached(self):
+            self.rule = _get_indexed_rule(self.rule_id) or self.rule
+
     def __str__(self):
         """String representation of a the compliance."""
         return f"{self.device} -> {self.rule} -> {self.compliance}"
 
-    def save(self, *args, **kwargs):
+    def get_compliance_hashes(self):
+        """Return the fingerprints of the actual and intended configurations, and of the rule they are compared with."""
+        self._use_indexed_rule()
+        return {
+            "actual_hash": get_hash(json.dumps(self.actual, sort_keys=True, cls=DjangoJSONEncoder)),
+            "intended_hash": get_hash(json.dumps(self.intended, sort_keys=True, cls=DjangoJSONEncoder)),
+            "rule_hash": get_hash(
+                self.rule_id,
+                self.rule.config_type,
+                self.rule.config_ordered,
+                self.rule.match_config,
+                get_platform(self.device.platform.slug) if self.device.platform else None,
+                PLUGIN_CFG.get("get_custom_compliance"),
+            ),
+        }
+
+    def get_diff_hash(self):
+        """Return the fingerprint of the missing and extra configurations, recorded in the compliance history."""
+        return get_hash(json.dumps([self.missing, self.extra], sort_keys=True, cls=DjangoJSONEncoder))
+
+    def update_compliance_hashes(self):
+        """Set the fingerprints of the inputs the compliance results were computed from."""
+        for field, value in self.get_compliance_hashes().items():
+            setattr(self, field, value)
+
+    def compliance_on_save(self):
         """The actual configuration compliance happens here, but the details for actual compliance job would be found in FUNC_MAPPER."""
+        self._use_indexed_rule()
         if self.rule.config_type == ComplianceRuleTypeChoice.TYPE_CUSTOM and not FUNC_MAPPER.get(
             ComplianceRuleTypeChoice.TYPE_CUSTOM
         ):
@@ -335,8 +488,55 @@ class ConfigCompliance(PrimaryModel):
         self.ordered = compliance_details["ordered"]
         self.missing = compliance_details["missing"]
         self.extra = compliance_details["extra"]
+        self.update_compliance_hashes()
 
+    def save(self, *args, **kwargs):
+        """Performs the compliance check prior to saving, bulk writes are expected to call `compliance_on_save`.
+
+        When the actual and intended configurations, and the rule, are the same as loaded, the stored results are kept
+        without running the check, and when nothing else changed either the row is not written at all. A new result, or
+        a change of its state, is recorded in the compliance history.
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        hashes = self.get_compliance_hashes()
+        if (
+            loaded
+            and all(field in loaded for field in COMPLIANCE_RESULT_FIELDS)
+            and all(loaded.get(field) == value for field, value in hashes.items())
+        ):
+            for field in COMPLIANCE_RESULT_FIELDS:
+                setattr(self, field, copy.deepcopy(loaded[field]))
+            if all(getattr(self, name) == value for name, value in loaded.items()):
+                return
+        else:
+            self.compliance_on_save()
         super().save(*args, **kwargs)
+        self._record_history(loaded)
+        self._track_loaded_values([field.attname for field in self._meta.concrete_fields])
+
+    def _record_history(self, loaded):
+        """Record the saved result in the history, unless its compliance, missing and extra are the same as loaded.
+
+        The compliance jobs write the results in bulk, they record them with a `ComplianceHistoryRecorder` instead.
+        """
+        diff_hash = self.get_diff_hash()
+        if (
+            loaded
+            and all(field in loaded for field in ("compliance_int", "missing", "extra"))
+            and loaded["compliance_int"] == self.compliance_int
+            and get_hash(json.dumps([loaded["missing"], loaded["extra"]], sort_keys=True, cls=DjangoJSONEncoder))
+            == diff_hash
+        ):
+            return
+        ConfigComplianceHistory.objects.create(
+            device_id=self.device_id,
+            rule_id=self.rule_id,
+            feature_id=self.rule.feature_id,
+            site_id=self.device.site_id,
+            timestamp=self.last_updated or timezone.now(),
+            compliance_int=self.compliance_int or 0,
+            diff_hash=diff_hash,
+        )
 
 
 @extras_features(
@@ -344,11 +544,10 @@ class ConfigCompliance(PrimaryModel):
     "custom_links",
     "custom_validators",
     "export_templates",
-    "graphql",
     "relationships",
     "webhooks",
 )
-class GoldenConfig(PrimaryModel):
+class GoldenConfig(BlobContentMixin, PrimaryModel):
     """Configuration Management Model."""
 
     device = models.ForeignKey(
@@ -357,17 +556,32 @@ class GoldenConfig(PrimaryModel):
         help_text="device",
         blank=False,
     )
-    backup_config = models.TextField(blank=True, help_text="Full backup config for device.")
+    backup_config_blob = models.ForeignKey(
+        to="ConfigBlob", on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name="+"
+    )
     backup_last_attempt_date = models.DateTimeField(null=True)
     backup_last_success_date = models.DateTimeField(null=True)
 
-    intended_config = models.TextField(blank=True, help_text="Intended config for the device.")
+    intended_config_blob = models.ForeignKey(
+        to="ConfigBlob", on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name="+"
+    )
     intended_last_attempt_date = models.DateTimeField(null=True)
     intended_last_success_date = models.DateTimeField(null=True)
 
-    compliance_config = models.TextField(blank=True, help_text="Full config diff for device.")
+    compliance_config_blob = models.ForeignKey(
+        to="ConfigBlob", on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name="+"
+    )
     compliance_last_attempt_date = models.DateTimeField(null=True)
     compliance_last_success_date = models.DateTimeField(null=True)
+    # Fingerprints of the inputs of the last successful compliance run, used to skip unchanged devices.
+    compliance_backup_hash = models.CharField(max_length=64, blank=True, editable=False)
+    compliance_intended_hash = models.CharField(max_length=64, blank=True, editable=False)
+    compliance_rules_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    backup_config = blob_content("backup_config", help_text="Full backup config for device.")
+    intended_config = blob_content("intended_config", help_text="Intended config for the device.")
+    compliance_config = blob_content("compliance_config", help_text="Full config diff for device.")
+    blob_contents = {"backup_config": False, "intended_config": False, "compliance_config": False}
 
     csv_headers = [
         "Device Name",
@@ -397,7 +611,9 @@ class GoldenConfig(PrimaryModel):
             changed_object=self,
             object_repr=str(self),
             action=action,
-            object_data=serialize_object(self, exclude=["backup_config", "intended_config", "compliance_config"]),
+            object_data=serialize_object(
+                self, exclude=["backup_config_blob", "intended_config_blob", "compliance_config_blob"]
+            ),
         )
 
     class Meta:
@@ -570,10 +786,7 @@ class GoldenConfigSetting(PrimaryModel):
         if not self.scope:
             return Device.objects.all()
 
-        filterset_class = get_filterset_for_model(Device)
-        filterset = filterset_class(self.scope, Device.objects.all())
-
-        return filterset.qs
+        return get_scope_queryset(json.dumps(self.scope, sort_keys=True, cls=DjangoJSONEncoder)).all()
 
     def device_count(self):
         """Return the number of devices in the group."""
@@ -716,3 +929,222 @@ class ConfigReplace(PrimaryModel):
     def __str__(self):
         """Return a simple string if model is called."""
         return self.name
+
+
+class FeatureComplianceSummary(BaseModel):
+    """Number of compliance results, and of compliant results, of a feature, maintained as the results are written."""
+
+    feature = models.OneToOneField(to="ComplianceFeature", on_delete=models.CASCADE, related_name="compliance_summary")
+    count = models.IntegerField(default=0)
+    compliant = models.IntegerField(default=0)
+
+    class Meta:
+        """Meta information for FeatureComplianceSummary model."""
+
+        ordering = ("feature",)
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return f"{self.feature} -> {self.compliant}/{self.count}"
+
+
+class SiteComplianceSummary(BaseModel):
+    """Number of compliance results, and of compliant results, of a feature for the devices of a site."""
+
+    site = models.ForeignKey(to="dcim.Site", on_delete=models.CASCADE, related_name="+")
+    feature = models.ForeignKey(to="ComplianceFeature", on_delete=models.CASCADE, related_name="+")
+    count = models.IntegerField(default=0)
+    compliant = models.IntegerField(default=0)
+
+    class Meta:
+        """Meta information for SiteComplianceSummary model."""
+
+        ordering = ("site", "feature")
+        unique_together = ("site", "feature")
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return f"{self.site} -> {self.feature} -> {self.compliant}/{self.count}"
+
+
+class DeviceComplianceSummary(BaseModel):
+    """The compliance results of a device, as counted in the feature, site and fleet summaries.
+
+    The results are kept as `{rule_id: [feature_id, compliance]}`, and compared with the stored results of the device to
+    update the other summaries with the difference only.
+    """
+
+    device = models.OneToOneField(to="dcim.Device", on_delete=models.CASCADE, related_name="compliance_summary")
+    site = models.ForeignKey(to="dcim.Site", on_delete=models.CASCADE, related_name="+")
+    count = models.IntegerField(default=0)
+    compliant = models.IntegerField(default=0)
+    results = models.JSONField(default=dict)
+
+    class Meta:
+        """Meta information for DeviceComplianceSummary model."""
+
+        ordering = ("device",)
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return f"{self.device} -> {self.compliant}/{self.count}"
+
+
+class FleetComplianceSummary(BaseModel):
+    """Number of devices with compliance results, and of compliance results, of all the devices; a single row."""
+
+    scope = models.CharField(max_length=20, unique=True, default="fleet")
+    devices = models.IntegerField(default=0)
+    compliant_devices = models.IntegerField(default=0)
+    count = models.IntegerField(default=0)
+    compliant = models.IntegerField(default=0)
+
+    class Meta:
+        """Meta information for FleetComplianceSummary model."""
+
+        ordering = ("scope",)
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return f"{self.scope} -> {self.compliant}/{self.count}"
+
+
+class ConfigComplianceHistory(BaseModel):
+    """A transition of the compliance result of a device for a rule, recorded by the compliance job that found it.
+
+    Only the changes of the compliance, or of the missing and extra configurations, are recorded, so the history grows
+    with the drift rather than with the number of jobs. The site and the feature are kept as of the transition, to query
+    their trends without joining the devices and the rules.
+    """
+
+    device = models.ForeignKey(to="dcim.Device", on_delete=models.CASCADE, related_name="+")
+    rule = models.ForeignKey(to="ComplianceRule", on_delete=models.CASCADE, related_name="+")
+    feature = models.ForeignKey(to="ComplianceFeature", on_delete=models.CASCADE, related_name="+")
+    site = models.ForeignKey(to="dcim.Site", on_delete=models.CASCADE, related_name="+")
+    timestamp = models.DateTimeField()
+    compliance_int = models.IntegerField()
+    diff_hash = models.CharField(max_length=64)
+
+    class Meta:
+        """Meta information for ConfigComplianceHistory model."""
+
+        ordering = ("timestamp", "device", "rule")
+        indexes = [
+            models.Index(fields=["device", "rule", "timestamp"], name="golden_history_device_idx"),
+            models.Index(fields=["feature", "timestamp"], name="golden_history_feature_idx"),
+            models.Index(fields=["site", "timestamp"], name="golden_history_site_idx"),
+            models.Index(fields=["timestamp"], name="golden_history_time_idx"),
+        ]
+        verbose_name_plural = "config compliance history"
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return f"{self.device} -> {self.rule} -> {self.compliance_int} at {self.timestamp}"
+
+
+class ConfigBlobQuerySet(RestrictedQuerySet):
+    """QuerySet of the ConfigBlob model, storing each distinct content once."""
+
+    def store(self, contents):
+        """Return the blob of each content, creating the blobs of the new contents with a bulk insert.
+
+        Args:
+            contents (dict): The encoded contents, keyed by their fingerprint.
+
+        Returns:
+            dict: The primary key of the blob of each fingerprint.
+        """
+        if not contents:
+            return {}
+        now = timezone.now()
+        # Touching the blobs found keeps them from being deleted as unreferenced before they are referenced.
+        self.filter(hash__in=list(contents)).update(last_used=now)
+        blob_ids = dict(self.filter(hash__in=list(contents)).values_list("hash", "pk"))
+        compression = get_compression()
+        new_blobs = []
+        for content_hash, data in contents.items():
+            if content_hash not in blob_ids:
+                blob_compression, blob_data = compress(data, compression)
+                new_blobs.append(
+                    self.model(hash=content_hash, compression=blob_compression, data=blob_data, last_used=now)
+                )
+        if new_blobs:
+            # A blob stored by a concurrent job in the meantime is kept, and referenced instead.
+            self.bulk_create(new_blobs, ignore_conflicts=True)
+            blob_ids.update(self.filter(hash__in=[blob.hash for blob in new_blobs]).values_list("hash", "pk"))
+        return blob_ids
+
+    def delete_unreferenced(self, batch_size=1000):
+        """Delete the blobs that no configuration references anymore, and that were not used within the grace period.
+
+        The blobs are checked and deleted a batch at a time, each batch looking up its references through the indexes of
+        the configurations. A blob used again in the meantime is skipped, as storing a content touches its blob first.
+
+        Args:
+            batch_size (int): The number of blobs checked per batch.
+
+        Returns:
+            int: The number of blobs deleted.
+        """
+        cutoff = timezone.now() - BLOB_GRACE_PERIOD
+        candidates = self.filter(last_used__lt=cutoff).order_by("pk").values_list("pk", flat=True)
+        deleted, last_pk = 0, None
+        while True:
+            batch = list((candidates if last_pk is None else candidates.filter(pk__gt=last_pk))[:batch_size])
+            if not batch:
+                return deleted
+            last_pk = batch[-1]
+            referenced = set()
+            for model in (GoldenConfig, ConfigCompliance):
+                for name in model.blob_contents:
+                    referenced.update(
+                        model.objects.filter(**{f"{name}_blob__in": batch}).values_list(f"{name}_blob", flat=True)
+                    )
+            deleted += self._delete_batch([pk for pk in batch if pk not in referenced], cutoff)
+
+    def _delete_batch(self, pks, cutoff):
+        """Delete the blobs still unused since the cutoff, one at a time when some are referenced again meanwhile."""
+        if not pks:
+            return 0
+        try:
+            with transaction.atomic():
+                return self.filter(pk__in=pks, last_used__lt=cutoff).only("pk").delete()[0]
+        except (models.ProtectedError, IntegrityError):
+            pass
+        deleted = 0
+        for pk in pks:
+            try:
+                with transaction.atomic():
+                    deleted += self.filter(pk=pk, last_used__lt=cutoff).only("pk").delete()[0]
+            except (models.ProtectedError, IntegrityError):
+                # Referenced again in the meantime, the blob is kept until it is unreferenced.
+                continue
+        return deleted
+
+
+class ConfigBlob(BaseModel):
+    """A configuration, or a section of a configuration, stored once for all the objects with the same content.
+
+    The blobs are keyed by the sha256 fingerprint of their content, so writing an unchanged configuration only
+    references the same blob again.
+    """
+
+    hash = models.CharField(max_length=64, unique=True)
+    compression = models.CharField(max_length=10, blank=True)
+    data = models.BinaryField()
+    last_used = models.DateTimeField()
+
+    objects = ConfigBlobQuerySet.as_manager()
+
+    class Meta:
+        """Meta information for ConfigBlob model."""
+
+        ordering = ("hash",)
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return self.hash
+
+    def get_content(self, is_json=False):
+        """Return the configuration stored in the blob, the JSON value it encodes when `is_json` is set."""
+        return decode_content(decompress(self.data, self.compression), is_json)
@@ -0,0 +1,214 @@
+"""Asyncio engine to back up the configuration of many devices at once, as an alternative to the Nornir runner."""
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import logging
+import os
+
+from django.db import connection
+
+from nornir_nautobot.exceptions import NornirNautobotException
+from nornir_nautobot.plugins.tasks.dispatcher.default import RUN_COMMAND_MAPPING
+from nornir_nautobot.utils.helpers import make_folder
+
+from nautobot_golden_config.utilities.helper import (
+    get_repository_routes,
+    get_repository_working_dir,
+    render_jinja_template,
+)
+from nautobot_golden_config.utilities.utils import get_platform
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+LOGGER = logging.getLogger(__name__)
+
+BackupTarget = collections.namedtuple("BackupTarget", ["obj", "host", "backup_file", "command", "sanitizer"])
+
+
+def get_backup_targets(hosts, logger, global_settings, sanitizers):
+    """Resolve what the engine needs for each device, as the ORM can not be used within the event loop.
+
+    Args:
+        hosts (iterable): The Nornir hosts of the job, from the `NautobotORMInventory`.
+        logger (NornirLogger): Logger to log messages to.
+        global_settings (GoldenConfigSetting): The settings for GoldenConfigPlugin.
+        sanitizers (dict): The `PlatformSanitizer` per platform slug, as returned by `get_sanitizers`.
+
+    Returns:
+        list: A `BackupTarget` per device, the devices failing to resolve are logged and left out.
+    """
+    routes = get_repository_routes("backup", global_settings)
+    targets = []
+    for host in hosts:
+        obj = host.data["obj"]
+        try:
+            backup_directory = get_repository_working_dir("backup", obj, logger, global_settings, routes)
+            backup_path_template_obj = render_jinja_template(obj, logger, global_settings.backup_path_template)
+        except NornirNautobotException:
+            continue
+        if not backup_directory:
+            continue
+        sanitizer = sanitizers.get(obj.platform.slug)
+        if sanitizer and sanitizer.error:
+            logger.log_failure(obj, sanitizer.error)
+            continue
+        targets.append(
+            BackupTarget(
+                obj=obj,
+                host=host,
+                backup_file=os.path.join(backup_directory, backup_path_template_obj),
+                command=RUN_COMMAND_MAPPING.get(get_platform(obj.platform.slug), RUN_COMMAND_MAPPING["default"]),
+                sanitizer=sanitizer,
+            )
+        )
+    return targets
+
+
+class AsyncBackupEngine:
+    """Collect the running configuration of the devices over SSH, with thousands of sessions in a single thread.
+
+    The number of concurrent sessions is limited globally, per site and per platform. The configurations go through
+    the same remove and replace processing, and are written to the same files, as the `get_config` of the dispatcher.
+    The logger and status tracker calls use the ORM, they are run one at a time in a single thread, whose database
+    connection is closed once the run is done. As with the Nornir runner, a device failing for any reason is logged,
+    without affecting the other devices.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, logger, status, limits=None, timeout=60, known_hosts=None, test_connectivity=True
+    ):
+        """Set the parameters of the engine.
+
+        Args:
+            logger (NornirLogger): Logger to log messages to.
+            status (StatusTracker): Tracks the `GoldenConfig` status of the devices of the job.
+            limits (dict): The maximum number of sessions for the `global`, `site` and `platform` keys.
+            timeout (int): The number of seconds to connect to a device and collect its configuration.
+            known_hosts (str): The `known_hosts` file to verify the host keys of the devices with, None does not verify.
+            test_connectivity (bool): Whether the SSH port of a device is checked to be reachable before connecting.
+        """
+        if asyncssh is None:
+            raise NornirNautobotException("The `asyncssh` package is required to use the `asyncio` backup engine.")
+        self.logger = logger
+        self.status = status
+        self.limits = {"global": 500, "site": 50, "platform": 200}
+        self.limits.update(limits or {})
+        self.timeout = timeout
+        self.known_hosts = known_hosts
+        self.test_connectivity = test_connectivity
+        self.semaphores = {}
+        self.executor = None
+
+    def run(self, targets):
+        """Back up the configuration of the targets, returning once all of them are done.
+
+        Args:
+            targets (list): The `BackupTarget` of each device, as returned by `get_backup_targets`.
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._run(targets))
+        finally:
+            loop.close()
+            self.executor.submit(connection.close).result()
+            self.executor.shutdown()
+
+    async def _run(self, targets):
+        """Start a coroutine per target, the semaphores keep the sessions within the limits."""
+        self.semaphores = {
+            "global": asyncio.Semaphore(self.limits["global"]),
+            "site": collections.defaultdict(lambda: asyncio.Semaphore(self.limits["site"])),
+            "platform": collections.defaultdict(lambda: asyncio.Semaphore(self.limits["platform"])),
+        }
+        await asyncio.gather(*(self._backup(target) for target in targets))
+
+    async def _call(self, func, *args, **kwargs):
+        """Run a function using the ORM in the executor of the engine."""
+        await asyncio.get_event_loop().run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def _backup(self, target):
+        """Back up the configuration of a single device, logging any unexpected error as the failure of the device."""
+        try:
+            await self._backup_device(target)
+        except Exception as error:  # pylint: disable=broad-except
+            try:
+                await self._call(self.logger.log_failure, target.obj, f"Failed with an unknown issue. `{error}`")
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("Unable to log the backup failure of %s", target.obj)
+
+    async def _backup_device(self, target):
+        """Back up the configuration of a single device."""
+        obj, host = target.obj, target.host
+        if not host.username or not host.password:
+            await self._call(
+                self.logger.log_failure, obj, "There was no username or password defined, preemptively failed."
+            )
+            return
+
+        # The narrower limits are acquired first, so waiting devices do not hold a global slot.
+        async with self.semaphores["site"][obj.site_id], self.semaphores["platform"][obj.platform_id]:
+            async with self.semaphores["global"]:
+                port = host.port or 22
+                if self.test_connectivity and not await self._check_connectivity(host.hostname, port, self.timeout):
+                    await self._call(
+                        self.logger.log_failure,
+                        obj,
+                        f"Could not connect to IP: {host.hostname} and port: {port}, preemptively failed.",
+                    )
+                    return
+                try:
+                    running_config = await asyncio.wait_for(
+                        self._get_config(host, target.command, self.known_hosts), self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    await self._call(
+                        self.logger.log_failure, obj, f"Failed with a timeout issue after {self.timeout}s."
+                    )
+                    return
+                except (asyncssh.Error, OSError) as error:
+                    await self._call(self.logger.log_failure, obj, f"Failed with a connection issue. `{error}`")
+                    return
+
+        # Primarily seen in Cisco devices.
+        if "ERROR: % Invalid input detected at" in running_config:
+            await self._call(
+                self.logger.log_failure, obj, "Discovered `ERROR: % Invalid input detected at` in the output"
+            )
+            return
+        if target.sanitizer:
+            running_config = target.sanitizer.sanitize(running_config)
+
+        make_folder(os.path.dirname(target.backup_file))
+        with open(target.backup_file, "w") as filehandler:
+            filehandler.write(running_config)
+
+        await self._call(self.status.success, obj, written_file=target.backup_file, backup_config=running_config)
+        await self._call(self.logger.log_success, obj, "Successfully extracted running configuration from device.")
+
+    @staticmethod
+    async def _check_connectivity(hostname, port, timeout):
+        """Return whether a TCP connection to the port of a device opens, the same as the `check_connectivity` task."""
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(hostname, port), timeout)
+        except (asyncio.TimeoutError, OSError):
+            return False
+        writer.close()
+        return True
+
+    @staticmethod
+    async def _get_config(host, command, known_hosts=None):
+        """Run the command showing the running configuration on a device, over an exec channel without paging."""
+        async with asyncssh.connect(
+            host.hostname,
+            port=host.port or 22,
+            username=host.username,
+            password=host.password,
+            known_hosts=known_hosts,
+        ) as conn:
+            result = await conn.run(command, check=True)
+        return result.stdout
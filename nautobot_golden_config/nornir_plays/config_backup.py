@@ -7,6 +7,7 @@ from nornir import InitNornir
 from nornir.core.task import Result, Task
 from nornir.core.plugins.inventory import InventoryPluginRegister
 
+from nornir_nautobot.exceptions import NornirNautobotException
 from nornir_nautobot.plugins.tasks.dispatcher import dispatcher
 from nornir_nautobot.utils.logger import NornirLogger
 
@@ -17,45 +18,56 @@ from nautobot_plugin_nornir.utils import get_dispatcher
 
 from nautobot_golden_config.utilities.helper import (
     get_job_filter,
+    get_job_queryset,
+    get_repository_routes,
     get_repository_working_dir,
     verify_global_settings,
     render_jinja_template,
 )
 from nautobot_golden_config.models import (
     GoldenConfigSetting,
-    GoldenConfig,
     ConfigRemove,
     ConfigReplace,
 )
+from nautobot_golden_config.nornir_plays.async_backup import AsyncBackupEngine, get_backup_targets
 from nautobot_golden_config.nornir_plays.processor import ProcessGoldenConfig
+from nautobot_golden_config.utilities.bulk import StatusTracker
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+from nautobot_golden_config.utilities.sanitizer import get_sanitizers
 
 InventoryPluginRegister.register("nautobot-inventory", NautobotORMInventory)
 
 
 def run_backup(  # pylint: disable=too-many-arguments
-    task: Task, logger, global_settings, remove_regex_dict, replace_regex_dict
+    task: Task,
+    logger,
+    global_settings,
+    remove_regex_dict,
+    replace_regex_dict,
+    status,
+    routes=None,
+    sanitizer_errors=None,
 ) -> Result:
     r"""Backup configurations to disk.
 
     Args:
         task (Task): Nornir task individual object
+        status (StatusTracker): Tracks the `GoldenConfig` status of the devices of the job.
         remove_regex_dict (dict): {'cisco_ios': ['^Building\\s+configuration.*\\n', '^Current\\s+configuration.*\\n', '^!\\s+Last\\s+configuration.*'], 'arista_eos': ['.s*']}
         replace_regex_dict (dict): {'cisco_ios': [{'regex_replacement': '<redacted_config>', 'regex_search': 'username\\s+\\S+\\spassword\\s+5\\s+(\\S+)\\s+role\\s+\\S+'}]}
+        routes (dict): The routing table of the backup repositories, as returned by `get_repository_routes`.
+        sanitizer_errors (dict): The error of the platforms with an invalid `ConfigRemove` or `ConfigReplace` regex.
 
     Returns:
         result (Result): Result from Nornir task
     """
     obj = task.host.data["obj"]
 
-    backup_obj = GoldenConfig.objects.filter(device=obj).first()
-    if not backup_obj:
-        backup_obj = GoldenConfig.objects.create(
-            device=obj,
-        )
-    backup_obj.backup_last_attempt_date = task.host.defaults.data["now"]
-    backup_obj.save()
+    if sanitizer_errors and obj.platform.slug in sanitizer_errors:
+        logger.log_failure(obj, sanitizer_errors[obj.platform.slug])
+        raise NornirNautobotException()
 
-    backup_directory = get_repository_working_dir("backup", obj, logger, global_settings)
+    backup_directory = get_repository_working_dir("backup", obj, logger, global_settings, routes)
     backup_path_template_obj = render_jinja_template(obj, logger, global_settings.backup_path_template)
     backup_file = os.path.join(backup_directory, backup_path_template_obj)
 
@@ -80,9 +92,7 @@ def run_backup(  # pylint: disable=too-many-arguments
         default_drivers_mapping=get_dispatcher(),
     )[1].result["config"]
 
-    backup_obj.backup_last_success_date = task.host.defaults.data["now"]
-    backup_obj.backup_config = running_config
-    backup_obj.save()
+    status.success(obj, written_file=backup_file, backup_config=running_config)
 
     logger.log_success(obj, "Successfully extracted running configuration from device.")
 
@@ -90,26 +100,24 @@ def run_backup(  # pylint: disable=too-many-arguments
 
 
 def config_backup(job_result, data):
-    """Nornir play to backup configurations."""
+    """Nornir play to backup configurations.
+
+    Returns:
+        list: The backup files written by the play.
+    """
     now = datetime.now()
     logger = NornirLogger(__name__, job_result, data.get("debug"))
     global_settings = GoldenConfigSetting.objects.first()
     verify_global_settings(logger, global_settings, ["backup_path_template"])
 
-    # Build a dictionary, with keys of platform.slug, and the regex line in it for the netutils func.
-    remove_regex_dict = {}
-    for regex in ConfigRemove.objects.all():
-        if not remove_regex_dict.get(regex.platform.slug):
-            remove_regex_dict[regex.platform.slug] = []
-        remove_regex_dict[regex.platform.slug].append({"regex": regex.regex})
-
-    # Build a dictionary, with keys of platform.slug, and the regex and replace keys for the netutils func.
-    replace_regex_dict = {}
-    for regex in ConfigReplace.objects.all():
-        if not replace_regex_dict.get(regex.platform.slug):
-            replace_regex_dict[regex.platform.slug] = []
-        replace_regex_dict[regex.platform.slug].append({"replace": regex.replace, "regex": regex.regex})
     try:
+        # Compile the regex lines of each platform once, the dictionaries keep the format of the netutils funcs.
+        sanitizers = get_sanitizers(ConfigRemove.objects.all(), ConfigReplace.objects.all())
+        remove_regex_dict = {slug: sanitizer.remove_lines for slug, sanitizer in sanitizers.items()}
+        replace_regex_dict = {slug: sanitizer.substitute_lines for slug, sanitizer in sanitizers.items()}
+        queryset = get_job_filter(data)
+        status = StatusTracker("backup", queryset, now, getattr(job_result, "request", None))
+        status.start()
         with InitNornir(
             runner=NORNIR_SETTINGS.get("runner"),
             logging={"enabled": False},
@@ -118,26 +126,46 @@ def config_backup(job_result, data):
                 "options": {
                     "credentials_class": NORNIR_SETTINGS.get("credentials"),
                     "params": NORNIR_SETTINGS.get("inventory_params"),
-                    "queryset": get_job_filter(data),
+                    "queryset": get_job_queryset(
+                        queryset, [global_settings.backup_path_template, global_settings.backup_match_rule]
+                    ),
                     "defaults": {"now": now},
                 },
             },
         ) as nornir_obj:
 
-            nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
-
-            nr_with_processors.run(
-                task=run_backup,
-                name="BACKUP CONFIG",
-                logger=logger,
-                global_settings=global_settings,
-                remove_regex_dict=remove_regex_dict,
-                replace_regex_dict=replace_regex_dict,
-            )
+            if PLUGIN_CFG.get("backup_engine") == "asyncio":
+                targets = get_backup_targets(nornir_obj.inventory.hosts.values(), logger, global_settings, sanitizers)
+                AsyncBackupEngine(
+                    logger,
+                    status,
+                    PLUGIN_CFG.get("backup_async_limits"),
+                    PLUGIN_CFG.get("backup_async_timeout", 60),
+                    PLUGIN_CFG.get("backup_async_known_hosts"),
+                    global_settings.backup_test_connectivity is not False,
+                ).run(targets)
+            else:
+                nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
+
+                nr_with_processors.run(
+                    task=run_backup,
+                    name="BACKUP CONFIG",
+                    logger=logger,
+                    global_settings=global_settings,
+                    remove_regex_dict=remove_regex_dict,
+                    replace_regex_dict=replace_regex_dict,
+                    status=status,
+                    routes=get_repository_routes("backup", global_settings),
+                    sanitizer_errors={
+                        slug: sanitizer.error for slug, sanitizer in sanitizers.items() if sanitizer.error
+                    },
+                )
             logger.log_debug("Completed configuration from devices.")
+        status.finish()
 
     except Exception as err:
         logger.log_failure(None, err)
         raise
 
     logger.log_debug("Completed configuration backup job for devices.")
+    return status.written_files
@@ -1,12 +1,15 @@
 """Nornir job for generating the compliance data."""
 # pylint: disable=relative-beyond-top-level
-import difflib
+import io
 import logging
 import os
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-from netutils.config.compliance import parser_map, section_config, _open_file_config
+from django.db import transaction
+from django.utils import timezone
+from netutils.config.compliance import parser_map, _open_file_config
 from nornir import InitNornir
 from nornir.core.plugins.inventory import InventoryPluginRegister
 from nornir.core.task import Result, Task
@@ -14,43 +17,292 @@ from nornir.core.task import Result, Task
 from nornir_nautobot.exceptions import NornirNautobotException
 from nornir_nautobot.utils.logger import NornirLogger
 
+from nautobot.extras.choices import ObjectChangeActionChoices
+
 from nautobot_plugin_nornir.plugins.inventory.nautobot_orm import NautobotORMInventory
 from nautobot_plugin_nornir.constants import NORNIR_SETTINGS
 
-from nautobot_golden_config.models import ComplianceRule, ConfigCompliance, GoldenConfigSetting, GoldenConfig
+from nautobot_golden_config.choices import ComplianceRuleTypeChoice
+from nautobot_golden_config.models import (
+    COMPLIANCE_HASH_FIELDS,
+    COMPLIANCE_RESULT_FIELDS,
+    ConfigCompliance,
+    GoldenConfigSetting,
+    GoldenConfig,
+    store_blob_contents,
+)
 from nautobot_golden_config.utilities.helper import (
     get_job_filter,
+    get_job_queryset,
+    get_repository_routes,
     get_repository_working_dir,
     verify_global_settings,
     render_jinja_template,
 )
 from nautobot_golden_config.nornir_plays.processor import ProcessGoldenConfig
-from nautobot_golden_config.utilities.utils import get_platform
+from nautobot_golden_config.utilities.bulk import StatusTracker, bulk_change_log
+from nautobot_golden_config.utilities.compliance_history import ComplianceHistoryRecorder
+from nautobot_golden_config.utilities.compliance_matrix import invalidate_compliance_matrices
+from nautobot_golden_config.utilities.compliance_summary import update_device_summary
+from nautobot_golden_config.utilities.config_parser import ParsedConfig, cli_compliance
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+from nautobot_golden_config.utilities.diff import DEFAULT_MAX_LINES, unified_diff
+from nautobot_golden_config.utilities.git import GitObjectReader
+from nautobot_golden_config.utilities.rules import get_rule_index
+from nautobot_golden_config.utilities.utils import get_hash, get_platform
 
 
 InventoryPluginRegister.register("nautobot-inventory", NautobotORMInventory)
 LOGGER = logging.getLogger(__name__)
 
+# The ConfigCompliance fields that are set by a compliance run.
+COMPLIANCE_FIELDS = ["actual", "intended", *COMPLIANCE_RESULT_FIELDS, *COMPLIANCE_HASH_FIELDS]
+
 
 def get_rules():
-    """A serializer of sorts to return rule mappings as a dictionary."""
-    # TODO: Review if creating a proper serializer is the way to go.
-    rules = {}
-    for obj in ComplianceRule.objects.exclude(match_config__exact=""):
-        platform = str(obj.platform.slug)
-        if not rules.get(platform):
-            rules[platform] = []
-        rules[platform].append({"ordered": obj.config_ordered, "obj": obj, "section": obj.match_config.splitlines()})
-    return rules
+    """Return the rule mappings per platform slug, from the rule index shared by the compliance jobs."""
+    return dict(get_rule_index().platforms)
+
+
+def get_rules_hash(rules, network_os):
+    """Return a fingerprint of the rules of a platform, which changes whenever any of the rules are edited.
+
+    Args:
+        rules (list): The rules of a single platform, as returned by `get_rules`.
+        network_os (str): The netutils network_os the platform is mapped to.
+
+    Returns:
+        str: The sha256 fingerprint of the rules.
+    """
+    values = [network_os, PLUGIN_CFG.get("get_custom_compliance")]
+    for rule in sorted(rules, key=lambda rule: str(rule["obj"].pk)):
+        values.extend(
+            [
+                rule["obj"].pk,
+                rule["obj"].config_ordered,
+                rule["obj"].config_type,
+                rule["obj"].match_config,
+                rule["obj"].last_updated,
+            ]
+        )
+    return get_hash(*values)
+
+
+def get_changed_devices(  # pylint: disable=too-many-arguments
+    queryset, logger, global_settings, rules, changed_files, routes=None
+):
+    """Narrow down the devices of a job to the ones affected by the files changed in the backup or intended repositories.
+
+    A Jinja path template can not be reversed in a generic way, so the templates are rendered for each device, and
+    the results are looked up in the changed files. Devices of platforms whose rules changed since their last
+    compliance run are kept as well, since their results are stale even without any change in the files.
+
+    Args:
+        queryset (QuerySet): The Device queryset of the job.
+        logger (NornirLogger): Logger to log messages to.
+        global_settings (GoldenConfigSetting): The settings for GoldenConfigPlugin.
+        rules (dict): The rules per platform slug, as returned by `get_rules`.
+        changed_files (list): The absolute path of the files changed in the backup and intended repositories.
+        routes (dict): The routing table per repository type, as returned by `get_repository_routes`.
+
+    Returns:
+        QuerySet: The Device queryset limited to the devices that need a compliance run.
+    """
+    changed_files = set(changed_files)
+    routes = routes or {}
+    rules_hashes = {
+        platform: get_rules_hash(platform_rules, get_platform(platform)) for platform, platform_rules in rules.items()
+    }
+    stored_rules_hashes = dict(
+        GoldenConfig.objects.filter(device__in=queryset).values_list("device_id", "compliance_rules_hash")
+    )
+
+    device_ids = []
+    for obj in queryset.select_related("platform"):
+        if stored_rules_hashes.get(obj.pk) != rules_hashes.get(obj.platform.slug):
+            device_ids.append(obj.pk)
+            continue
+        for repo_type in ["backup", "intended"]:
+            try:
+                directory = get_repository_working_dir(repo_type, obj, logger, global_settings, routes.get(repo_type))
+                path = render_jinja_template(obj, logger, getattr(global_settings, f"{repo_type}_path_template"))
+            except NornirNautobotException:
+                # Keep the device, so the error is reported by the compliance task of the device.
+                directory = None
+            if not directory or os.path.join(directory, path) in changed_files:
+                device_ids.append(obj.pk)
+                break
+
+    logger.log_debug(f"Running compliance for {len(device_ids)} device(s) affected by the changed files or rules.")
+    return queryset.filter(pk__in=device_ids)
+
+
+def read_device_config(  # pylint: disable=too-many-arguments
+    repo_type, obj, logger, global_settings, reader=None, routes=None
+):
+    """Locate and read the backup or intended configuration of a device.
+
+    Args:
+        repo_type (str): Either `intended` or `backup` repository
+        obj (Device): The device whose configuration is read.
+        logger (NornirLogger): Logger to log messages to.
+        global_settings (GoldenConfigSetting): The settings for GoldenConfigPlugin.
+        reader (GitObjectReader): Reads the configuration from a git revision, when None from the working tree.
+        routes (dict): The routing table of the repository type, as returned by `get_repository_routes`.
+
+    Returns:
+        tuple: The path of the file, its text as compared, and its content when read from a git revision.
+    """
+    directory = get_repository_working_dir(repo_type, obj, logger, global_settings, routes)
+    path_template_obj = render_jinja_template(obj, logger, getattr(global_settings, f"{repo_type}_path_template"))
+    config_file = os.path.join(directory, path_template_obj)
+    if reader:
+        content = reader.read(directory, config_file)
+        if content is None:
+            logger.log_failure(
+                obj, f"Unable to locate {repo_type} file for device at {config_file} in revision `{reader.revision}`"
+            )
+            raise NornirNautobotException()
+        return config_file, content.strip(), content
+    if not os.path.exists(config_file):
+        logger.log_failure(obj, f"Unable to locate {repo_type} file for device at {config_file}")
+        raise NornirNautobotException()
+    return config_file, _open_file_config(config_file), None
+
+
+def diff_files(backup_file, intended_file, backup_content=None, intended_content=None):
+    """Utility function to provide `Unix Diff` between two files, bounded by the `compliance_diff_max_*` settings.
+
+    When provided, the contents are diffed instead of the files, e.g. when read from a git revision. The diff is
+    always truncated, after `DEFAULT_MAX_LINES` lines when the `compliance_diff_max_lines` setting is not set.
+    """
+    with (io.StringIO(backup_content) if backup_content is not None else open(backup_file)) as bkup, (
+        io.StringIO(intended_content) if intended_content is not None else open(intended_file)
+    ) as intended:
+        yield from unified_diff(
+            bkup,
+            intended,
+            max_seconds=PLUGIN_CFG.get("compliance_diff_max_seconds"),
+            max_lines=PLUGIN_CFG.get("compliance_diff_max_lines") or DEFAULT_MAX_LINES,
+        )
 
 
-def diff_files(backup_file, intended_file):
-    """Utility function to provide `Unix Diff` between two files."""
-    bkup = open(backup_file).readlines()
-    intended = open(intended_file).readlines()
+def compute_device_compliance(  # pylint: disable=too-many-arguments
+    network_os,
+    features,
+    backup_text,
+    intended_text,
+    backup_file,
+    intended_file,
+    backup_content=None,
+    intended_content=None,
+):
+    """Compute the CPU bound part of the compliance of a device, without any access to the database.
 
-    for line in difflib.unified_diff(bkup, intended, lineterm=""):
-        yield line
+    Only plain data goes in and out, so the function can be submitted to a process pool.
+
+    Args:
+        network_os (str): Device network operating system that is in netutils parser_map keys.
+        features (list): A dictionary per rule, with the `ordered`, `section` and `cli` attributes of the rule.
+        backup_text (str): The backup configuration of the device.
+        intended_text (str): The intended configuration of the device.
+        backup_file (str): The path of the backup configuration, used for the unified diff.
+        intended_file (str): The path of the intended configuration, used for the unified diff.
+        backup_content (str): The backup configuration as read from a git revision, diffed instead of the file.
+        intended_content (str): The intended configuration as read from a git revision, diffed instead of the file.
+
+    Returns:
+        tuple: A dictionary per feature, in the same order, with the `actual` and `intended` sections and, for CLI
+            features, the compliance details; and the unified diff of the backup and intended files.
+    """
+    # Each configuration is parsed once, and every rule is sectioned from the already parsed lines.
+    backup_cfg = ParsedConfig(backup_text, network_os)
+    intended_cfg = ParsedConfig(intended_text, network_os)
+
+    results = []
+    for feature in features:
+        actual = backup_cfg.section(feature["section"])
+        intended = intended_cfg.section(feature["section"])
+        result = {"actual": str(actual), "intended": str(intended)}
+        if feature["cli"]:
+            result.update(cli_compliance(feature, actual, intended, network_os))
+        results.append(result)
+    return results, "\n".join(diff_files(backup_file, intended_file, backup_content, intended_content))
+
+
+def get_compliance_executor(logger, workers):
+    """Return a process pool to compute the compliance of the devices with, or None to compute it in the job.
+
+    Args:
+        logger (NornirLogger): Logger to log messages to.
+        workers (int): The number of processes of the pool, the pool is disabled with 0.
+
+    Returns:
+        ProcessPoolExecutor: The started process pool, None when disabled or not supported by the worker.
+    """
+    if not workers:
+        return None
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Ensure processes can be spawned, e.g. daemonic Celery prefork workers are not allowed to have children.
+        executor.submit(int).result()
+    except (AssertionError, OSError) as error:
+        executor.shutdown(wait=False)
+        logger.log_warning(None, f"Unable to start the compliance process pool, running in the job instead: {error}")
+        return None
+    return executor
+
+
+def persist_compliance(obj, compliance_objs, request, history=None):
+    """Write the compliance results of a device with bulk queries instead of an `update_or_create` per rule.
+
+    Args:
+        obj (Device): The device the compliance results belong to.
+        compliance_objs (list): Unsaved ConfigCompliance instances, with `compliance_on_save` already called.
+        request (WSGIRequest): The request of the Nautobot Job, used to record the change log entries.
+        history (ComplianceHistoryRecorder): Records the transitions of the results, written once the job is done.
+    """
+    existing = {
+        compliance_obj.rule_id: compliance_obj
+        for compliance_obj in ConfigCompliance.objects.filter(
+            device=obj, rule__in=[compliance_obj.rule for compliance_obj in compliance_objs]
+        )
+    }
+    now = timezone.now()
+    to_create, to_update = [], []
+    for compliance_obj in compliance_objs:
+        current_obj = existing.get(compliance_obj.rule_id)
+        if not current_obj:
+            if history:
+                history.record(obj, compliance_obj)
+            to_create.append(compliance_obj)
+            continue
+        if all(getattr(current_obj, field) == getattr(compliance_obj, field) for field in COMPLIANCE_HASH_FIELDS):
+            # Computed from the same actual, intended and rule as the stored results, there is nothing to write.
+            continue
+        if history:
+            history.record(obj, compliance_obj, current_obj)
+        for field in COMPLIANCE_FIELDS:
+            setattr(current_obj, field, getattr(compliance_obj, field))
+        # `bulk_update` does not honor `auto_now`, so it is set explicitly.
+        current_obj.last_updated = now
+        current_obj.rule = compliance_obj.rule
+        current_obj.device = obj
+        to_update.append(current_obj)
+
+    with transaction.atomic():
+        store_blob_contents(to_update + to_create)
+        ConfigCompliance.objects.bulk_update(
+            to_update, ConfigCompliance.get_concrete_fields(COMPLIANCE_FIELDS) + ["last_updated"]
+        )
+        ConfigCompliance.objects.bulk_create(to_create)
+        if to_update or to_create:
+            update_device_summary(obj.pk)
+            # The bulk queries do not send the signals the cached compliance matrices are invalidated with.
+            invalidate_compliance_matrices()
+
+    bulk_change_log(to_update, ObjectChangeActionChoices.ACTION_UPDATE, request)
+    bulk_change_log(to_create, ObjectChangeActionChoices.ACTION_CREATE, request)
 
 
 def run_compliance(  # pylint: disable=too-many-arguments,too-many-locals
@@ -58,38 +310,43 @@ def run_compliance(  # pylint: disable=too-many-arguments,too-many-locals
     logger,
     global_settings,
     rules,
+    status,
+    request=None,
+    force=False,
+    executor=None,
+    reader=None,
+    history=None,
+    routes=None,
 ) -> Result:
     """Prepare data for compliance task.
 
     Args:
         task (Task): Nornir task individual object
+        logger (NornirLogger): Logger to log messages to.
+        global_settings (GoldenConfigSetting): The settings for GoldenConfigPlugin.
+        rules (dict): The rules per platform slug, as returned by `get_rules`.
+        status (StatusTracker): Tracks the `GoldenConfig` status of the devices of the job.
+        request (WSGIRequest): The request of the Nautobot Job, used to record the change log entries.
+        force (bool): Run the compliance even when the backup, intended and rules are unchanged since the last run.
+        executor (ProcessPoolExecutor): The process pool to compute the compliance in, when None it is computed inline.
+        reader (GitObjectReader): Reads the configurations from a git revision, when None from the working trees.
+        history (ComplianceHistoryRecorder): Records the transitions of the results, written once the job is done.
+        routes (dict): The routing table per repository type, as returned by `get_repository_routes`.
 
     Returns:
         result (Result): Result from Nornir task
     """
     obj = task.host.data["obj"]
+    routes = routes or {}
 
-    compliance_obj = GoldenConfig.objects.filter(device=obj).first()
-    if not compliance_obj:
-        compliance_obj = GoldenConfig.objects.create(device=obj)
-    compliance_obj.compliance_last_attempt_date = task.host.defaults.data["now"]
-    compliance_obj.save()
+    compliance_obj = status.get(obj)
 
-    intended_directory = get_repository_working_dir("intended", obj, logger, global_settings)
-
-    intended_path_template_obj = render_jinja_template(obj, logger, global_settings.intended_path_template)
-    intended_file = os.path.join(intended_directory, intended_path_template_obj)
-    if not os.path.exists(intended_file):
-        logger.log_failure(obj, f"Unable to locate intended file for device at {intended_file}")
-        raise NornirNautobotException()
-
-    backup_directory = get_repository_working_dir("backup", obj, logger, global_settings)
-
-    backup_template = render_jinja_template(obj, logger, global_settings.backup_path_template)
-    backup_file = os.path.join(backup_directory, backup_template)
-    if not os.path.exists(backup_file):
-        logger.log_failure(obj, f"Unable to locate backup file for device at {backup_file}")
-        raise NornirNautobotException()
+    intended_file, intended_text, intended_content = read_device_config(
+        "intended", obj, logger, global_settings, reader, routes.get("intended")
+    )
+    backup_file, backup_text, backup_content = read_device_config(
+        "backup", obj, logger, global_settings, reader, routes.get("backup")
+    )
 
     platform = obj.platform.slug
     if not rules.get(platform):
@@ -100,39 +357,96 @@ def run_compliance(  # pylint: disable=too-many-arguments,too-many-locals
         logger.log_failure(obj, f"There is currently no parser support for platform slug `{get_platform(platform)}`.")
         raise NornirNautobotException()
 
-    backup_cfg = _open_file_config(backup_file)
-    intended_cfg = _open_file_config(intended_file)
-
-    # TODO: Make this atomic with compliance_obj step.
-    for rule in rules[obj.platform.slug]:
-        # using update_or_create() method to conveniently update actual obj or create new one.
-        ConfigCompliance.objects.update_or_create(
-            device=obj,
-            rule=rule["obj"],
-            defaults={
-                "actual": section_config(rule, backup_cfg, get_platform(platform)),
-                "intended": section_config(rule, intended_cfg, get_platform(platform)),
-                "missing": "",
-                "extra": "",
-            },
+    backup_hash = get_hash(backup_text)
+    intended_hash = get_hash(intended_text)
+    rules_hash = get_rules_hash(rules[platform], get_platform(platform))
+    if (
+        not force
+        and compliance_obj.compliance_last_success_date
+        and compliance_obj.compliance_backup_hash == backup_hash
+        and compliance_obj.compliance_intended_hash == intended_hash
+        and compliance_obj.compliance_rules_hash == rules_hash
+        # Ensure the results were not deleted since the last run.
+        and ConfigCompliance.objects.filter(device=obj, rule__in=[rule["obj"] for rule in rules[platform]]).count()
+        == len(rules[platform])
+    ):
+        status.success(obj)
+        logger.log_success(
+            obj, "Backup, intended and rules are unchanged since the last run, compliance is up to date."
         )
-
-    compliance_obj.compliance_last_success_date = task.host.defaults.data["now"]
-    compliance_obj.compliance_config = "\n".join(diff_files(backup_file, intended_file))
-    compliance_obj.save()
+        return Result(host=task.host)
+
+    features = [
+        {
+            "ordered": rule["ordered"],
+            "section": rule["section"],
+            "cli": rule["obj"].config_type == ComplianceRuleTypeChoice.TYPE_CLI,
+        }
+        for rule in rules[platform]
+    ]
+    compute_args = (
+        get_platform(platform),
+        features,
+        backup_text,
+        intended_text,
+        backup_file,
+        intended_file,
+        backup_content,
+        intended_content,
+    )
+    if executor:
+        results, compliance_config = executor.submit(compute_device_compliance, *compute_args).result()
+    else:
+        results, compliance_config = compute_device_compliance(*compute_args)
+
+    # Compute every rule for the device in memory, the results are then written with bulk queries.
+    rule_compliance_objs = []
+    for rule, feature, result in zip(rules[platform], features, results):
+        rule_compliance_obj = ConfigCompliance(device=obj, rule=rule["obj"], **{"missing": "", "extra": "", **result})
+        if not feature["cli"]:
+            # JSON and custom rules are not CPU bound on the parsing, and may rely on the ORM, keep them here.
+            rule_compliance_obj.compliance_on_save()
+        else:
+            rule_compliance_obj.update_compliance_hashes()
+        rule_compliance_objs.append(rule_compliance_obj)
+    persist_compliance(obj, rule_compliance_objs, request, history)
+
+    status.success(
+        obj,
+        compliance_config=compliance_config,
+        compliance_backup_hash=backup_hash,
+        compliance_intended_hash=intended_hash,
+        compliance_rules_hash=rules_hash,
+    )
     logger.log_success(obj, "Successfully tested compliance job.")
 
     return Result(host=task.host)
 
 
 def config_compliance(job_result, data):
-    """Nornir play to generate configurations."""
+    """Nornir play to generate configurations.
+
+    When `data` provides `changed_files`, the absolute path of the files changed in the backup and intended
+    repositories, the compliance only runs for the devices affected by those changes. When `data` provides a
+    `revision`, or the `compliance_read_from_git` setting is enabled, the configurations are read from that revision,
+    respectively `HEAD`, of the repositories rather than from their working trees.
+    """
     now = datetime.now()
     rules = get_rules()
     logger = NornirLogger(__name__, job_result, data.get("debug"))
     global_settings = GoldenConfigSetting.objects.first()
     verify_global_settings(logger, global_settings, ["backup_path_template", "intended_path_template"])
+    executor = get_compliance_executor(logger, PLUGIN_CFG.get("compliance_process_workers", 0))
+    revision = data.get("revision") or ("HEAD" if PLUGIN_CFG.get("compliance_read_from_git") else None)
+    reader = GitObjectReader(revision) if revision else None
+    history = ComplianceHistoryRecorder()
     try:
+        routes = {repo_type: get_repository_routes(repo_type, global_settings) for repo_type in ["backup", "intended"]}
+        queryset = get_job_filter(data)
+        if data.get("changed_files") is not None:
+            queryset = get_changed_devices(queryset, logger, global_settings, rules, data["changed_files"], routes)
+        status = StatusTracker("compliance", queryset, now, getattr(job_result, "request", None))
+        status.start()
         with InitNornir(
             runner=NORNIR_SETTINGS.get("runner"),
             logging={"enabled": False},
@@ -141,7 +455,15 @@ def config_compliance(job_result, data):
                 "options": {
                     "credentials_class": NORNIR_SETTINGS.get("credentials"),
                     "params": NORNIR_SETTINGS.get("inventory_params"),
-                    "queryset": get_job_filter(data),
+                    "queryset": get_job_queryset(
+                        queryset,
+                        [
+                            global_settings.backup_path_template,
+                            global_settings.intended_path_template,
+                            global_settings.backup_match_rule,
+                            global_settings.intended_match_rule,
+                        ],
+                    ),
                     "defaults": {"now": now},
                 },
             },
@@ -155,10 +477,25 @@ def config_compliance(job_result, data):
                 logger=logger,
                 global_settings=global_settings,
                 rules=rules,
+                status=status,
+                request=getattr(job_result, "request", None),
+                force=data.get("force", False),
+                executor=executor,
+                reader=reader,
+                history=history,
+                routes=routes,
             )
+        status.finish()
 
     except Exception as err:
         logger.log_failure(None, err)
         raise
+    finally:
+        # The results written so far are recorded, even when the job failed.
+        history.save()
+        if executor:
+            executor.shutdown()
+        if reader:
+            reader.close()
 
     logger.log_debug("Completed compliance job for devices.")
@@ -9,6 +9,7 @@ from nornir.core.plugins.inventory import InventoryPluginRegister
 from nornir.core.task import Result, Task
 
 from django_jinja.backend import Jinja2
+from graphql.error import GraphQLSyntaxError
 
 from nornir_nautobot.exceptions import NornirNautobotException
 from nornir_nautobot.plugins.tasks.dispatcher import dispatcher
@@ -18,15 +19,19 @@ from nautobot_plugin_nornir.plugins.inventory.nautobot_orm import NautobotORMInv
 from nautobot_plugin_nornir.constants import NORNIR_SETTINGS
 from nautobot_plugin_nornir.utils import get_dispatcher
 
-from nautobot_golden_config.models import GoldenConfigSetting, GoldenConfig
+from nautobot_golden_config.models import GoldenConfigSetting
 from nautobot_golden_config.utilities.helper import (
     get_job_filter,
+    get_job_queryset,
+    get_repository_routes,
     get_repository_working_dir,
     verify_global_settings,
     render_jinja_template,
 )
-from nautobot_golden_config.utilities.graphql import graph_ql_query
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+from nautobot_golden_config.utilities.graphql import BatchedSotAggQuery, graph_ql_query
 from nautobot_golden_config.nornir_plays.processor import ProcessGoldenConfig
+from nautobot_golden_config.utilities.bulk import StatusTracker
 
 InventoryPluginRegister.register("nautobot-inventory", NautobotORMInventory)
 LOGGER = logging.getLogger(__name__)
@@ -36,7 +41,7 @@ jinja_env = jinja_settings.env
 
 
 def run_template(  # pylint: disable=too-many-arguments
-    task: Task, logger, global_settings, nautobot_job, jinja_root_path
+    task: Task, logger, global_settings, nautobot_job, jinja_root_path, status, sot_agg=None, routes=None
 ) -> Result:
     """Render Jinja Template.
 
@@ -48,24 +53,24 @@ def run_template(  # pylint: disable=too-many-arguments
         global_settings (GoldenConfigSetting): The settings for GoldenConfigPlugin.
         nautobot_job (Result): The the output from the Nautobot Job instance being run.
         jinja_root_path (str): The root path to the Jinja2 intended config file.
+        status (StatusTracker): Tracks the `GoldenConfig` status of the devices of the job.
+        sot_agg (BatchedSotAggQuery): Runs the GraphQL query for chunks of devices, when None it is run per device.
+        routes (dict): The routing table of the intended repositories, as returned by `get_repository_routes`.
 
     Returns:
         result (Result): Result from Nornir task
     """
     obj = task.host.data["obj"]
 
-    intended_obj = GoldenConfig.objects.filter(device=obj).first()
-    if not intended_obj:
-        intended_obj = GoldenConfig.objects.create(device=obj)
-    intended_obj.intended_last_attempt_date = task.host.defaults.data["now"]
-    intended_obj.save()
-
-    intended_directory = get_repository_working_dir("intended", obj, logger, global_settings)
+    intended_directory = get_repository_working_dir("intended", obj, logger, global_settings, routes)
     intended_path_template_obj = render_jinja_template(obj, logger, global_settings.intended_path_template)
     output_file_location = os.path.join(intended_directory, intended_path_template_obj)
 
     jinja_template = render_jinja_template(obj, logger, global_settings.jinja_path_template)
-    status, device_data = graph_ql_query(nautobot_job.request, obj, global_settings.sot_agg_query)
+    if sot_agg:
+        status, device_data = sot_agg.query(obj)
+    else:
+        status, device_data = graph_ql_query(nautobot_job.request, obj, global_settings.sot_agg_query)
     if status != 200:
         logger.log_failure(obj, f"The GraphQL query return a status of {str(status)} with error of {str(device_data)}")
         raise NornirNautobotException()
@@ -83,15 +88,40 @@ def run_template(  # pylint: disable=too-many-arguments
         default_drivers_mapping=get_dispatcher(),
         jinja_filters=jinja_env.filters,
     )[1].result["config"]
-    intended_obj.intended_last_success_date = task.host.defaults.data["now"]
-    intended_obj.intended_config = generated_config
-    intended_obj.save()
+    status.success(obj, written_file=output_file_location, intended_config=generated_config)
 
     logger.log_success(obj, "Successfully generated the intended configuration.")
 
     return Result(host=task.host, result=generated_config)
 
 
+def get_batched_sot_agg(nautobot_job, logger, global_settings, queryset):
+    """Return the batched GraphQL query runner when the `sot_agg_batch_size` setting is enabled.
+
+    Args:
+        nautobot_job (Result): The Nautobot Job instance being run.
+        logger (NornirLogger): Logger to log messages to.
+        global_settings (GoldenConfigSetting): The settings for GoldenConfigPlugin.
+        queryset (QuerySet): The Device queryset of the job.
+
+    Returns:
+        BatchedSotAggQuery: The batched query runner, None when disabled or the query can not be batched.
+    """
+    batch_size = PLUGIN_CFG.get("sot_agg_batch_size", 0)
+    if not batch_size:
+        return None
+    try:
+        return BatchedSotAggQuery(
+            nautobot_job.request,
+            list(queryset.values_list("pk", flat=True)),
+            global_settings.sot_agg_query,
+            batch_size,
+        )
+    except (ValueError, GraphQLSyntaxError) as error:
+        logger.log_warning(None, f"Unable to batch the GraphQL query, running it per device instead: {error}")
+        return None
+
+
 def config_intended(nautobot_job, data, jinja_root_path):
     """
     Nornir play to generate configurations.
@@ -102,13 +132,17 @@ def config_intended(nautobot_job, data, jinja_root_path):
         jinja_root_path (str): The root path to the Jinja2 intended config file.
 
     Returns:
-        None: Intended configuration files are written to filesystem.
+        list: The intended configuration files written to the filesystem.
     """
     now = datetime.now()
     logger = NornirLogger(__name__, nautobot_job, data.get("debug"))
     global_settings = GoldenConfigSetting.objects.first()
     verify_global_settings(logger, global_settings, ["jinja_path_template", "intended_path_template", "sot_agg_query"])
     try:
+        queryset = get_job_filter(data)
+        sot_agg = get_batched_sot_agg(nautobot_job, logger, global_settings, queryset)
+        status = StatusTracker("intended", queryset, now, nautobot_job.request)
+        status.start()
         with InitNornir(
             runner=NORNIR_SETTINGS.get("runner"),
             logging={"enabled": False},
@@ -117,7 +151,14 @@ def config_intended(nautobot_job, data, jinja_root_path):
                 "options": {
                     "credentials_class": NORNIR_SETTINGS.get("credentials"),
                     "params": NORNIR_SETTINGS.get("inventory_params"),
-                    "queryset": get_job_filter(data),
+                    "queryset": get_job_queryset(
+                        queryset,
+                        [
+                            global_settings.intended_path_template,
+                            global_settings.intended_match_rule,
+                            global_settings.jinja_path_template,
+                        ],
+                    ),
                     "defaults": {"now": now},
                 },
             },
@@ -133,8 +174,14 @@ def config_intended(nautobot_job, data, jinja_root_path):
                 global_settings=global_settings,
                 nautobot_job=nautobot_job,
                 jinja_root_path=jinja_root_path,
+                status=status,
+                sot_agg=sot_agg,
+                routes=get_repository_routes("intended", global_settings),
             )
+        status.finish()
 
     except Exception as err:
         logger.log_failure(None, err)
         raise
+
+    return status.written_files
@@ -0,0 +1,115 @@
+"""Signal handlers for nautobot_golden_config."""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from nautobot.dcim.models import Device, Platform
+
+from nautobot_golden_config.models import (
+    ComplianceFeature,
+    ComplianceRule,
+    ConfigCompliance,
+    GoldenConfigSetting,
+    get_scope_queryset,
+)
+from nautobot_golden_config.utilities.compliance_matrix import invalidate_compliance_matrices
+from nautobot_golden_config.utilities.compliance_summary import update_device_summary
+from nautobot_golden_config.utilities.helper import get_jinja_template
+from nautobot_golden_config.utilities.rules import invalidate_rule_index
+
+# The Device fields the compliance results are shown or filtered with, see `ConfigComplianceFilterSet`.
+DEVICE_COMPLIANCE_FIELDS = (
+    "name",
+    "site_id",
+    "tenant_id",
+    "rack_id",
+    "device_role_id",
+    "device_type_id",
+    "platform_id",
+    "status_id",
+)
+
+
+@receiver(post_save, sender=GoldenConfigSetting)
+def clear_settings_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Drop the compiled path and matching rule templates, and the validated scopes, when the settings are saved."""
+    get_jinja_template.cache_clear()
+    get_scope_queryset.cache_clear()
+
+
+@receiver(post_save, sender=ComplianceRule)
+@receiver(post_delete, sender=ComplianceRule)
+@receiver(post_save, sender=ComplianceFeature)
+@receiver(post_save, sender=Platform)
+def clear_rule_index(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Drop the index of the compliance rules when a rule, or the feature or platform it is indexed with, changes.
+
+    The index is dropped right away for this process, and again once committed, so the other processes can not rebuild
+    it from the data of before the transaction.
+    """
+    invalidate_rule_index()
+    transaction.on_commit(invalidate_rule_index)
+
+
+@receiver(post_save, sender=ConfigCompliance)
+@receiver(post_delete, sender=ConfigCompliance)
+def update_compliance_summary(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Count the saved or deleted result of a device in the compliance summaries."""
+    update_device_summary(instance.device_id)
+
+
+@receiver(post_save, sender=ConfigCompliance)
+@receiver(post_delete, sender=ConfigCompliance)
+@receiver(post_save, sender=ComplianceFeature)
+@receiver(post_delete, sender=ComplianceFeature)
+@receiver(post_save, sender=ComplianceRule)
+def clear_compliance_matrices(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Drop the cached compliance matrices when a result, or the rule or feature it is reported with, changes."""
+    invalidate_compliance_matrices()
+
+
+@receiver(pre_delete, sender=Device)
+def remove_device_compliance_summary(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Remove the results of a device from the compliance summaries, before they are deleted along with it."""
+    update_device_summary(instance.pk, deleted=True)
+
+
+@receiver(pre_save, sender=Device)
+def check_device_compliance_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Record which of the fields the compliance results are shown or filtered with change, once the device is saved."""
+    previous = Device.objects.filter(pk=instance.pk).values(*DEVICE_COMPLIANCE_FIELDS).first()
+    instance._compliance_changed = {  # pylint: disable=protected-access
+        field for field in DEVICE_COMPLIANCE_FIELDS if previous and previous[field] != getattr(instance, field)
+    }
+
+
+@receiver(post_save, sender=Device)
+def move_device_compliance_summary(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    """Count the results of a device in the summary of its new site, and drop the matrices, when the device changed.
+
+    A new device has no results yet, and a device saved without any of the `DEVICE_COMPLIANCE_FIELDS` changed is
+    reported the same, nothing is done for them.
+    """
+    changed = getattr(instance, "_compliance_changed", set())
+    if created or not changed:
+        return
+    if "site_id" in changed:
+        update_device_summary(instance.pk)
+    invalidate_compliance_matrices()
+
+
+@receiver(pre_save, sender=ComplianceRule)
+def check_rule_feature_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Flag a rule moved to another feature, its results are then counted with the new feature once it is saved."""
+    instance._feature_changed = (  # pylint: disable=protected-access
+        ComplianceRule.objects.filter(pk=instance.pk).exclude(feature_id=instance.feature_id).exists()
+    )
+
+
+@receiver(post_save, sender=ComplianceRule)
+def move_rule_compliance_summary(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Count the results of a rule moved to another feature with the new feature."""
+    if getattr(instance, "_feature_changed", False):
+        for device_id in ConfigCompliance.objects.filter(rule=instance).order_by().values_list("device_id", flat=True):
+            update_device_summary(device_id)
@@ -19,7 +19,7 @@ ALL_ACTIONS = """
     {% if record.configcompliance_set.first.rule.config_type == 'json' %}
         <i class="mdi mdi-circle-small"></i>
     {% else %}
-        {% if record.goldenconfig_set.first.backup_config %}
+        {% if record.goldenconfig_set.first.backup_config_blob_id %}
             <a value="{% url 'plugins:nautobot_golden_config:configcompliance_details' pk=record.pk config_type='backup' %}" class="openBtn" data-href="{% url 'plugins:nautobot_golden_config:configcompliance_details' pk=record.pk config_type='backup' %}?modal=true">
                 <i class="mdi mdi-file-document-outline" title="Backup Configuration"></i>
             </a>
@@ -32,7 +32,7 @@ ALL_ACTIONS = """
     {% if record.configcompliance_set.first.rule.config_type == 'json' %}
         <i class="mdi mdi-circle-small"></i>
     {% else %}
-        {% if record.goldenconfig_set.first.intended_config %}
+        {% if record.goldenconfig_set.first.intended_config_blob_id %}
             <a value="{% url 'plugins:nautobot_golden_config:configcompliance_details' pk=record.pk config_type='intended' %}" class="openBtn" data-href="{% url 'plugins:nautobot_golden_config:configcompliance_details' pk=record.pk config_type='intended' %}?modal=true">
                 <i class="mdi mdi-text-box-check-outline" title="Intended Configuration"></i>
             </a>
@@ -47,7 +47,7 @@ ALL_ACTIONS = """
                 <i class="mdi mdi-file-compare" title="Compliance Details JSON"></i>
             </a>
     {% else %}
-        {% if record.goldenconfig_set.first.compliance_config %}
+        {% if record.goldenconfig_set.first.compliance_config_blob_id %}
             <a value="{% url 'plugins:nautobot_golden_config:configcompliance_details' pk=record.pk config_type='compliance' %}" class="openBtn" data-href="{% url 'plugins:nautobot_golden_config:configcompliance_details' pk=record.pk config_type='compliance' %}?modal=true">
                 <i class="mdi mdi-file-compare" title="Compliance Details"></i>
             </a>
@@ -1,8 +1,8 @@
 """Added content to the device model view for config compliance."""
-from django.db.models import Count, Q
 from nautobot.extras.plugins import PluginTemplateExtension
 
 from nautobot_golden_config.models import ConfigCompliance, GoldenConfig
+from nautobot_golden_config.utilities.compliance_summary import get_site_summary
 from nautobot_golden_config.utilities.constant import ENABLE_COMPLIANCE, CONFIG_FEATURES
 
 
@@ -40,17 +40,7 @@ class ConfigComplianceSiteCheck(PluginTemplateExtension):  # pylint: disable=abs
 
     def right_page(self):
         """Content to add to the configuration compliance."""
-        comp_obj = (
-            ConfigCompliance.objects.values("rule__feature__name")
-            .filter(device__site__slug=self.get_site_slug().slug)
-            .annotate(
-                count=Count("rule__feature__name"),
-                compliant=Count("rule__feature__name", filter=Q(compliance=True)),
-                non_compliant=Count("rule__feature__name", filter=~Q(compliance=True)),
-            )
-            .order_by("rule__feature__name")
-            .values("rule__feature__name", "compliant", "non_compliant")
-        )
+        comp_obj = get_site_summary(self.get_site_slug())
         extra_context = {"compliance": comp_obj, "template_type": "site"}
         return self.render(
             "nautobot_golden_config/content_template.html",
@@ -1,4 +1,6 @@
 """Unit tests for nautobot_golden_config."""
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
 
 from django.urls import reverse
@@ -6,6 +8,9 @@ from rest_framework import status
 
 from nautobot.utilities.testing import APITestCase
 
+from nautobot_golden_config.models import ConfigCompliance
+from nautobot_golden_config.utilities.compliance_history import ComplianceHistoryRecorder
+
 from .conftest import create_device, create_feature_rule_json, create_config_compliance
 
 
@@ -81,3 +86,31 @@ class GoldenConfigAPITest(APITestCase):  # pylint: disable=too-many-ancestors
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertFalse(response.data["compliance"])
+
+    def test_config_compliance_history_trend(self):
+        """Verify the compliance trend is aggregated from the recorded transitions."""
+        # Saving the result records its first transition.
+        compliance = create_config_compliance(
+            self.device, actual={"foo": 1}, intended={"foo": 2}, compliance_rule=self.compliance_rule_json
+        )
+        compliant = ConfigCompliance(
+            device=self.device, rule=self.compliance_rule_json, actual={"foo": 2}, intended={"foo": 2}
+        )
+        compliant.compliance_on_save()
+        second = ComplianceHistoryRecorder(compliance.last_updated + timedelta(hours=1))
+        second.record(self.device, compliant, compliance)
+        second.record(self.device, compliant, compliant)
+        second.save()
+
+        self.add_permissions("nautobot_golden_config.view_configcompliancehistory")
+        url = reverse("plugins-api:nautobot_golden_config-api:configcompliancehistory-trend")
+        response = self.client.get(f"{url}?feature=foo", **self.header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(point["count"], point["compliant"], point["non_compliant"]) for point in response.data],
+            [(1, 0, 1), (1, 1, 0)],
+        )
+        response = self.client.get(url, {"start": second.timestamp.isoformat()}, **self.header)
+        self.assertEqual([point["compliant"] for point in response.data], [1])
+        response = self.client.get(url, {"end": compliance.last_updated.isoformat()}, **self.header)
+        self.assertEqual([point["compliant"] for point in response.data], [0])
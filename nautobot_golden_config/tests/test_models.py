@@ -1,6 +1,9 @@
 """Unit tests for nautobot_golden_config models."""
 
+from datetime import timedelta
 from json import loads as json_loads
+from unittest.mock import Mock, patch
+
 from django.test import TestCase
 from django.db.utils import IntegrityError
 from django.core.exceptions import ValidationError
@@ -8,8 +11,14 @@ from nautobot.dcim.models import Platform
 from nautobot.extras.models import GitRepository
 from nautobot_golden_config.tests.conftest import create_git_repos
 
+from nautobot_golden_config.choices import ComplianceRuleTypeChoice
 from nautobot_golden_config.models import (
+    BLOB_GRACE_PERIOD,
+    FUNC_MAPPER,
+    ConfigBlob,
     ConfigCompliance,
+    ConfigComplianceHistory,
+    GoldenConfig,
     GoldenConfigSetting,
     ConfigRemove,
     ConfigReplace,
@@ -74,10 +83,110 @@ class ConfigComplianceModelTestCase(TestCase):
         self.assertEqual(cc_obj.missing, "")
         self.assertEqual(cc_obj.extra, "")
 
+    def test_save_unchanged_config_compliance(self):
+        """Ensure saving unchanged configurations neither runs the compliance check, nor writes the row."""
+        cc_obj = create_config_compliance(
+            self.device, actual={"foo": "bar"}, intended={"foo": "baz"}, compliance_rule=self.compliance_rule_json
+        )
+        cc_obj = ConfigCompliance.objects.get(pk=cc_obj.pk)
+        last_updated = cc_obj.last_updated
+        compliance_func = Mock(side_effect=AssertionError("The compliance check should not run."))
+        with patch.dict(FUNC_MAPPER, {ComplianceRuleTypeChoice.TYPE_JSON: compliance_func}):
+            cc_obj.actual = {"foo": "bar"}
+            cc_obj.save()
+        self.assertEqual(ConfigCompliance.objects.get(pk=cc_obj.pk).last_updated, last_updated)
+        self.assertFalse(cc_obj.compliance)
+
+    def test_save_changed_config_compliance(self):
+        """Ensure changed configurations run the compliance check again."""
+        cc_obj = create_config_compliance(
+            self.device, actual={"foo": "bar"}, intended={"foo": "baz"}, compliance_rule=self.compliance_rule_json
+        )
+        cc_obj = ConfigCompliance.objects.get(pk=cc_obj.pk)
+        cc_obj.intended = {"foo": "bar"}
+        cc_obj.save()
+        cc_obj = ConfigCompliance.objects.get(pk=cc_obj.pk)
+        self.assertTrue(cc_obj.compliance)
+        self.assertEqual(cc_obj.intended_hash, cc_obj.get_compliance_hashes()["intended_hash"])
+
+    def test_save_config_compliance_history(self):
+        """Ensure the saved results are recorded in the history, when they are new or their state changed."""
+        cc_obj = create_config_compliance(
+            self.device, actual={"foo": "bar"}, intended={"foo": "baz"}, compliance_rule=self.compliance_rule_json
+        )
+        cc_obj = ConfigCompliance.objects.get(pk=cc_obj.pk)
+        cc_obj.intended = {"foo": "bar"}
+        cc_obj.save()
+        cc_obj = ConfigCompliance.objects.get(pk=cc_obj.pk)
+        cc_obj.save()
+        self.assertEqual(
+            list(ConfigComplianceHistory.objects.order_by("timestamp").values_list("compliance_int", flat=True)), [0, 1]
+        )
+
+    def test_configurations_stored_once(self):
+        """Ensure equal configurations of different devices reference the same blob."""
+        other_device = create_device(name="other")
+        create_config_compliance(
+            self.device, actual={"foo": "bar"}, intended={"foo": "baz"}, compliance_rule=self.compliance_rule_json
+        )
+        create_config_compliance(
+            other_device, actual={"foo": "bar"}, intended={"foo": "bar"}, compliance_rule=self.compliance_rule_json
+        )
+        self.assertEqual(ConfigBlob.objects.count(), 2)
+        self.assertEqual(
+            ConfigCompliance.objects.filter(actual_blob__isnull=False).values("actual_blob").distinct().count(), 1
+        )
+        cc_obj = ConfigCompliance.objects.get(device=self.device)
+        self.assertEqual(cc_obj.actual, {"foo": "bar"})
+        self.assertEqual(cc_obj.intended, {"foo": "baz"})
+
 
 class GoldenConfigTestCase(TestCase):
     """Test GoldenConfig Model."""
 
+    def setUp(self):
+        """Set up base objects."""
+        self.device = create_device()
+
+    def test_unchanged_configuration(self):
+        """Ensure an unchanged configuration keeps its blob, and an empty one does not reference any."""
+        config = "hostname foobaz\n" * 100
+        golden_config = GoldenConfig.objects.create(device=self.device, backup_config=config)
+        blob = ConfigBlob.objects.get()
+        self.assertLess(len(blob.data), len(config))
+        golden_config = GoldenConfig.objects.get(pk=golden_config.pk)
+        self.assertEqual(golden_config.backup_config, config)
+        self.assertEqual(golden_config.intended_config, "")
+        golden_config.backup_config = config
+        golden_config.save()
+        self.assertEqual(ConfigBlob.objects.get(), blob)
+        self.assertIsNone(GoldenConfig.objects.get(pk=golden_config.pk).intended_config_blob)
+
+    def test_delete_unreferenced(self):
+        """Ensure the blobs replaced by other configurations are deleted once the grace period is over."""
+        golden_config = GoldenConfig.objects.create(device=self.device, backup_config="hostname foo")
+        golden_config.backup_config = "hostname bar"
+        golden_config.save()
+        ConfigBlob.objects.delete_unreferenced()
+        self.assertEqual(ConfigBlob.objects.count(), 2)
+        ConfigBlob.objects.update(last_used=golden_config.last_updated - BLOB_GRACE_PERIOD - timedelta(minutes=1))
+        self.assertEqual(ConfigBlob.objects.delete_unreferenced(batch_size=1), 1)
+        self.assertEqual(ConfigBlob.objects.get(), golden_config.backup_config_blob)
+
+    def test_delete_unreferenced_referenced_meanwhile(self):
+        """Ensure a blob referenced after its batch was checked is skipped, while the others are deleted."""
+        golden_config = GoldenConfig.objects.create(device=self.device, backup_config="hostname foo")
+        ConfigBlob.objects.update(last_used=golden_config.last_updated - BLOB_GRACE_PERIOD - timedelta(minutes=1))
+        unreferenced = ConfigBlob.objects.create(
+            hash="0" * 64, data=b"hostname bar", last_used=golden_config.last_updated - BLOB_GRACE_PERIOD
+        )
+        referenced = golden_config.backup_config_blob
+        cutoff = golden_config.last_updated
+        # As if the references were looked up before the blob was referenced.
+        delete_batch = ConfigBlob.objects._delete_batch  # pylint: disable=protected-access
+        self.assertEqual(delete_batch([referenced.pk, unreferenced.pk], cutoff), 1)
+        self.assertEqual(list(ConfigBlob.objects.all()), [referenced])
+
 
 class ComplianceRuleTestCase(TestCase):
     """Test ComplianceRule Model."""
@@ -0,0 +1,168 @@
+"""Unit tests for nautobot_golden_config nornir asyncio backup engine."""
+
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from nautobot_golden_config.nornir_plays.async_backup import AsyncBackupEngine, BackupTarget, asyncssh
+from nautobot_golden_config.utilities.sanitizer import PlatformSanitizer
+
+RUNNING_CONFIG = "Building configuration...\nhostname router1\nusername admin password 7 secret\n"
+
+
+class FakeSSHServer:
+    """A local SSH server answering `show run` with `RUNNING_CONFIG`, running in its own thread and event loop."""
+
+    def __init__(self):
+        """Create the event loop of the server."""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.server = None
+        self.port = None
+
+    @staticmethod
+    def handle_process(process):
+        """Answer the command the same way a device does."""
+        if process.command == "show run":
+            process.stdout.write(RUNNING_CONFIG)
+            process.exit(0)
+        else:
+            process.stderr.write("% Invalid command\n")
+            process.exit(1)
+
+    def __enter__(self):
+        """Start the server on a random local port."""
+
+        class Server(asyncssh.SSHServer):  # pylint: disable=too-few-public-methods
+            """Accept the `admin` user with the `admin` password."""
+
+            def password_auth_supported(self):
+                return True
+
+            def validate_password(self, username, password):
+                return username == password == "admin"
+
+        async def start():
+            return await asyncssh.create_server(
+                Server,
+                "127.0.0.1",
+                0,
+                server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+                process_factory=self.handle_process,
+            )
+
+        self.thread.start()
+        self.server = asyncio.run_coroutine_threadsafe(start(), self.loop).result()
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    def __exit__(self, *args):
+        """Stop the server and its event loop."""
+        self.server.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+@unittest.skipUnless(asyncssh, "The asyncssh package is not installed.")
+class AsyncBackupEngineTest(unittest.TestCase):
+    """Test the asyncio backup engine against a local SSH server."""
+
+    def setUp(self):
+        """Start the fake server, and create the mocks of the job."""
+        self.server = FakeSSHServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        self.logger = Mock()
+        self.status = Mock()
+
+    def _target(self, name, command="show run", password="admin", port=None):
+        obj = SimpleNamespace(name=name, site_id=1, platform_id=1)
+        host = SimpleNamespace(hostname="127.0.0.1", port=port or self.server.port, username="admin", password=password)
+        return BackupTarget(
+            obj=obj,
+            host=host,
+            backup_file=os.path.join(self.tmp_dir, "site", f"{name}.cfg"),
+            command=command,
+            sanitizer=PlatformSanitizer(
+                [{"regex": r"^Building\s+configuration.*\n"}],
+                [{"regex": r"^(username\s+\S+\s+password\s+7\s+)\S+", "replace": r"\1<redacted>"}],
+            ),
+        )
+
+    def test_backup(self):
+        """Ensure the configurations are processed and written the same as the dispatcher."""
+        targets = [self._target(f"router{index}") for index in range(5)]
+        AsyncBackupEngine(self.logger, self.status, {"global": 2, "site": 1}).run(targets)
+        with open(targets[0].backup_file) as backup:
+            self.assertEqual(backup.read(), "hostname router1\nusername admin password 7 <redacted>\n")
+        self.assertEqual(self.status.success.call_count, 5)
+        self.logger.log_failure.assert_not_called()
+
+    def test_backup_failures(self):
+        """Ensure failing commands and authentication are logged, without stopping the other devices."""
+        targets = [self._target("bad-command", command="show nothing"), self._target("bad-password", password="x")]
+        targets.append(self._target("router1"))
+        AsyncBackupEngine(self.logger, self.status).run(targets)
+        self.assertEqual(self.logger.log_failure.call_count, 2)
+        self.status.success.assert_called_once()
+        self.assertEqual(self.status.success.call_args[0][0].name, "router1")
+
+    def test_backup_unexpected_errors(self):
+        """Ensure an unexpected error of a device is logged as its failure, without stopping the other devices."""
+        bad_sanitizer = self._target("bad-sanitizer")._replace(sanitizer=Mock(sanitize=Mock(side_effect=ValueError)))
+        bad_status = self._target("bad-status")
+        targets = [bad_sanitizer, bad_status, self._target("router1")]
+
+        def success(obj, **kwargs):  # pylint: disable=unused-argument
+            if obj is bad_status.obj:
+                raise RuntimeError("database error")
+
+        self.status.success.side_effect = success
+        AsyncBackupEngine(self.logger, self.status).run(targets)
+        self.assertEqual(
+            sorted(call[0][0].name for call in self.logger.log_failure.call_args_list), ["bad-sanitizer", "bad-status"]
+        )
+        self.logger.log_success.assert_called_once()
+        self.assertEqual(self.logger.log_success.call_args[0][0].name, "router1")
+
+    def test_known_hosts(self):
+        """Ensure the host keys are verified once a `known_hosts` file is set."""
+        known_hosts = os.path.join(self.tmp_dir, "known_hosts")
+        with open(known_hosts, "w") as known_hosts_file:
+            known_hosts_file.write("")
+        AsyncBackupEngine(self.logger, self.status, known_hosts=known_hosts).run([self._target("router1")])
+        self.status.success.assert_not_called()
+        self.assertIn("connection issue", self.logger.log_failure.call_args[0][1])
+
+    def test_connectivity(self):
+        """Ensure a device whose port is not reachable fails before connecting, unless the test is disabled."""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            closed_port = sock.getsockname()[1]
+        targets = [self._target("unreachable", port=closed_port), self._target("router1")]
+        AsyncBackupEngine(self.logger, self.status).run(targets)
+        self.status.success.assert_called_once()
+        self.assertIn("Could not connect to IP", self.logger.log_failure.call_args[0][1])
+
+        self.logger.reset_mock()
+        AsyncBackupEngine(self.logger, self.status, test_connectivity=False).run(targets)
+        self.assertIn("connection issue", self.logger.log_failure.call_args[0][1])
+
+    def test_database_connection_closed(self):
+        """Ensure the ORM calls are run in a single thread, whose database connection is closed once done."""
+        threads = set()
+        self.status.success.side_effect = lambda *args, **kwargs: threads.add(threading.get_ident())
+        with patch("nautobot_golden_config.nornir_plays.async_backup.connection") as mock_connection:
+            mock_connection.close.side_effect = lambda: threads.add(threading.get_ident())
+            AsyncBackupEngine(self.logger, self.status).run([self._target(f"router{index}") for index in range(3)])
+        self.assertEqual(self.status.success.call_count, 3)
+        mock_connection.close.assert_called_once()
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.get_ident(), threads)
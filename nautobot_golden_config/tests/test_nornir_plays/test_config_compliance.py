@@ -1,23 +1,236 @@
 """Unit tests for nautobot_golden_config nornir compliance."""
 
+import os
+import tempfile
 import unittest
+from datetime import datetime
 from unittest.mock import patch, Mock
-from nautobot_golden_config.nornir_plays.config_compliance import get_rules
+
+from django.test import TestCase
+
+from nautobot_golden_config.choices import ComplianceRuleTypeChoice
+from nautobot.dcim.models import Device
+
+from nautobot_golden_config.models import (
+    ComplianceFeature,
+    ComplianceRule,
+    ConfigCompliance,
+    ConfigComplianceHistory,
+    GoldenConfig,
+)
+from nautobot_golden_config.nornir_plays.config_compliance import (
+    compute_device_compliance,
+    get_changed_devices,
+    get_rules,
+    get_rules_hash,
+    persist_compliance,
+    run_compliance,
+)
+from nautobot_golden_config.tests.conftest import create_device, create_feature_rule_json
+from nautobot_golden_config.utilities.compliance_history import ComplianceHistoryRecorder
+from nautobot_golden_config.utilities.utils import get_platform
 
 
 class ConfigComplianceTest(unittest.TestCase):
     """Test Nornir Compliance Task."""
 
-    @patch("nautobot_golden_config.nornir_plays.config_compliance.ComplianceRule", autospec=True)
-    def test_get_rules(self, mock_compliance_rule):
+    @patch("nautobot_golden_config.utilities.rules.cache")
+    @patch("nautobot_golden_config.utilities.rules.ComplianceRule", autospec=True)
+    def test_get_rules(self, mock_compliance_rule, mock_cache):
         """Test proper return when Features are returned."""
-        features = {"config_ordered": "test_ordered", "match_config": "aaa\nsnmp\n"}
+        features = {"config_ordered": "test_ordered", "match_config": "aaa\nsnmp\n", "config_type": "cli"}
         mock_obj = Mock(**features)
         mock_obj.name = "test_name"
         mock_obj.platform = Mock(slug="test_slug")
-        mock_compliance_rule.objects.exclude.return_value = [mock_obj]
+        mock_compliance_rule.objects.select_related.return_value = [mock_obj]
+        mock_cache.get_or_set.return_value = "test_get_rules"
         features = get_rules()
-        mock_compliance_rule.objects.exclude.assert_called_once()
+        mock_compliance_rule.objects.select_related.assert_called_once_with("platform", "feature")
         self.assertEqual(
             features, {"test_slug": [{"obj": mock_obj, "ordered": "test_ordered", "section": ["aaa", "snmp"]}]}
         )
+
+    def test_compute_device_compliance(self):
+        """Ensure the CLI features are computed, and the other features only sectioned."""
+        backup_text = "hostname router1\nntp server 10.10.10.10"
+        intended_text = "hostname router1\nntp server 10.10.10.11"
+        features = [
+            {"ordered": True, "section": ["hostname"], "cli": True},
+            {"ordered": True, "section": ["ntp"], "cli": True},
+            {"ordered": True, "section": [], "cli": False},
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backup_file = os.path.join(tmp_dir, "backup.cfg")
+            intended_file = os.path.join(tmp_dir, "intended.cfg")
+            with open(backup_file, "w") as file:
+                file.write(backup_text)
+            with open(intended_file, "w") as file:
+                file.write(intended_text)
+            results, compliance_config = compute_device_compliance(
+                "cisco_ios", features, backup_text, intended_text, backup_file, intended_file
+            )
+        self.assertTrue(results[0]["compliance"])
+        self.assertFalse(results[1]["compliance"])
+        self.assertEqual(results[1]["missing"], "ntp server 10.10.10.11")
+        self.assertEqual(results[2], {"actual": backup_text, "intended": intended_text})
+        self.assertIn("+ntp server 10.10.10.11", compliance_config)
+
+
+class PersistComplianceTest(TestCase):
+    """Test the bulk persistence of compliance results."""
+
+    def setUp(self):
+        """Set up base objects."""
+        self.device = create_device()
+        self.rule = create_feature_rule_json(self.device)
+
+    def _compliance_obj(self, actual, intended):
+        compliance_obj = ConfigCompliance(device=self.device, rule=self.rule, actual=actual, intended=intended)
+        compliance_obj.compliance_on_save()
+        return compliance_obj
+
+    def test_persist_compliance_create(self):
+        """Ensure results without an existing row are created."""
+        persist_compliance(self.device, [self._compliance_obj({"foo": "bar"}, {"foo": "bar"})], None)
+        compliance_obj = ConfigCompliance.objects.get(device=self.device, rule=self.rule)
+        self.assertTrue(compliance_obj.compliance)
+        self.assertEqual(compliance_obj.compliance_int, 1)
+
+    def test_persist_compliance_update(self):
+        """Ensure results with an existing row update it in place."""
+        persist_compliance(self.device, [self._compliance_obj({"foo": "bar"}, {"foo": "bar"})], None)
+        original_pk = ConfigCompliance.objects.get(device=self.device, rule=self.rule).pk
+        persist_compliance(self.device, [self._compliance_obj({"foo": "bar"}, {"foo": "baz"})], None)
+        compliance_obj = ConfigCompliance.objects.get(device=self.device, rule=self.rule)
+        self.assertEqual(compliance_obj.pk, original_pk)
+        self.assertFalse(compliance_obj.compliance)
+        self.assertEqual(compliance_obj.intended, {"foo": "baz"})
+
+    def test_persist_compliance_history(self):
+        """Ensure only the new and changed results are recorded in the history."""
+        history = ComplianceHistoryRecorder()
+        for intended in ({"foo": "bar"}, {"foo": "bar"}, {"foo": "baz"}, {"foo": "qux"}):
+            persist_compliance(self.device, [self._compliance_obj({"foo": "bar"}, intended)], None, history)
+        history.save()
+        # The last result is as non-compliant as the previous one, but not with the same missing configuration.
+        self.assertEqual(sorted(ConfigComplianceHistory.objects.values_list("compliance_int", flat=True)), [0, 0, 1])
+        self.assertFalse(ConfigComplianceHistory.objects.exclude(feature=self.rule.feature, site=self.device.site))
+
+
+class RunComplianceTest(TestCase):
+    """Test the compliance task of a device."""
+
+    def setUp(self):
+        """Set up base objects."""
+        self.device = create_device()
+        self.json_rule = create_feature_rule_json(self.device)
+        self.cli_rule = ComplianceRule.objects.create(
+            feature=ComplianceFeature.objects.create(slug="hostname", name="hostname"),
+            platform=self.device.platform,
+            config_type=ComplianceRuleTypeChoice.TYPE_CLI,
+            config_ordered=True,
+            match_config="hostname",
+        )
+
+    @patch("nautobot_golden_config.nornir_plays.config_compliance.get_platform", Mock(return_value="cisco_ios"))
+    @patch("nautobot_golden_config.nornir_plays.config_compliance.read_device_config")
+    def test_json_rule_not_run(self, mock_read_device_config):
+        """Ensure the results posted through the API for a JSON rule are kept, while the CLI rules are run."""
+        ConfigCompliance.objects.create(
+            device=self.device, rule=self.json_rule, actual={"foo": "bar"}, intended={"foo": "bar"}
+        )
+        mock_read_device_config.side_effect = lambda repo_type, *args: (
+            f"{repo_type}.cfg",
+            "hostname router1",
+            "hostname router1\n",
+        )
+        task = Mock()
+        task.host.data = {"obj": self.device}
+        run_compliance(task, Mock(), Mock(), get_rules(), Mock(), force=True)
+
+        json_compliance = ConfigCompliance.objects.get(device=self.device, rule=self.json_rule)
+        self.assertEqual(json_compliance.actual, {"foo": "bar"})
+        self.assertTrue(json_compliance.compliance)
+        cli_compliance = ConfigCompliance.objects.get(device=self.device, rule=self.cli_rule)
+        self.assertEqual(cli_compliance.actual, "hostname router1")
+        self.assertTrue(cli_compliance.compliance)
+
+    @patch("nautobot_golden_config.nornir_plays.config_compliance.get_platform", Mock(return_value="cisco_ios"))
+    @patch("nautobot_golden_config.nornir_plays.config_compliance.read_device_config")
+    def test_unchanged_device_skipped(self, mock_read_device_config):
+        """Ensure a device whose backup, intended and rules are unchanged is skipped, unless forced."""
+        mock_read_device_config.side_effect = lambda repo_type, *args: (
+            f"{repo_type}.cfg",
+            "hostname router1",
+            "hostname router1\n",
+        )
+        task = Mock()
+        task.host.data = {"obj": self.device}
+        rules = get_rules()
+        status = Mock()
+        status.get.return_value = Mock(compliance_last_success_date=None)
+        run_compliance(task, Mock(), Mock(), rules, status)
+        hashes = status.success.call_args[1]
+        status.get.return_value = Mock(
+            compliance_last_success_date=datetime.now(),
+            compliance_backup_hash=hashes["compliance_backup_hash"],
+            compliance_intended_hash=hashes["compliance_intended_hash"],
+            compliance_rules_hash=hashes["compliance_rules_hash"],
+        )
+        with patch(
+            "nautobot_golden_config.nornir_plays.config_compliance.compute_device_compliance",
+            wraps=compute_device_compliance,
+        ) as mock_compute:
+            run_compliance(task, Mock(), Mock(), rules, status)
+            mock_compute.assert_not_called()
+            status.success.assert_called_with(self.device)
+            run_compliance(task, Mock(), Mock(), rules, status, force=True)
+            mock_compute.assert_called_once()
+
+
+class GetChangedDevicesTest(TestCase):
+    """Test the devices selected by an incremental compliance run."""
+
+    def setUp(self):
+        """Set up two devices, with the results of the current rules."""
+        self.device = create_device(name="router1")
+        self.other_device = create_device(name="router2")
+        ComplianceRule.objects.create(
+            feature=ComplianceFeature.objects.create(slug="hostname", name="hostname"),
+            platform=self.device.platform,
+            config_type=ComplianceRuleTypeChoice.TYPE_CLI,
+            config_ordered=True,
+            match_config="hostname",
+        )
+        self.rules = get_rules()
+        platform = self.device.platform.slug
+        rules_hash = get_rules_hash(self.rules[platform], get_platform(platform))
+        for device in [self.device, self.other_device]:
+            GoldenConfig.objects.create(device=device, compliance_rules_hash=rules_hash)
+        self.global_settings = Mock(
+            backup_match_rule="",
+            intended_match_rule="",
+            backup_path_template="{{ obj.name }}.cfg",
+            intended_path_template="{{ obj.name }}.cfg",
+        )
+        self.routes = {"backup": {"backup": "/git/backup"}, "intended": {"intended": "/git/intended"}}
+        self.queryset = Device.objects.filter(pk__in=[self.device.pk, self.other_device.pk])
+
+    def _get_changed_devices(self, changed_files):
+        queryset = get_changed_devices(
+            self.queryset, Mock(), self.global_settings, self.rules, changed_files, self.routes
+        )
+        return set(queryset.values_list("name", flat=True))
+
+    def test_changed_files(self):
+        """Ensure only the devices with a changed backup or intended file are selected."""
+        self.assertEqual(self._get_changed_devices([]), set())
+        self.assertEqual(self._get_changed_devices(["/git/backup/router1.cfg"]), {"router1"})
+        self.assertEqual(
+            self._get_changed_devices(["/git/intended/router2.cfg", "/git/backup/router3.cfg"]), {"router2"}
+        )
+
+    def test_changed_rules(self):
+        """Ensure the devices whose results were computed with other rules are selected."""
+        GoldenConfig.objects.filter(device=self.other_device).update(compliance_rules_hash="")
+        self.assertEqual(self._get_changed_devices([]), {"router2"})
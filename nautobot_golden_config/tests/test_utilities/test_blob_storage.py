@@ -0,0 +1,47 @@
+"""Unit tests for nautobot_golden_config utilities blob_storage."""
+
+import unittest
+from unittest.mock import patch
+
+from nautobot_golden_config.utilities import blob_storage
+
+
+class BlobStorageTest(unittest.TestCase):
+    """Test the encoding and compression of the config blobs."""
+
+    def test_encode_content(self):
+        """Ensure equal JSON values are encoded the same, and empty configurations are not stored."""
+        self.assertEqual(
+            blob_storage.encode_content({"b": 1, "a": [2]}, is_json=True),
+            blob_storage.encode_content({"a": [2], "b": 1}, is_json=True),
+        )
+        self.assertEqual(blob_storage.decode_content(blob_storage.encode_content({"a": ""}, True), True), {"a": ""})
+        self.assertEqual(blob_storage.encode_content({}, is_json=True), b"{}")
+        self.assertIsNone(blob_storage.encode_content(None, is_json=True))
+        self.assertIsNone(blob_storage.encode_content(""))
+        self.assertEqual(blob_storage.decode_content(memoryview(b"hostname \xc3\xa9")), "hostname é")
+
+    def test_compress(self):
+        """Ensure the contents are only stored compressed when that makes them smaller."""
+        data = b"interface Ethernet1\n description uplink\n" * 50
+        compression, compressed = blob_storage.compress(data, blob_storage.COMPRESSION_ZLIB)
+        self.assertEqual(compression, blob_storage.COMPRESSION_ZLIB)
+        self.assertLess(len(compressed), len(data))
+        self.assertEqual(blob_storage.decompress(compressed, compression), data)
+        self.assertEqual(
+            blob_storage.compress(b"x", blob_storage.COMPRESSION_ZLIB), (blob_storage.COMPRESSION_NONE, b"x")
+        )
+        self.assertEqual(
+            blob_storage.compress(data, blob_storage.COMPRESSION_NONE), (blob_storage.COMPRESSION_NONE, data)
+        )
+
+    def test_get_compression(self):
+        """Ensure zstd falls back to zlib when `zstandard` is not installed, and unknown values are rejected."""
+        with patch.dict(blob_storage.PLUGIN_CFG, {"config_blob_compression": None}):
+            self.assertEqual(blob_storage.get_compression(), blob_storage.COMPRESSION_NONE)
+        with patch.dict(blob_storage.PLUGIN_CFG, {"config_blob_compression": "zstd"}):
+            with patch.object(blob_storage, "zstandard", None):
+                self.assertEqual(blob_storage.get_compression(), blob_storage.COMPRESSION_ZLIB)
+        with patch.dict(blob_storage.PLUGIN_CFG, {"config_blob_compression": "lzma"}):
+            with self.assertRaises(ValueError):
+                blob_storage.get_compression()
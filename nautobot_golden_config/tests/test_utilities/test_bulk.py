@@ -0,0 +1,53 @@
+"""Unit tests for nautobot_golden_config utilities bulk."""
+
+from datetime import datetime
+
+from django.test import TestCase
+
+from nautobot.dcim.models import Device
+
+from nautobot_golden_config.models import GoldenConfig
+from nautobot_golden_config.tests.conftest import create_device
+from nautobot_golden_config.utilities.bulk import StatusTracker
+
+
+class StatusTrackerTest(TestCase):
+    """Test the job level GoldenConfig status tracker."""
+
+    def setUp(self):
+        """Set up base objects."""
+        self.device = create_device()
+        self.now = datetime(2021, 12, 1, 10, 0)
+
+    def test_start_creates_missing(self):
+        """Ensure a GoldenConfig is created, with the attempt date set, for the devices of the job."""
+        status = StatusTracker("backup", Device.objects.filter(pk=self.device.pk), self.now)
+        status.start()
+        golden_config = GoldenConfig.objects.get(device=self.device)
+        self.assertEqual(golden_config.backup_last_attempt_date.replace(tzinfo=None), self.now)
+        self.assertIsNone(golden_config.backup_last_success_date)
+        self.assertEqual(status.get(self.device).pk, golden_config.pk)
+        # Only the fields of the job type are kept in memory.
+        self.assertIn("intended_config_blob", status.get(self.device).get_deferred_fields())
+        self.assertNotIn("backup_last_success_date", status.get(self.device).get_deferred_fields())
+
+    def test_success_written_on_finish(self):
+        """Ensure the success date and fields are written when the job finishes."""
+        GoldenConfig.objects.create(device=self.device, backup_config="old")
+        status = StatusTracker("backup", Device.objects.filter(pk=self.device.pk), self.now)
+        status.start()
+        status.success(self.device, written_file="/backup/foobaz.cfg", backup_config="new")
+        self.assertEqual(GoldenConfig.objects.get(device=self.device).backup_config, "old")
+        self.assertEqual(status.written_files, ["/backup/foobaz.cfg"])
+        status.finish()
+        golden_config = GoldenConfig.objects.get(device=self.device)
+        self.assertEqual(GoldenConfig.objects.filter(device=self.device).count(), 1)
+        self.assertEqual(golden_config.backup_config, "new")
+        self.assertEqual(golden_config.backup_last_success_date.replace(tzinfo=None), self.now)
+
+    def test_success_written_per_batch(self):
+        """Ensure the results are written as soon as a batch is complete."""
+        status = StatusTracker("intended", Device.objects.filter(pk=self.device.pk), self.now, batch_size=1)
+        status.start()
+        status.success(self.device, intended_config="hostname foobaz")
+        self.assertEqual(GoldenConfig.objects.get(device=self.device).intended_config, "hostname foobaz")
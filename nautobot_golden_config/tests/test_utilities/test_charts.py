@@ -0,0 +1,42 @@
+"""Unit tests for nautobot_golden_config utilities charts."""
+
+import base64
+import unittest
+import urllib.parse
+import uuid
+from unittest.mock import Mock
+from xml.dom import minidom
+
+from nautobot_golden_config.utilities.charts import get_cached_charts, svg_bar_chart, svg_pie_chart
+
+
+def decode_chart(chart):
+    """Decode a chart embedded as a base64 data URL."""
+    return base64.b64decode(urllib.parse.unquote(chart)).decode("utf-8")
+
+
+class ChartsTest(unittest.TestCase):
+    """Test the charts of the compliance overview."""
+
+    def test_svg_charts(self):
+        """Ensure the SVG charts are valid documents, with a bar per feature and result."""
+        features = [
+            {"rule__feature__slug": "aaa", "compliant": 3, "non_compliant": 1},
+            {"rule__feature__slug": "<ntp>", "compliant": 0, "non_compliant": 5},
+        ]
+        bar_chart = minidom.parseString(decode_chart(svg_bar_chart(features, 0.3, 13, 4)))
+        self.assertEqual(len([rect for rect in bar_chart.getElementsByTagName("rect") if rect.childNodes]), 4)
+        for aggr in ({"compliants": 3, "non_compliants": 1}, {"compliants": 0, "non_compliants": 0}):
+            minidom.parseString(decode_chart(svg_pie_chart(aggr)))
+        self.assertIsNone(svg_pie_chart({"compliants": None, "non_compliants": None}))
+
+    def test_cached_charts(self):
+        """Ensure the charts are only rendered again for another report."""
+        render = Mock(return_value={"bar_chart": "chart"})
+        # A report of its own, as the cache may be shared with earlier runs.
+        report = ["svg", [{"rule__feature__slug": uuid.uuid4().hex, "compliant": 1, "non_compliant": 1}]]
+        self.assertEqual(get_cached_charts(report, render), {"bar_chart": "chart"})
+        get_cached_charts(report, render)
+        render.assert_called_once()
+        get_cached_charts(["png", report[1]], render)
+        self.assertEqual(render.call_count, 2)
@@ -0,0 +1,75 @@
+"""Unit tests for nautobot_golden_config utilities compliance_matrix."""
+
+from django.test import TestCase
+
+from nautobot_golden_config.models import ConfigCompliance
+from nautobot_golden_config.tests.conftest import create_config_compliance, create_device, create_feature_rule_json
+from nautobot_golden_config.utilities.compliance_matrix import get_compliance_matrix, invalidate_compliance_matrices
+
+
+class ComplianceMatrixTest(TestCase):
+    """Test the matrix of the compliance results."""
+
+    def setUp(self):
+        """Set up a compliant and a non-compliant device, for two features."""
+        self.device1 = create_device(name="device1")
+        self.device2 = create_device(name="device2")
+        foo_rule = create_feature_rule_json(self.device1, feature="foo")
+        bar_rule = create_feature_rule_json(self.device1, feature="bar")
+        create_config_compliance(self.device1, compliance_rule=foo_rule, actual={"a": 1}, intended={"a": 1})
+        create_config_compliance(self.device1, compliance_rule=bar_rule, actual={"a": 1}, intended={"a": 1})
+        create_config_compliance(self.device2, compliance_rule=foo_rule, actual={"a": 1}, intended={"a": 2})
+
+    def test_pivot(self):
+        """Ensure a row is returned per device, with the compliance per feature name."""
+        matrix = get_compliance_matrix(ConfigCompliance.objects.all())
+        self.assertEqual(matrix.feature_names, ["bar", "foo"])
+        self.assertEqual(
+            matrix.pivot(),
+            [
+                {"device": self.device1.pk, "device__name": "device1", "bar": 1, "foo": 1},
+                {"device": self.device2.pk, "device__name": "device2", "bar": None, "foo": 0},
+            ],
+        )
+
+    def test_aggregates(self):
+        """Ensure the per feature and global reports are computed from the matrix."""
+        matrix = get_compliance_matrix(ConfigCompliance.objects.all())
+        self.assertEqual(
+            [(item["rule__feature__slug"], item["count"], item["compliant"]) for item in matrix.feature_aggregates()],
+            [("bar", 1, 1), ("foo", 2, 1)],
+        )
+        self.assertEqual(matrix.feature_aggregates()[1]["comp_percent"], 50.0)
+        self.assertEqual(matrix.device_aggregate(), {"total": 2, "compliants": 1})
+        self.assertEqual(matrix.feature_aggregate(), {"total": 3, "compliants": 2})
+
+    def test_filtered_and_cached(self):
+        """Ensure the matrix follows the filters of the queryset, and is rebuilt once the results change."""
+        queryset = ConfigCompliance.objects.filter(device=self.device2)
+        matrix = get_compliance_matrix(queryset)
+        self.assertEqual(matrix.device_names, ["device2"])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_compliance_matrix(queryset).values.tolist(), [[0]])
+
+        compliance = ConfigCompliance.objects.get(device=self.device2)
+        compliance.intended = {"a": 1}
+        compliance.save()
+        self.assertEqual(get_compliance_matrix(queryset).values.tolist(), [[1]])
+
+        # Bulk queries do not send signals, the matrices are invalidated explicitly.
+        queryset.update(compliance=None, compliance_int=None)
+        self.assertEqual(get_compliance_matrix(queryset).values.tolist(), [[1]])
+        invalidate_compliance_matrices()
+        self.assertEqual(get_compliance_matrix(queryset).values.tolist(), [[-1]])
+        self.assertEqual(get_compliance_matrix(ConfigCompliance.objects.none()).pivot(), [])
+
+    def test_device_changed(self):
+        """Ensure the matrices are kept when a device is saved unchanged, and rebuilt once it is renamed."""
+        queryset = ConfigCompliance.objects.filter(device=self.device2)
+        get_compliance_matrix(queryset)
+        self.device2.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_compliance_matrix(queryset).device_names, ["device2"])
+        self.device2.name = "device3"
+        self.device2.save()
+        self.assertEqual(get_compliance_matrix(queryset).device_names, ["device3"])
@@ -0,0 +1,94 @@
+"""Unit tests for nautobot_golden_config utilities compliance_summary."""
+
+from django.test import TestCase
+from nautobot.dcim.models import Platform, Site
+
+from nautobot_golden_config.choices import ComplianceRuleTypeChoice
+from nautobot_golden_config.models import ComplianceRule, ConfigCompliance
+from nautobot_golden_config.tests.conftest import create_config_compliance, create_device, create_feature_rule_json
+from nautobot_golden_config.utilities.compliance_matrix import get_compliance_matrix
+from nautobot_golden_config.utilities.compliance_summary import (
+    ComplianceSummary,
+    get_compliance_report,
+    get_site_summary,
+    rebuild_compliance_summaries,
+)
+
+
+class ComplianceSummaryTest(TestCase):
+    """Test the summaries of the compliance results."""
+
+    def setUp(self):
+        """Set up a compliant and a non-compliant device, for two features."""
+        self.device1 = create_device(name="device1")
+        self.device2 = create_device(name="device2")
+        self.foo_rule = create_feature_rule_json(self.device1, feature="foo")
+        self.bar_rule = create_feature_rule_json(self.device1, feature="bar")
+        create_config_compliance(self.device1, compliance_rule=self.foo_rule, actual={"a": 1}, intended={"a": 1})
+        create_config_compliance(self.device1, compliance_rule=self.bar_rule, actual={"a": 1}, intended={"a": 1})
+        create_config_compliance(self.device2, compliance_rule=self.foo_rule, actual={"a": 1}, intended={"a": 2})
+
+    def assertSummaryEqualsMatrix(self):  # pylint: disable=invalid-name
+        """Assert the summaries report the same as the matrix of all the results."""
+        summary, matrix = ComplianceSummary(), get_compliance_matrix(ConfigCompliance.objects.filter(pk__isnull=False))
+        self.assertEqual(summary.feature_aggregates(), matrix.feature_aggregates())
+        self.assertEqual(summary.device_aggregate(), matrix.device_aggregate())
+        self.assertEqual(summary.feature_aggregate(), matrix.feature_aggregate())
+
+    def test_updated_as_results_are_written(self):
+        """Ensure the summaries follow the saved and deleted results."""
+        self.assertIsInstance(get_compliance_report(ConfigCompliance.objects.all()), ComplianceSummary)
+        self.assertEqual(ComplianceSummary().device_aggregate(), {"total": 2, "compliants": 1})
+        self.assertSummaryEqualsMatrix()
+
+        compliance = ConfigCompliance.objects.get(device=self.device2)
+        compliance.intended = {"a": 1}
+        compliance.save()
+        self.assertEqual(ComplianceSummary().feature_aggregate(), {"total": 3, "compliants": 3})
+        self.assertSummaryEqualsMatrix()
+
+        ConfigCompliance.objects.filter(rule=self.bar_rule).delete()
+        self.assertEqual([item["rule__feature__name"] for item in ComplianceSummary().feature_aggregates()], ["foo"])
+        self.assertSummaryEqualsMatrix()
+
+        self.device1.delete()
+        self.assertEqual(ComplianceSummary().device_aggregate(), {"total": 1, "compliants": 1})
+        self.assertSummaryEqualsMatrix()
+
+    def test_site_summary(self):
+        """Ensure the results of a device are counted with its site, and moved along with it."""
+        site = self.device1.site
+        self.assertEqual(
+            get_site_summary(site),
+            [
+                {"rule__feature__name": "bar", "compliant": 1, "non_compliant": 0},
+                {"rule__feature__name": "foo", "compliant": 1, "non_compliant": 1},
+            ],
+        )
+        self.device2.site = Site.objects.create(name="Site 2", slug="site-2")
+        self.device2.save()
+        self.assertEqual(
+            get_site_summary(self.device2.site), [{"rule__feature__name": "foo", "compliant": 0, "non_compliant": 1}]
+        )
+        self.assertEqual(len(get_site_summary(site)), 2)
+        self.assertEqual(get_site_summary(site)[1], {"rule__feature__name": "foo", "compliant": 1, "non_compliant": 0})
+
+    def test_rebuild(self):
+        """Ensure the summaries are rebuilt the same from the results."""
+        ConfigCompliance.objects.filter(device=self.device2).update(compliance=True, compliance_int=1)
+        rebuild_compliance_summaries()
+        self.assertEqual(ComplianceSummary().device_aggregate(), {"total": 2, "compliants": 2})
+        self.assertSummaryEqualsMatrix()
+
+    def test_several_results_per_feature(self):
+        """Ensure every result is counted, the same by the summaries and the matrix, for a feature with several rules."""
+        previous_rule = ComplianceRule.objects.create(
+            feature=self.foo_rule.feature,
+            platform=Platform.objects.create(name="Platform 2", slug="platform-2"),
+            config_type=ComplianceRuleTypeChoice.TYPE_JSON,
+            config_ordered=False,
+        )
+        create_config_compliance(self.device1, compliance_rule=previous_rule, actual={"a": 1}, intended={"a": 2})
+        self.assertEqual(ComplianceSummary().feature_aggregate(), {"total": 4, "compliants": 2})
+        self.assertEqual(ComplianceSummary().device_aggregate(), {"total": 2, "compliants": 0})
+        self.assertSummaryEqualsMatrix()
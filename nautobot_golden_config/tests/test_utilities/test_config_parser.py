@@ -0,0 +1,89 @@
+"""Unit tests for nautobot_golden_config utilities config_parser."""
+
+import unittest
+
+from netutils.config.compliance import feature_compliance, section_config
+
+from nautobot_golden_config.utilities.config_parser import (
+    ConfigSection,
+    ParsedConfig,
+    cli_compliance,
+    section_compliance,
+)
+
+BACKUP_CFG = """hostname router1
+ntp server 10.10.10.10
+ntp server 10.10.10.11
+router bgp 100
+ bgp router-id 10.6.6.5
+ neighbor 10.0.0.1 remote-as 200
+interface GigabitEthernet1
+ description uplink
+ shutdown
+"""
+
+INTENDED_CFG = """hostname router1
+ntp server 10.10.10.11
+ntp server 10.10.10.10
+router bgp 100
+ bgp router-id 10.6.6.6
+interface GigabitEthernet1
+ description uplink
+"""
+
+
+class ParsedConfigTest(unittest.TestCase):
+    """Test the parsed configuration matches the netutils results."""
+
+    def setUp(self):
+        """Parse the configurations once."""
+        self.backup = ParsedConfig(BACKUP_CFG, "cisco_ios")
+        self.intended = ParsedConfig(INTENDED_CFG, "cisco_ios")
+
+    def test_section_matches_netutils(self):
+        """Ensure sections are the same as the ones from netutils `section_config`."""
+        for section in (["hostname"], ["ntp"], ["router bgp"], ["interface"], ["snmp-server"]):
+            feature = {"name": "test", "ordered": True, "section": section}
+            self.assertEqual(self.backup.section(section), section_config(feature, BACKUP_CFG, "cisco_ios"))
+
+    def test_section_keeps_config_lines(self):
+        """Ensure the parsed lines are kept on the section."""
+        section = self.backup.section(["router bgp"])
+        self.assertIsInstance(section, ConfigSection)
+        self.assertEqual([line.config_line for line in section.config_lines][0], "router bgp 100")
+
+    def test_no_section_returns_config(self):
+        """Ensure the full configuration is returned when there is no section."""
+        self.assertEqual(self.backup.section([]), BACKUP_CFG)
+
+    def test_section_compliance_matches_netutils(self):
+        """Ensure compliance is the same as the one from netutils `feature_compliance`."""
+        for section in (["hostname"], ["ntp"], ["router bgp"], ["interface"], ["snmp-server"]):
+            for ordered in (True, False):
+                feature = {"name": "test", "ordered": ordered, "section": section}
+                expected = feature_compliance(
+                    feature,
+                    section_config(feature, BACKUP_CFG, "cisco_ios"),
+                    section_config(feature, INTENDED_CFG, "cisco_ios"),
+                    "cisco_ios",
+                )
+                result = section_compliance(
+                    feature, self.backup.section(section), self.intended.section(section), "cisco_ios"
+                )
+                self.assertEqual(result, expected)
+
+    def test_section_compliance_plain_strings(self):
+        """Ensure strings without parsed lines, such as the ones from the database, are still supported."""
+        feature = {"name": "ntp", "ordered": True, "section": ["ntp"]}
+        result = section_compliance(feature, "ntp server 10.10.10.10", "ntp server 10.10.10.11", "cisco_ios")
+        self.assertFalse(result["compliant"])
+        self.assertEqual(result["missing"], "ntp server 10.10.10.11")
+        self.assertEqual(result["extra"], "ntp server 10.10.10.10")
+
+    def test_cli_compliance(self):
+        """Ensure the details are returned in the format stored on `ConfigCompliance`."""
+        feature = {"name": "ntp", "ordered": False, "section": ["ntp"]}
+        result = cli_compliance(feature, self.backup.section(["ntp"]), self.intended.section(["ntp"]), "cisco_ios")
+        self.assertEqual(
+            result, {"compliance": True, "compliance_int": 1, "ordered": False, "missing": "", "extra": ""}
+        )
@@ -0,0 +1,69 @@
+"""Unit tests for nautobot_golden_config utilities diff."""
+
+import difflib
+import itertools
+import unittest
+from unittest.mock import patch
+
+from nautobot_golden_config.utilities import diff
+from nautobot_golden_config.utilities.diff import unified_diff
+
+BACKUP = ["hostname router1\n", "interface Gi1\n", " shutdown\n", "ntp server 10.10.10.10\n"] * 5
+INTENDED = ["hostname router1\n", "interface Gi1\n", " no shutdown\n", "ntp server 10.10.10.10\n"] * 4 + [
+    "logging host 10.1.1.1\n"
+]
+
+
+class UnifiedDiffTest(unittest.TestCase):
+    """Test the bounded unified diff."""
+
+    def test_same_as_difflib(self):
+        """Ensure the output is the same as difflib for regular configurations."""
+        self.assertEqual(
+            list(unified_diff(BACKUP, INTENDED)), list(difflib.unified_diff(BACKUP, INTENDED, lineterm=""))
+        )
+
+    def test_no_diff(self):
+        """Ensure there is no output for identical configurations."""
+        self.assertEqual(list(unified_diff(BACKUP, list(BACKUP))), [])
+
+    @patch.object(diff, "DIFFLIB_MAX_LINES", 4)
+    def test_large_configuration(self):
+        """Ensure the patience diff of large configurations only reports the changed lines."""
+        backup = [f"interface Gi{index}\n" for index in range(100)]
+        intended = backup[:50] + ["interface Gi1000\n"] + backup[51:]
+        self.assertEqual(
+            list(unified_diff(backup, intended, context=0)),
+            ["--- ", "+++ ", "@@ -51 +51 @@", "-interface Gi50\n", "+interface Gi1000\n"],
+        )
+
+    def test_truncated(self):
+        """Ensure the diff is truncated once the maximum number of lines is reached, within a hunk too."""
+        result = list(unified_diff(BACKUP, INTENDED, context=0, max_lines=3))
+        self.assertEqual(len(result), 4)
+        self.assertEqual(
+            result[-1], "\\ Diff truncated after 3 lines, the diff has 5 hunks, with 8 lines removed and 5 lines added."
+        )
+        backup = [f"interface Gi{index}\n" for index in range(5000)]
+        intended = [f"interface Te{index}\n" for index in range(5000)]
+        result = list(unified_diff(backup, intended, max_lines=100))
+        self.assertEqual(len(result), 101)
+        self.assertTrue(result[-1].endswith("the diff has 1 hunks, with 5000 lines removed and 5000 lines added."))
+
+    @patch.object(diff, "DIFFLIB_MAX_LINES", 4)
+    @patch.object(diff.time, "monotonic", side_effect=itertools.count(step=10))
+    def test_time_limit(self, mock_monotonic):  # pylint: disable=unused-argument
+        """Ensure the remaining ranges are summarized as replaced once the time limit is reached."""
+        backup = [f"interface Gi{index}\n" for index in range(10)]
+        intended = ["hostname router1\n"] + backup[5:] + backup[:5]
+        result = list(unified_diff(backup, intended, max_seconds=5))
+        self.assertEqual(
+            result,
+            [
+                "--- ",
+                "+++ ",
+                "@@ -1,10 +1,11 @@",
+                "\\ 10 lines replaced by 11 lines, not diffed within the time limit.",
+                "\\ Diff simplified, the time limit of 5 seconds was reached, 1 ranges were not diffed.",
+            ],
+        )
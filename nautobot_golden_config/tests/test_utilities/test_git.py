@@ -1,8 +1,13 @@
 """Unit tests for nautobot_golden_config utilities git."""
 
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, Mock
-from nautobot_golden_config.utilities.git import GitRepo
+
+from git import Repo
+
+from nautobot_golden_config.utilities.git import GitObjectReader, GitRepo, RepositoryManager
 
 
 class GitRepoTest(unittest.TestCase):
@@ -62,3 +67,144 @@ class GitRepoTest(unittest.TestCase):
         self.mock_obj.username = "admin@ntc.com"
         GitRepo(self.mock_obj)
         mock_repo.assert_called_once()
+
+    @patch("nautobot_golden_config.utilities.git.os.path.isdir", return_value=True)
+    @patch("nautobot_golden_config.utilities.git.Repo", autospec=True)
+    def test_changed_files(self, mock_repo, mock_isdir):  # pylint: disable=unused-argument
+        """Test changed files are returned with the absolute path."""
+        mock_repo.return_value.git.diff.return_value = "site-1/router1.cfg\nrouter2.cfg"
+        mock_repo.return_value.commit.side_effect = lambda revision: Mock(hexsha=f"sha-{revision}")
+        git_repo = GitRepo(self.mock_obj)
+        self.assertEqual(
+            git_repo.changed_files("abc123", "def456"),
+            ["/fake/path/site-1/router1.cfg", "/fake/path/router2.cfg"],
+        )
+        mock_repo.return_value.git.diff.assert_called_with("sha-abc123", "sha-def456", name_only=True)
+
+    @patch("nautobot_golden_config.utilities.git.os.path.isdir", return_value=True)
+    @patch("nautobot_golden_config.utilities.git.Repo", autospec=True)
+    def test_changed_files_no_previous_commit(self, mock_repo, mock_isdir):  # pylint: disable=unused-argument
+        """Test all files of the new commit are returned when there was no previous commit."""
+        mock_repo.return_value.git.ls_tree.return_value = "router1.cfg"
+        git_repo = GitRepo(self.mock_obj)
+        self.assertEqual(git_repo.changed_files(None, "def456"), ["/fake/path/router1.cfg"])
+        mock_repo.return_value.git.diff.assert_not_called()
+
+    def test_changed_files_invalid_revision(self):
+        """Test the revisions which are not commits, e.g. read as options by git, are rejected before running git."""
+        with tempfile.TemporaryDirectory() as path:
+            repo = Repo.init(path)
+            repo.create_remote("origin", "/fake/remote")
+            with repo.config_writer() as config:
+                config.set_value("user", "name", "test")
+                config.set_value("user", "email", "test@example.com")
+            repo.index.commit("BACKUP JOB")
+            self.mock_obj.filesystem_path = path
+            git_repo = GitRepo(self.mock_obj)
+            output = os.path.join(path, "output")
+            for revision in [f"--output={output}", "unknown"]:
+                with self.assertRaisesRegex(ValueError, "is not a commit of the repository"):
+                    git_repo.changed_files(revision, "HEAD")
+                with self.assertRaisesRegex(ValueError, "is not a commit of the repository"):
+                    git_repo.changed_files(None, revision)
+            self.assertFalse(os.path.exists(output))
+            self.assertEqual(git_repo.changed_files("HEAD", "HEAD"), [])
+
+    def test_commit_files(self):
+        """Test only the files written within the repository are committed."""
+        with tempfile.TemporaryDirectory() as path:
+            repo = Repo.init(path)
+            repo.create_remote("origin", "/fake/remote")
+            with repo.config_writer() as config:
+                config.set_value("user", "name", "test")
+                config.set_value("user", "email", "test@example.com")
+            for name in ["router1.cfg", "router2.cfg"]:
+                with open(os.path.join(path, name), "w") as config_file:
+                    config_file.write(name)
+            self.mock_obj.filesystem_path = path
+            git_repo = GitRepo(self.mock_obj)
+            git_repo.commit_files([os.path.join(path, "router1.cfg"), "/outside/router3.cfg"], "BACKUP JOB")
+            self.assertEqual(repo.git.ls_tree("HEAD", r=True, name_only=True), "router1.cfg")
+            self.assertEqual(repo.untracked_files, ["router2.cfg"])
+
+
+@patch("nautobot_golden_config.utilities.git.os.path.isdir", return_value=True)
+@patch("nautobot_golden_config.utilities.git.GitRepo")
+@patch("nautobot_golden_config.utilities.git.ensure_git_repository")
+class RepositoryManagerTest(unittest.TestCase):
+    """Test the repositories kept by a worker."""
+
+    def setUp(self):
+        """Setup a repository record."""
+        self.record = Mock(pk=1, filesystem_path="/fake/path", remote_url="/fake/remote", branch="main")
+        self.manager = RepositoryManager()
+
+    def test_fetched_per_job(self, mock_ensure, mock_git_repo, mock_isdir):  # pylint: disable=unused-argument
+        """Test the repository is opened once, and fetched for every job outside of a session."""
+        git_repo = self.manager.ensure(self.record, "job result")
+        self.assertIs(self.manager.ensure(self.record, "job result"), git_repo)
+        self.assertIs(self.manager.get(self.record), git_repo)
+        self.assertEqual(mock_ensure.call_count, 2)
+        mock_git_repo.assert_called_once_with(self.record)
+
+    def test_fetched_once_per_session(self, mock_ensure, mock_git_repo, mock_isdir):  # pylint: disable=unused-argument
+        """Test the repository is fetched once within a session, and reopened when the record changed."""
+        with self.manager.session():
+            git_repo = self.manager.ensure(self.record, "job result")
+            self.assertIs(self.manager.ensure(self.record, "job result"), git_repo)
+        mock_ensure.assert_called_once()
+        self.record.branch = "develop"
+        self.manager.ensure(self.record, "job result")
+        self.assertEqual(mock_git_repo.call_count, 2)
+
+    @patch.dict("nautobot_golden_config.utilities.git.PLUGIN_CFG", {"git_fetch_interval": 60})
+    def test_fetch_interval(self, mock_ensure, mock_git_repo, mock_isdir):  # pylint: disable=unused-argument
+        """Test the repository is not fetched again within the fetch interval."""
+        self.manager.ensure(self.record, "job result")
+        self.manager.ensure(self.record, "job result")
+        mock_ensure.assert_called_once()
+        # A repository committed to is fetched, so the commit can be pushed.
+        self.manager.ensure(self.record, "job result", commit=True)
+        self.assertEqual(mock_ensure.call_count, 2)
+
+    def test_lock_per_repository(self, mock_ensure, mock_git_repo, mock_isdir):  # pylint: disable=unused-argument
+        """Test a repository is fetched while another one is locked by a fetch."""
+        other_record = Mock(pk=2, filesystem_path="/fake/other", remote_url="/fake/other", branch="main")
+        with self.manager._get_lock(other_record):  # pylint: disable=protected-access
+            self.manager.ensure(self.record, "job result")
+        mock_ensure.assert_called_once_with(self.record, "job result")
+        self.assertIsNot(
+            self.manager._get_lock(self.record),
+            self.manager._get_lock(other_record),  # pylint: disable=protected-access
+        )
+
+
+class GitObjectReaderTest(unittest.TestCase):
+    """Test the files read from the git objects of a revision."""
+
+    def test_read(self):
+        """Test the files are read from the revision, rather than from the working tree."""
+        with tempfile.TemporaryDirectory() as path:
+            repo = Repo.init(path)
+            with repo.config_writer() as config:
+                config.set_value("user", "name", "test")
+                config.set_value("user", "email", "test@example.com")
+            os.mkdir(os.path.join(path, "site1"))
+            config_path = os.path.join(path, "site1", "router1.cfg")
+            for content in ["hostname router1\r\n", "hostname router2\n"]:
+                with open(config_path, "w", newline="") as config_file:
+                    config_file.write(content)
+                repo.index.add([config_path])
+                repo.index.commit("BACKUP JOB")
+            with open(config_path, "w") as config_file:
+                config_file.write("uncommitted")
+
+            reader = GitObjectReader("HEAD~1")
+            self.assertEqual(reader.read(path, config_path), "hostname router1\n")
+            self.assertIsNone(reader.read(path, os.path.join(path, "site1")))
+            self.assertIsNone(reader.read(path, os.path.join(path, "router2.cfg")))
+            self.assertIsNone(reader.read(path, "/outside/router1.cfg"))
+            reader.close()
+            self.assertEqual(GitObjectReader().read(path, config_path), "hostname router2\n")
+            with self.assertRaises(ValueError):
+                GitObjectReader("unknown").read(path, config_path)
@@ -1,14 +1,23 @@
 """Unit tests for nautobot_golden_config utilities graphql."""
 
-from unittest.mock import patch
+import threading
+from unittest.mock import Mock, patch
 from unittest import skip
 
 from nautobot.utilities.testing import TestCase
 from nautobot.dcim.models import Device
-from nautobot_golden_config.utilities.graphql import graph_ql_query
+from nautobot_golden_config.utilities.graphql import (
+    BATCH_ID_ALIAS,
+    BatchedSotAggQuery,
+    get_batch_query,
+    get_document,
+    graph_ql_query,
+)
 
 # pylint: disable=no-self-use
 
+SOT_AGG_QUERY = "query ($device_id: ID!) { device(id: $device_id) { hostname: name } }"
+
 
 class GraphQLTest(TestCase):
     """Test for the GraphQL Queries."""
@@ -27,3 +36,73 @@ class GraphQLTest(TestCase):
         self.assertEqual(result[0], 400)
         self.assertTrue(result[1]["error"])
         self.assertRegex(result[1].get("error"), r"Syntax Error GraphQL.*")
+
+    @patch("nautobot_golden_config.utilities.graphql.get_default_backend")
+    def test_get_document_cached(self, mock_backend):
+        """Ensure a query is only parsed once per schema."""
+        get_document.cache_clear()
+        schema = object()
+        first = get_document(schema, "{devices{id}}")
+        second = get_document(schema, "{devices{id}}")
+        self.assertIs(first, second)
+        mock_backend.return_value.document_from_string.assert_called_once_with(schema, "{devices{id}}")
+        get_document(schema, "{devices{name}}")
+        self.assertEqual(mock_backend.return_value.document_from_string.call_count, 2)
+
+    def test_get_batch_query(self):
+        """Ensure the device query is converted to a query for a list of devices."""
+        query = get_batch_query(SOT_AGG_QUERY)
+        self.assertIn("query ($device_ids: [String])", query)
+        self.assertIn("devices(id: $device_ids)", query)
+        self.assertIn(f"{BATCH_ID_ALIAS}: id", query)
+
+    def test_get_batch_query_unsupported(self):
+        """Ensure queries selecting more than the device field are rejected."""
+        with self.assertRaises(ValueError):
+            get_batch_query("query ($device_id: ID!) { device(id: $device_id) { name } sites { name } }")
+
+    @patch("nautobot_golden_config.utilities.graphql.get_document")
+    def test_batched_query(self, mock_document):
+        """Ensure a chunk is queried once, and the results are split per device."""
+        mock_document.return_value.execute.side_effect = [
+            Mock(
+                invalid=False,
+                data={
+                    "devices": [{"hostname": "dev1", BATCH_ID_ALIAS: "1"}, {"hostname": "dev2", BATCH_ID_ALIAS: "2"}]
+                },
+            ),
+            Mock(invalid=False, data={"devices": []}),
+        ]
+        sot_agg = BatchedSotAggQuery("request", ["1", "2", "3"], SOT_AGG_QUERY, 2)
+        self.assertEqual(sot_agg.query(Mock(pk="1")), (200, {"hostname": "dev1"}))
+        self.assertEqual(sot_agg.query(Mock(pk="2")), (200, {"hostname": "dev2"}))
+        mock_document.return_value.execute.assert_called_once_with(
+            context_value="request", variable_values={"device_ids": ["1", "2"]}
+        )
+        self.assertEqual(sot_agg.query(Mock(pk="3"))[0], 400)
+        self.assertEqual(mock_document.return_value.execute.call_count, 2)
+
+    @patch("nautobot_golden_config.utilities.graphql.get_document")
+    def test_batched_query_concurrent_chunks(self, mock_document):
+        """Ensure a chunk is queried while the query of another chunk is still running."""
+        first_chunk_started, second_chunk_started = threading.Event(), threading.Event()
+        results = {}
+
+        def execute(context_value, variable_values):  # pylint: disable=unused-argument
+            device_id = variable_values["device_ids"][0]
+            if device_id == "1":
+                first_chunk_started.set()
+                results["waited"] = second_chunk_started.wait(5)
+            else:
+                second_chunk_started.set()
+            return Mock(invalid=False, data={"devices": [{"hostname": f"dev{device_id}", BATCH_ID_ALIAS: device_id}]})
+
+        mock_document.return_value.execute.side_effect = execute
+        sot_agg = BatchedSotAggQuery("request", ["1", "2"], SOT_AGG_QUERY, 1)
+        thread = threading.Thread(target=lambda: results.update(first=sot_agg.query(Mock(pk="1"))))
+        thread.start()
+        first_chunk_started.wait(5)
+        self.assertEqual(sot_agg.query(Mock(pk="2")), (200, {"hostname": "dev2"}))
+        thread.join()
+        self.assertTrue(results["waited"])
+        self.assertEqual(results["first"], (200, {"hostname": "dev1"}))
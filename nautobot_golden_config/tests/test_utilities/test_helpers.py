@@ -12,7 +12,16 @@ from nautobot.dcim.models import Device
 from nautobot.extras.models import GitRepository
 from nautobot_golden_config.models import GoldenConfigSetting
 from nautobot_golden_config.tests.conftest import create_device, create_orphan_device, create_helper_repo
-from nautobot_golden_config.utilities.helper import null_to_empty, render_jinja_template, get_repository_working_dir
+from nautobot_golden_config.utilities.helper import (
+    null_to_empty,
+    render_jinja_template,
+    get_jinja_template,
+    get_repository_routes,
+    get_repository_working_dir,
+    get_job_filter,
+    get_job_queryset,
+    get_template_relations,
+)
 
 
 # pylint: disable=no-self-use
@@ -92,15 +101,23 @@ class HelpersTest(TestCase):
 
     @patch("nornir_nautobot.utils.logger.NornirLogger")
     @patch("nautobot.dcim.models.Device")
-    @patch("nautobot_golden_config.utilities.helper.render_jinja2")
+    @patch("nautobot_golden_config.utilities.helper.get_jinja_template")
     def test_render_jinja_template_exceptions_templateerror(self, template_mock, mock_device, mock_nornir_logger):
         """Cause issue to cause TemplateError form Jinja2 Template."""
         with self.assertRaises(NornirNautobotException):
             with self.assertRaises(jinja_errors.TemplateError):
-                template_mock.side_effect = jinja_errors.TemplateRuntimeError
+                template_mock.return_value.render.side_effect = jinja_errors.TemplateRuntimeError
                 render_jinja_template(mock_device, mock_nornir_logger, "template")
         mock_nornir_logger.log_failure.assert_called_once()
 
+    def test_get_jinja_template_cached(self):
+        """Ensure templates are compiled once, until the settings are saved."""
+        get_jinja_template.cache_clear()
+        self.assertIs(get_jinja_template("{{ obj.name }}"), get_jinja_template("{{ obj.name }}"))
+        self.assertEqual(get_jinja_template.cache_info().currsize, 1)
+        self.global_settings.save()
+        self.assertEqual(get_jinja_template.cache_info().currsize, 0)
+
     def test_get_backup_repository_working_dir_success(self):
         """Verify that we successfully look up the path from a provided repo object."""
         repo_type = "backup"
@@ -117,6 +134,35 @@ class HelpersTest(TestCase):
         )
         self.assertEqual(result, "/opt/nautobot/git/intended-parent_region-1")
 
+    def test_get_repository_routes(self):
+        """Verify the routing table is built with one query, and the devices are routed with it in memory."""
+        with self.assertNumQueries(1):
+            routes = get_repository_routes("backup", self.global_settings)
+        self.assertEqual(routes, {"backup-parent_region-1": "/opt/nautobot/git/backup-parent_region-1"})
+        device = Device.objects.get(name="test_device")
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_repository_working_dir("backup", device, self.logger, self.global_settings, routes),
+                "/opt/nautobot/git/backup-parent_region-1",
+            )
+
+    def test_get_repository_working_dir_first(self):
+        """Verify the first repository by name is used without a matching rule, and a missing one fails."""
+        create_helper_repo(name="backup-a", provides="backupconfigs")
+        self.global_settings.backup_repository.add(GitRepository.objects.get(name="backup-a"))
+        self.global_settings.backup_match_rule = ""
+        device = Device.objects.get(name="test_device")
+        self.assertEqual(
+            list(get_repository_routes("backup", self.global_settings)), ["backup-a", "backup-parent_region-1"]
+        )
+        self.assertEqual(
+            get_repository_working_dir("backup", device, self.logger, self.global_settings),
+            "/opt/nautobot/git/backup-a",
+        )
+        self.global_settings.backup_repository.clear()
+        with self.assertRaises(AttributeError):
+            get_repository_working_dir("backup", device, self.logger, self.global_settings)
+
     def test_get_backup_repository_working_dir_no_match(self):
         """Verify that we return the correct error when there is no matching backup repo."""
         repo_type = "backup"
@@ -144,3 +190,48 @@ class HelpersTest(TestCase):
             logger.log_failure.call_args[0][1],
             "There is no repository slug matching 'intended-parent_region-4' for device. Verify the matching rule and configured Git repositories.",
         )
+
+    def test_get_job_filter(self):
+        """Verify the devices of the job are resolved, and limited by the job data."""
+        self.assertEqual(set(get_job_filter().values_list("name", flat=True)), {"test_device", "orphan_device"})
+        device = Device.objects.get(name="test_device")
+        self.assertEqual(list(get_job_filter({"device": device})), [device])
+
+    def test_get_job_filter_no_platform(self):
+        """Verify the devices without a platform are reported."""
+        device = Device.objects.get(name="test_device")
+        Device.objects.create(
+            name="no_platform", site=device.site, device_role=device.device_role, device_type=device.device_type
+        )
+        with self.assertRaisesMessage(NornirNautobotException, "device(s) no_platform have no platform defined"):
+            get_job_filter()
+
+    def test_get_queryset_scope(self):
+        """Verify the validated scope is reused, and the devices are still queried fresh."""
+        self.global_settings.scope = {"site": ["site-1"]}
+        self.assertEqual(list(self.global_settings.get_queryset().values_list("name", flat=True)), ["test_device"])
+        create_device(name="new_device")
+        with self.assertNumQueries(1):
+            names = list(self.global_settings.get_queryset().values_list("name", flat=True))
+        self.assertEqual(sorted(names), ["new_device", "test_device"])
+
+    def test_get_template_relations(self):
+        """Verify the relations rendered by a template are found, and the other attributes ignored."""
+        template = (
+            "{{ obj.site.region.parent.slug }}/{{ obj.name }}/{% for tag in obj.tags.all() %}{{ tag }}{% endfor %}"
+        )
+        self.assertEqual(
+            get_template_relations(template), (("site", "site__region", "site__region__parent"), ("tags",))
+        )
+        self.assertEqual(get_template_relations("{{ obj.name"), ((), ()))
+
+    def test_get_job_queryset(self):
+        """Verify the templates of the devices render without further queries."""
+        devices = list(get_job_queryset(Device.objects.all(), [self.global_settings.backup_match_rule, None]))
+        with self.assertNumQueries(0):
+            slugs = [
+                render_jinja_template(device, self.logger, self.global_settings.backup_match_rule) for device in devices
+            ]
+            platforms = [device.platform.slug for device in devices]
+        self.assertIn("backup-parent_region-1", slugs)
+        self.assertIn("platform-1", platforms)
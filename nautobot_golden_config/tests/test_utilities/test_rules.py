@@ -0,0 +1,55 @@
+"""Unit tests for nautobot_golden_config utilities rules."""
+
+from django.test import TestCase
+
+from nautobot_golden_config.choices import ComplianceRuleTypeChoice
+from nautobot_golden_config.models import ComplianceFeature, ComplianceRule
+from nautobot_golden_config.tests.conftest import create_device, create_feature_rule_json
+from nautobot_golden_config.utilities.rules import get_rule_index, invalidate_rule_index
+
+
+class RuleIndexTest(TestCase):
+    """Test the index of the compliance rules."""
+
+    def setUp(self):
+        """Set up base objects."""
+        self.device = create_device()
+        self.json_rule = create_feature_rule_json(self.device)
+
+    def test_json_rule_without_match_config(self):
+        """Ensure the JSON rules are indexed for the lookups, but not run by the job without a config to match."""
+        index = get_rule_index()
+        self.assertEqual(index.rules[self.json_rule.pk], {"ordered": False, "obj": self.json_rule, "section": []})
+        self.assertNotIn(self.device.platform.slug, index.platforms)
+
+    def test_null_match_config(self):
+        """Ensure a rule without any match config stored is indexed, without a section to match."""
+        ComplianceRule.objects.filter(pk=self.json_rule.pk).update(match_config=None)
+        invalidate_rule_index()
+        index = get_rule_index()
+        self.assertEqual(index.rules[self.json_rule.pk]["section"], [])
+        self.assertNotIn(self.device.platform.slug, index.platforms)
+
+    def test_reused_until_rules_change(self):
+        """Ensure the index is built with a single query, reused, and rebuilt once a rule is saved or deleted."""
+        with self.assertNumQueries(1):
+            index = get_rule_index()
+            self.assertEqual(index.rules[self.json_rule.pk]["obj"].feature.name, "foo")
+        with self.assertNumQueries(0):
+            self.assertIs(get_rule_index(), index)
+
+        cli_rule = ComplianceRule.objects.create(
+            feature=ComplianceFeature.objects.create(slug="ntp", name="ntp"),
+            platform=self.device.platform,
+            config_type=ComplianceRuleTypeChoice.TYPE_CLI,
+            config_ordered=True,
+            match_config="",
+        )
+        self.assertNotIn("platform-1", get_rule_index().platforms)
+        cli_rule.match_config = "ntp server"
+        cli_rule.save()
+        self.assertEqual(get_rule_index().rules[cli_rule.pk]["section"], ["ntp server"])
+        self.assertEqual([rule["obj"] for rule in get_rule_index().platforms["platform-1"]], [cli_rule])
+
+        self.json_rule.delete()
+        self.assertNotIn(self.json_rule.pk, get_rule_index().rules)
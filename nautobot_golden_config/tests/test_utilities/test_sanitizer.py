@@ -0,0 +1,121 @@
+"""Unit tests for nautobot_golden_config utilities sanitizer."""
+
+import unittest
+from unittest.mock import MagicMock
+
+from netutils.config.clean import clean_config, sanitize_config
+
+from nautobot_golden_config.utilities.sanitizer import PlatformSanitizer, get_sanitizers, merge_remove_lines
+
+REMOVE_LINES = [
+    {"regex": r"^Building\s+configuration.*\n"},
+    {"regex": r"^Current configuration.*\n"},
+    {"regex": r"^! Last configuration change.*\n"},
+    {"regex": r"^ntp clock-period [0-9]+\n"},
+]
+SUBSTITUTE_LINES = [
+    {"regex": r"^(username\s+\S+\s+password\s+7\s+)\S+", "replace": r"\1<redacted>"},
+    {"regex": r"<redacted>", "replace": "<redacted_config>"},
+]
+CONFIG = (
+    "Building configuration...\n"
+    "Current configuration : 1234 bytes\n"
+    "! Last configuration change at 10:00:00\n"
+    "hostname router1\n"
+    "ntp clock-period 17179\n"
+    "username admin password 7 0822455D0A16\n"
+    "Building\n"
+    "configuration x\n"
+)
+
+
+class SanitizerTest(unittest.TestCase):
+    """Test the precompiled config removals and replacements."""
+
+    def test_same_as_netutils(self):
+        """Ensure the configuration is sanitized the same as the netutils functions."""
+        expected = sanitize_config(clean_config(CONFIG, REMOVE_LINES), SUBSTITUTE_LINES)
+        self.assertEqual(PlatformSanitizer(REMOVE_LINES, SUBSTITUTE_LINES).sanitize(CONFIG), expected)
+        self.assertIn("username admin password 7 <redacted_config>\n", expected)
+
+    def test_removal_creating_a_match(self):
+        """Ensure a pattern matching across lines still sees the lines left by the removals before it."""
+        remove_lines = [{"regex": r"^! Time.*\n"}, {"regex": r"^Building\s+configuration.*\n"}]
+        config = "Building\n! Time: 10:00:00\nconfiguration x\nhostname router1\n"
+        self.assertEqual(PlatformSanitizer(remove_lines).sanitize(config), "hostname router1\n")
+
+    def test_merge_remove_lines(self):
+        """Ensure only the consecutive whole line patterns are merged, in their order."""
+        self.assertEqual(
+            merge_remove_lines(REMOVE_LINES),
+            [
+                {"regex": r"^Building\s+configuration.*\n"},
+                {
+                    "regex": r"(?:^Current configuration.*\n)|(?:^! Last configuration change.*\n)|(?:^ntp clock-period [0-9]+\n)"
+                },
+            ],
+        )
+
+    def test_not_merged(self):
+        """Ensure the patterns depending on other lines, or not removing a whole line, are left as they are."""
+        remove_lines = [
+            {"regex": r"^(a|b)\1\n"},
+            {"regex": r"^interface (?=Gi).*\n"},
+            {"regex": r"(?s)^banner.*\n"},
+            {"regex": r"^[^!]*\n"},
+            {"regex": r"^!.*"},
+            {"regex": r"secret.*\n"},
+            {"regex": r"^(unclosed\n"},
+        ]
+        self.assertEqual(merge_remove_lines(remove_lines), remove_lines)
+
+    def test_inline_global_flags(self):
+        """Ensure the patterns with inline global flags are not merged, and only apply to their own matches."""
+        remove_lines = [
+            {"regex": r"^current configuration.*\n"},
+            {"regex": r"(?i)^building configuration.*\n"},
+            {"regex": r"^! last configuration change.*\n"},
+        ]
+        self.assertEqual(merge_remove_lines(remove_lines), remove_lines)
+        sanitizer = PlatformSanitizer(remove_lines + REMOVE_LINES)
+        self.assertEqual(sanitizer.sanitize(CONFIG), clean_config(CONFIG, remove_lines + REMOVE_LINES))
+        self.assertEqual(
+            PlatformSanitizer(remove_lines).sanitize("Current configuration\nBUILDING configuration\n"),
+            "Current configuration\n",
+        )
+
+    def test_same_group_names(self):
+        """Ensure the patterns defining the same group name are kept apart, as they can not be compiled as one."""
+        remove_lines = [{"regex": r"^(?P<a>foo)\n"}, {"regex": r"^(?P<a>bar)\n"}]
+        self.assertEqual(merge_remove_lines(remove_lines), remove_lines)
+        self.assertEqual(PlatformSanitizer(remove_lines).sanitize("foo\nbar\nbaz\n"), "baz\n")
+
+    def test_invalid_regex(self):
+        """Ensure an invalid pattern is reported for its platform, without failing the sanitizers of the others."""
+        remove = MagicMock(regex="^foo(\n")
+        remove.platform.slug = "cisco_ios"
+        replace = MagicMock(regex=r"secret \S+", replace="secret <redacted>")
+        replace.platform.slug = "arista_eos"
+        config_removes, config_replaces = MagicMock(), MagicMock()
+        config_removes.select_related.return_value = [remove]
+        config_replaces.select_related.return_value = [replace]
+        sanitizers = get_sanitizers(config_removes, config_replaces)
+        self.assertIn("The `ConfigRemove` regex `^foo(\n` is invalid", sanitizers["cisco_ios"].error)
+        with self.assertRaises(ValueError):
+            sanitizers["cisco_ios"].sanitize("foo\n")
+        self.assertIsNone(sanitizers["arista_eos"].error)
+        self.assertEqual(sanitizers["arista_eos"].sanitize("secret abc\n"), "secret <redacted>\n")
+
+    def test_get_sanitizers(self):
+        """Ensure the rules are grouped per platform."""
+        remove = MagicMock(regex=r"^Current configuration.*\n")
+        remove.platform.slug = "cisco_ios"
+        replace = MagicMock(regex=r"secret \S+", replace="secret <redacted>")
+        replace.platform.slug = "arista_eos"
+        config_removes, config_replaces = MagicMock(), MagicMock()
+        config_removes.select_related.return_value = [remove]
+        config_replaces.select_related.return_value = [replace]
+        sanitizers = get_sanitizers(config_removes, config_replaces)
+        self.assertEqual(sanitizers["cisco_ios"].remove_lines, [{"regex": r"^Current configuration.*\n"}])
+        self.assertEqual(sanitizers["cisco_ios"].substitute_lines, [])
+        self.assertEqual(sanitizers["arista_eos"].sanitize("secret abc\n"), "secret <redacted>\n")
@@ -2,7 +2,7 @@
 import unittest
 from unittest.mock import patch
 
-from nautobot_golden_config.utilities.utils import get_platform
+from nautobot_golden_config.utilities.utils import get_hash, get_platform
 
 
 class GetPlatformTest(unittest.TestCase):
@@ -26,3 +26,19 @@ class GetPlatformTest(unittest.TestCase):
     def test_get_platform_defined_but_not_relevant(self):
         """Test user defined platform mappings not relevant."""
         self.assertEqual(get_platform("cisco_ios"), "cisco_ios")
+
+
+class GetHashTest(unittest.TestCase):
+    """Test Get Hash."""
+
+    def test_get_hash_same_values(self):
+        """Test the same values return the same fingerprint."""
+        self.assertEqual(get_hash("hostname router1", "ntp"), get_hash("hostname router1", "ntp"))
+
+    def test_get_hash_different_values(self):
+        """Test different values return a different fingerprint."""
+        self.assertNotEqual(get_hash("hostname router1"), get_hash("hostname router2"))
+
+    def test_get_hash_value_boundaries(self):
+        """Test the values are not simply concatenated."""
+        self.assertNotEqual(get_hash("ab", "c"), get_hash("a", "bc"))
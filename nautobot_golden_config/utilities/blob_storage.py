@@ -0,0 +1,87 @@
+"""Encoding and compression of the configurations stored once per distinct content, in the `ConfigBlob` table."""
+
+import hashlib
+import json
+import logging
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+LOGGER = logging.getLogger(__name__)
+
+COMPRESSION_NONE = ""
+COMPRESSION_ZLIB = "zlib"
+COMPRESSION_ZSTD = "zstd"
+
+
+def encode_content(value, is_json=False):
+    """Return the bytes a configuration is stored as, None for an empty configuration, which is not stored.
+
+    Args:
+        value (str): The configuration, or any JSON value when `is_json` is set.
+        is_json (bool): The configuration is a JSON value, e.g. a section of a `ConfigCompliance`.
+
+    Returns:
+        bytes: The UTF-8 text, or JSON document with sorted keys, so equal contents are stored once.
+    """
+    if is_json:
+        return None if value is None else json.dumps(value, sort_keys=True, cls=DjangoJSONEncoder).encode("utf-8")
+    return value.encode("utf-8") if value else None
+
+
+def decode_content(data, is_json=False):
+    """Return the configuration stored as `data`, the reverse of `encode_content`."""
+    text = bytes(data).decode("utf-8")
+    return json.loads(text) if is_json else text
+
+
+def get_content_hash(data):
+    """Return the sha256 fingerprint of the content, the key of its blob."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_compression():
+    """Return the compression of the new blobs, from the `config_blob_compression` setting."""
+    compression = PLUGIN_CFG.get("config_blob_compression", COMPRESSION_ZLIB) or COMPRESSION_NONE
+    if compression == COMPRESSION_ZSTD and zstandard is None:
+        LOGGER.warning("The `zstandard` package is not installed, the configurations are compressed with zlib.")
+        return COMPRESSION_ZLIB
+    if compression not in (COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_ZSTD):
+        raise ValueError(f"Unsupported `config_blob_compression` {compression!r}, expected `zlib`, `zstd` or None.")
+    return compression
+
+
+def compress(data, compression):
+    """Compress the content of a blob, kept uncompressed when that does not make it smaller.
+
+    Returns:
+        tuple: The compression actually used, and the stored data.
+    """
+    if compression == COMPRESSION_ZLIB:
+        compressed = zlib.compress(data)
+    elif compression == COMPRESSION_ZSTD:
+        compressed = zstandard.ZstdCompressor().compress(data)
+    else:
+        return COMPRESSION_NONE, data
+    if len(compressed) >= len(data):
+        return COMPRESSION_NONE, data
+    return compression, compressed
+
+
+def decompress(data, compression):
+    """Return the content of a blob as stored with `compression`."""
+    data = bytes(data)
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("The `zstandard` package is required to read the configurations compressed with zstd.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
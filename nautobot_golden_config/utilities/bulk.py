@@ -0,0 +1,178 @@
+"""Helper functions to write objects in bulk while keeping Nautobot change logging intact."""
+
+import threading
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from nautobot.extras.choices import ObjectChangeActionChoices
+from nautobot.extras.models import ObjectChange, Webhook
+from nautobot.extras.utils import is_taggable
+from nautobot.extras.webhooks import enqueue_webhooks
+
+WEBHOOK_ACTION_FLAGS = {
+    ObjectChangeActionChoices.ACTION_CREATE: "type_create",
+    ObjectChangeActionChoices.ACTION_UPDATE: "type_update",
+    ObjectChangeActionChoices.ACTION_DELETE: "type_delete",
+}
+
+
+def bulk_change_log(instances, action, request):
+    """Record the ObjectChange entries, and enqueue any webhooks, for objects written with bulk queries.
+
+    `bulk_create` and `bulk_update` do not send the `post_save` signal that Nautobot relies on for change logging,
+    so this mirrors what the signal receiver would have done, with a single insert for all of the entries.
+
+    Args:
+        instances (list): Saved model instances that share the same model.
+        action (str): One of the `ObjectChangeActionChoices` values.
+        request (WSGIRequest): The request the Nautobot Job is running under, when None nothing is recorded.
+    """
+    if request is None or not instances:
+        return
+
+    if is_taggable(instances[0]):
+        prefetch_related_objects(instances, "tags")
+
+    user = request.user if request.user.is_authenticated else None
+    object_changes = []
+    for instance in instances:
+        object_change = instance.to_objectchange(action)
+        object_change.user = user
+        object_change.user_name = user.username if user else "Undefined"
+        object_change.request_id = request.id
+        object_changes.append(object_change)
+    ObjectChange.objects.bulk_create(object_changes)
+
+    # Checking once avoids the per object query done in `enqueue_webhooks` in the common case of no webhooks.
+    content_type = ContentType.objects.get_for_model(instances[0])
+    if Webhook.objects.filter(
+        content_types=content_type, enabled=True, **{WEBHOOK_ACTION_FLAGS[action]: True}
+    ).exists():
+        for instance in instances:
+            enqueue_webhooks(instance, request.user, request.id, action)
+
+
+class StatusTracker:
+    """Track the `GoldenConfig` status of the devices of a job, and write it with bulk queries.
+
+    The missing `GoldenConfig` objects are created, and the attempt date of every device set, with a few queries when
+    the job starts. Only the fields of the job type are loaded for each device. The success dates and configurations
+    are then written in batches, with a single change log entry per device, from the objects loaded again per batch.
+    The Nornir tasks of a job share the tracker, so the pending results are guarded by a lock.
+    """
+
+    def __init__(self, job_type, queryset, now, request=None, batch_size=500):  # pylint: disable=too-many-arguments
+        """Set the parameters of the tracker.
+
+        Args:
+            job_type (str): One of `backup`, `intended` or `compliance`, the prefix of the status fields.
+            queryset (QuerySet): The Device queryset of the job.
+            now (datetime): The date of the job, stored as the attempt and success dates.
+            request (WSGIRequest): The request of the Nautobot Job, used to record the change log entries.
+            batch_size (int): The number of successful devices written at once.
+        """
+        self.job_type = job_type
+        self.queryset = queryset
+        self.now = now
+        self.request = request
+        self.batch_size = batch_size
+        self.objects = {}
+        self.pending = []
+        self.fields = {f"{job_type}_last_success_date"}
+        self.written_files = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Create the missing `GoldenConfig` objects, and set the attempt date of every device of the job."""
+        # Imported here, as the models import the utilities.
+        from nautobot_golden_config.models import GoldenConfig  # pylint: disable=import-outside-toplevel
+
+        device_ids = set(self.queryset.values_list("pk", flat=True))
+        existing = set(GoldenConfig.objects.filter(device_id__in=device_ids).values_list("device_id", flat=True))
+        created = GoldenConfig.objects.bulk_create(
+            [GoldenConfig(device_id=device_id) for device_id in device_ids - existing]
+        )
+        bulk_change_log(created, ObjectChangeActionChoices.ACTION_CREATE, self.request)
+
+        GoldenConfig.objects.filter(device_id__in=device_ids).update(
+            **{f"{self.job_type}_last_attempt_date": self.now, "last_updated": timezone.now()}
+        )
+        # Only the fields of the job type are loaded, e.g. neither the configurations nor the dates of the other jobs.
+        fields = [field.name for field in GoldenConfig._meta.concrete_fields if field.name.startswith(self.job_type)]
+        self.objects = {}
+        for obj in (
+            GoldenConfig.objects.filter(device_id__in=device_ids)
+            .only("device", "last_updated", *fields)
+            .order_by("device", "pk")
+        ):
+            # Keep the same object as `GoldenConfig.objects.filter(device=device).first()` would.
+            self.objects.setdefault(obj.device_id, obj)
+
+    def get(self, device):
+        """Return the `GoldenConfig` object of a device of the job."""
+        return self.objects[device.pk]
+
+    def success(self, device, written_file=None, **fields):
+        """Record the success of a device, along with the other fields to write, e.g. the configuration.
+
+        Args:
+            device (Device): A device of the job.
+            written_file (str): The file written for the device, the only files the job then commits.
+            **fields: The `GoldenConfig` fields to set on top of the success date.
+        """
+        obj = self.objects[device.pk]
+        setattr(obj, f"{self.job_type}_last_success_date", self.now)
+        for field, value in fields.items():
+            setattr(obj, field, value)
+        with self.lock:
+            if written_file:
+                self.written_files.append(written_file)
+            self.fields.update(fields)
+            self.pending.append(obj)
+            if len(self.pending) < self.batch_size:
+                return
+            pending, self.pending = self.pending, []
+            fields = sorted(self.fields)
+        self._write(pending, fields)
+
+    def _write(self, objs, fields):
+        """Write the successful devices, and release the objects, so their configurations are not kept in memory."""
+        if not objs:
+            return
+        # Imported here, as the models import the utilities.
+        from nautobot_golden_config.models import store_blob_contents  # pylint: disable=import-outside-toplevel
+
+        # `bulk_update` does not honor `auto_now`, so it is set explicitly.
+        last_updated = timezone.now()
+        for obj in objs:
+            obj.last_updated = last_updated
+        # The configurations are written as references to their blobs, the new contents are stored at once.
+        store_blob_contents(objs)
+        model = type(objs[0])
+        model.objects.bulk_update(objs, model.get_concrete_fields(fields) + ["last_updated"])
+        self._change_log(objs)
+        for obj in objs:
+            self.objects.pop(obj.device_id, None)
+
+    def _change_log(self, objs):
+        """Record the change log of the objects, loaded again in full, as the change log serializes every field."""
+        if self.request is None:
+            return
+        for index in range(0, len(objs), self.batch_size):
+            batch = objs[index : index + self.batch_size]
+            bulk_change_log(
+                list(type(batch[0]).objects.filter(pk__in=[obj.pk for obj in batch]).select_related("device")),
+                ObjectChangeActionChoices.ACTION_UPDATE,
+                self.request,
+            )
+
+    def finish(self):
+        """Write the remaining successful devices, and record the change log of the devices that failed."""
+        with self.lock:
+            pending, self.pending = self.pending, []
+            fields = sorted(self.fields)
+        self._write(pending, fields)
+        self._change_log(list(self.objects.values()))
+        self.objects = {}
@@ -0,0 +1,142 @@
+"""Charts of the compliance overview, rendered once per distinct report and kept in the cache."""
+
+import base64
+import json
+import math
+import urllib.parse
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+
+from nautobot_golden_config.utilities.utils import get_hash
+
+GREEN = "#D5E8D4"
+RED = "#F8CECC"
+# The charts are keyed by the reports they are drawn from, so they are only rendered again for new results.
+CHART_CACHE_TIMEOUT = 86400
+CHART_MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+# Pixels per inch of the SVG charts, the same as the default of matplotlib.
+SVG_DPI = 100
+
+
+def encode_chart(content):
+    """Encode a chart the same as the matplotlib charts, to be embedded as a base64 data URL."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return urllib.parse.quote(base64.b64encode(content))
+
+
+def get_cached_charts(report, render):
+    """Return the charts of a report, rendered only when the report is not in the cache.
+
+    Args:
+        report (list): The data the charts are drawn from, including the chart format and sizes.
+        render (callable): Renders the charts of the report, as a dictionary of encoded charts.
+
+    Returns:
+        dict: The encoded charts.
+    """
+    key = f"nautobot_golden_config.charts.{get_hash(json.dumps(report, sort_keys=True, default=str))}"
+    charts = cache.get(key)
+    if charts is None:
+        charts = render()
+        cache.set(key, charts, CHART_CACHE_TIMEOUT)
+    return charts
+
+
+def _svg(width, height, elements):
+    """Wrap the elements of a chart in an SVG document."""
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+        f'font-family="sans-serif" font-size="12">{"".join(elements)}</svg>'
+    )
+
+
+def svg_pie_chart(aggr):
+    """Draw the compliant and non-compliant share of an aggregation, the same as `plot_visual`, as an SVG.
+
+    Args:
+        aggr (dict): The aggregation, with the `compliants` and `non_compliants` keys.
+
+    Returns:
+        str: The encoded SVG, None when there is nothing to draw.
+    """
+    if aggr["compliants"] is None:
+        return None
+    size, radius = 240, 100
+    center = size / 2
+    total = aggr["compliants"] + aggr["non_compliants"]
+    elements = []
+    if not total or not aggr["non_compliants"] or not aggr["compliants"]:
+        color = "#EEEEEE" if not total else GREEN if aggr["compliants"] else RED
+        elements.append(f'<circle cx="{center}" cy="{center}" r="{radius}" fill="{color}" stroke="#FFFFFF"/>')
+    else:
+        # The compliant slice starts at the top, counterclockwise, as the matplotlib chart does with `startangle=90`.
+        angle = 2 * math.pi * aggr["compliants"] / total
+        end_x, end_y = center - radius * math.sin(angle), center - radius * math.cos(angle)
+        large = int(angle > math.pi)
+        elements.append(
+            f'<path d="M{center},{center} L{center},{center - radius} A{radius},{radius} 0 {large},0 '
+            f'{end_x:.2f},{end_y:.2f} Z" fill="{GREEN}" stroke="#FFFFFF"/>'
+        )
+        elements.append(
+            f'<path d="M{center},{center} L{end_x:.2f},{end_y:.2f} A{radius},{radius} 0 {1 - large},0 '
+            f'{center},{center - radius} Z" fill="{RED}" stroke="#FFFFFF"/>'
+        )
+    if total:
+        elements.append(
+            f'<text x="{center}" y="{center + 4}" text-anchor="middle">'
+            f"{100 * aggr['compliants'] / total:.1f}%</text>"
+        )
+    return encode_chart(_svg(size, size, elements))
+
+
+def svg_bar_chart(features, bar_width, width, height):
+    """Draw the compliant and non-compliant results per feature, the same as `plot_barchart_visual`, as an SVG.
+
+    Args:
+        features (list): The aggregation per feature, with the `rule__feature__slug`, `compliant` and `non_compliant`
+            keys.
+        bar_width (float): The width of a bar, relative to the space of a feature.
+        width (float): The width of the chart, in inches.
+        height (float): The height of the chart, in inches.
+
+    Returns:
+        str: The encoded SVG.
+    """
+    width, height = int(width * SVG_DPI), int(height * SVG_DPI)
+    left, right, top, bottom = 60, 20, 40, 90
+    plot_width, plot_height = width - left - right, height - top - bottom
+    highest = max([item["compliant"] for item in features] + [item["non_compliant"] for item in features] + [1])
+    step = plot_width / max(len(features), 1)
+    bar = step * bar_width
+
+    elements = [
+        f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="14">Compliance per Feature</text>',
+        f'<line x1="{left}" y1="{top + plot_height}" x2="{left + plot_width}" y2="{top + plot_height}" stroke="#000000"/>',
+        f'<line x1="{left}" y1="{top}" x2="{left}" y2="{top + plot_height}" stroke="#000000"/>',
+        f'<text x="15" y="{top + plot_height / 2}" transform="rotate(-90 15 {top + plot_height / 2})" '
+        'text-anchor="middle">Compliance</text>',
+    ]
+    for tick in range(5):
+        value = highest * tick / 4
+        y_pos = top + plot_height - plot_height * tick / 4
+        elements.append(f'<text x="{left - 5}" y="{y_pos + 4:.2f}" text-anchor="end">{value:g}</text>')
+    for index, item in enumerate(features):
+        center = left + step * (index + 0.5)
+        for offset, key, color in ((-bar, "compliant", GREEN), (0, "non_compliant", RED)):
+            bar_height = plot_height * item[key] / highest
+            elements.append(
+                f'<rect x="{center + offset:.2f}" y="{top + plot_height - bar_height:.2f}" width="{bar:.2f}" '
+                f'height="{bar_height:.2f}" fill="{color}" stroke="#888888"><title>{item[key]}</title></rect>'
+            )
+        label_y = top + plot_height + 15
+        elements.append(
+            f'<text x="{center:.2f}" y="{label_y}" transform="rotate(45 {center:.2f} {label_y})">'
+            f'{escape(str(item["rule__feature__slug"]))}</text>'
+        )
+    for index, (label, color) in enumerate((("Compliant", GREEN), ("Non Compliant", RED))):
+        y_pos = top + 10 + 18 * index
+        elements.append(f'<rect x="{width - right - 120}" y="{y_pos - 10}" width="12" height="12" fill="{color}"/>')
+        elements.append(f'<text x="{width - right - 102}" y="{y_pos}">{label}</text>')
+    return encode_chart(_svg(width, height, elements))
@@ -0,0 +1,105 @@
+"""History of the compliance results, recorded as the transitions found by the compliance jobs."""
+
+import threading
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from nautobot_golden_config.models import ConfigComplianceHistory
+
+
+class ComplianceHistoryRecorder:
+    """Collect the compliance transitions found by a job, to write them with a bulk insert once the job is done.
+
+    The transitions of a job share its timestamp, so each job is a single point of the trends.
+    """
+
+    def __init__(self, timestamp=None, batch_size=1000):
+        """Set the timestamp of the transitions.
+
+        Args:
+            timestamp (datetime): The time of the job, defaults to now.
+            batch_size (int): The number of transitions inserted per query.
+        """
+        self.timestamp = timestamp or timezone.now()
+        self.batch_size = batch_size
+        self.transitions = []
+        self.lock = threading.Lock()
+
+    def record(self, device, compliance_obj, previous_obj=None):
+        """Record the result of a rule, when it is new or its compliance, missing or extra configuration changed.
+
+        Args:
+            device (Device): The device the result belongs to.
+            compliance_obj (ConfigCompliance): The result computed by the job.
+            previous_obj (ConfigCompliance): The result stored before the job, None when there was none.
+        """
+        diff_hash = compliance_obj.get_diff_hash()
+        if (
+            previous_obj is not None
+            and previous_obj.compliance_int == compliance_obj.compliance_int
+            and previous_obj.get_diff_hash() == diff_hash
+        ):
+            return
+        transition = ConfigComplianceHistory(
+            device_id=device.pk,
+            rule_id=compliance_obj.rule_id,
+            feature_id=compliance_obj.rule.feature_id,
+            site_id=device.site_id,
+            timestamp=self.timestamp,
+            compliance_int=compliance_obj.compliance_int or 0,
+            diff_hash=diff_hash,
+        )
+        with self.lock:
+            self.transitions.append(transition)
+
+    def save(self):
+        """Write the recorded transitions."""
+        with self.lock:
+            transitions, self.transitions = self.transitions, []
+        ConfigComplianceHistory.objects.bulk_create(transitions, batch_size=self.batch_size)
+
+
+def get_compliance_trend(queryset, start=None, end=None):
+    """Return the number of results, and of compliant results, after each job that recorded transitions.
+
+    The changes of the counts are aggregated per job by the database, each transition being compared to the previous
+    one of its result, so a row per job is read rather than the whole history. The jobs up to `start` are summed up
+    into the first point of the series.
+
+    Args:
+        queryset (QuerySet): The ConfigComplianceHistory queryset, e.g. filtered by feature or site.
+        start (datetime): The beginning of the series, None for the first transition.
+        end (datetime): The end of the series, None for the last transition.
+
+    Returns:
+        list: A dictionary per point, with the `timestamp`, `count`, `compliant` and `non_compliant` keys.
+    """
+    if end is not None:
+        queryset = queryset.filter(timestamp__lte=end)
+    previous = queryset.filter(
+        device=OuterRef("device"), rule=OuterRef("rule"), timestamp__lt=OuterRef("timestamp")
+    ).order_by("-timestamp")
+    changes = (
+        queryset.annotate(previous=Subquery(previous.values("compliance_int")[:1]))
+        .order_by()
+        .values("timestamp")
+        .annotate(
+            added=Count("pk", filter=Q(previous__isnull=True)),
+            compliant=Sum(F("compliance_int") - Coalesce("previous", 0)),
+        )
+        .order_by("timestamp")
+    )
+    count, compliant, series = 0, 0, []
+    for change in changes:
+        count += change["added"]
+        compliant += change["compliant"]
+        point = {"timestamp": change["timestamp"], "count": count, "compliant": compliant}
+        if series and start is not None and change["timestamp"] <= start:
+            series[-1] = point
+        else:
+            series.append(point)
+    for point in series:
+        point["non_compliant"] = point["count"] - point["compliant"]
+    return series
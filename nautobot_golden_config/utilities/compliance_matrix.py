@@ -0,0 +1,210 @@
+"""Compliance of the devices per feature as a compact matrix, to compute the compliance reports with vectorized operations."""
+
+import uuid
+from array import array
+
+import numpy as np
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+
+from nautobot_golden_config.models import ComplianceFeature
+from nautobot_golden_config.utilities.utils import get_hash
+
+# The number of seconds a matrix is kept, an outdated matrix is never served as its key holds the version of the data.
+MATRIX_CACHE_TIMEOUT = 3600
+# The version is kept in the Django cache, so the results written by any process invalidate the matrices of every one.
+COMPLIANCE_VERSION_KEY = "nautobot_golden_config.compliance_matrix.version"
+# The values of the matrix, which are the `compliance_int` of a result, or the lack of a result.
+NO_RESULT = -2
+NULL_RESULT = -1
+
+
+class ComplianceMatrix:  # pylint: disable=too-many-instance-attributes
+    """The `compliance_int` of each device, in rows sorted by device name, and feature, in columns sorted by name.
+
+    A device may have several results for a feature, e.g. from the rules of a previous platform. The matrix holds the
+    highest, as the pivot does, while the aggregates count every result, the same as the compliance summaries.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, device_ids, device_names, features, values, feature_counts, feature_compliants, non_compliant_devices
+    ):
+        """Set the matrix.
+
+        Args:
+            device_ids (list): The primary key of the device of each row.
+            device_names (list): The name of the device of each row.
+            features (list): The `(pk, name, slug)` of the feature of each column.
+            values (numpy.ndarray): The int8 matrix, with `NO_RESULT` for the devices without a result for a feature.
+            feature_counts (numpy.ndarray): The number of results of each feature.
+            feature_compliants (numpy.ndarray): The number of compliant results of each feature.
+            non_compliant_devices (numpy.ndarray): Whether each device has any non-compliant result.
+        """
+        self.device_ids = device_ids
+        self.device_names = device_names
+        self.features = features
+        self.values = values
+        self.feature_counts = feature_counts
+        self.feature_compliants = feature_compliants
+        self.non_compliant_devices = non_compliant_devices
+
+    @classmethod
+    def empty(cls):
+        """Return the matrix without any result."""
+        no_features = np.empty(0, dtype=np.int64)
+        return cls([], [], [], np.empty((0, 0), dtype=np.int8), no_features, no_features, np.empty(0, dtype=bool))
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        """Load the matrix of the results of a ConfigCompliance queryset, with a single query for the results.
+
+        Args:
+            queryset (QuerySet): The ConfigCompliance queryset, e.g. filtered and restricted by a view.
+
+        Returns:
+            ComplianceMatrix: The matrix of the results.
+        """
+        device_index, feature_index = {}, {}
+        device_ids, device_names = [], []
+        rows, columns, values = array("l"), array("l"), array("b")
+        results = queryset.order_by("device__name", "device_id").values_list(
+            "device_id", "device__name", "rule__feature_id", "compliance_int"
+        )
+        for device_id, device_name, feature_id, compliance_int in results:
+            if device_id not in device_index:
+                device_index[device_id] = len(device_ids)
+                device_ids.append(device_id)
+                device_names.append(device_name)
+            rows.append(device_index[device_id])
+            columns.append(feature_index.setdefault(feature_id, len(feature_index)))
+            values.append(NULL_RESULT if compliance_int is None else compliance_int)
+
+        features = sorted(
+            ComplianceFeature.objects.filter(pk__in=list(feature_index)).values_list("pk", "name", "slug"),
+            key=lambda feature: feature[1],
+        )
+        # The extra last column collects the results of the features deleted since the results were read.
+        matrix = np.full((len(device_ids), len(features) + 1), NO_RESULT, dtype=np.int8)
+        feature_counts = feature_compliants = np.zeros(len(features) + 1, dtype=np.int64)
+        non_compliant_devices = np.zeros(len(device_ids), dtype=bool)
+        if values:
+            # Map the columns from the order the features were seen in to the order of their names.
+            column_order = np.full(len(feature_index), len(features), dtype=np.int64)
+            for position, feature in enumerate(features):
+                column_order[feature_index[feature[0]]] = position
+            result_rows = np.frombuffer(rows, dtype=rows.typecode)
+            result_columns = column_order[np.frombuffer(columns, dtype=columns.typecode)]
+            result_values = np.frombuffer(values, dtype=np.int8)
+            # A device may have a result from the rules of a previous platform, the highest wins as with the pivot.
+            np.maximum.at(matrix, (result_rows, result_columns), result_values)
+            # The aggregates count every result, the same as the summaries and the counts of the queryset do.
+            feature_counts = np.bincount(result_columns, minlength=len(features) + 1)
+            feature_compliants = np.bincount(result_columns[result_values == 1], minlength=len(features) + 1)
+            known = result_columns < len(features)
+            non_compliant_devices[result_rows[known & (result_values == 0)]] = True
+        return cls(
+            device_ids,
+            device_names,
+            features,
+            np.ascontiguousarray(matrix[:, :-1]),
+            feature_counts[:-1],
+            feature_compliants[:-1],
+            non_compliant_devices,
+        )
+
+    @property
+    def feature_names(self):
+        """Return the name of the feature of each column."""
+        return [name for _, name, _ in self.features]
+
+    def pivot(self):
+        """Return a row per device, the same as `django_pivot` over the `compliance_int` per feature name.
+
+        Returns:
+            list: A dictionary per device, with the `device` and `device__name` keys, and the `compliance_int` per
+                feature name, None when the device has no result or a null result for the feature.
+        """
+        names = self.feature_names
+        pivot = []
+        for device_id, device_name, values in zip(self.device_ids, self.device_names, self.values.tolist()):
+            row = {"device": device_id, "device__name": device_name}
+            row.update((name, value if value >= 0 else None) for name, value in zip(names, values))
+            pivot.append(row)
+        return pivot
+
+    def feature_aggregates(self):
+        """Return the number of results, compliant and non-compliant, and the compliance percentage of each feature.
+
+        Returns:
+            list: A dictionary per feature, sorted by decreasing compliance percentage.
+        """
+        counts, compliants = self.feature_counts, self.feature_compliants
+        percents = np.divide(100 * compliants, counts, out=np.zeros(len(self.features)), where=counts > 0).round(2)
+        aggregates = [
+            {
+                "rule__feature__slug": slug,
+                "rule__feature__name": name,
+                "count": count,
+                "compliant": compliant,
+                "non_compliant": count - compliant,
+                "comp_percent": percent,
+            }
+            for (_, name, slug), count, compliant, percent in zip(
+                self.features, counts.tolist(), compliants.tolist(), percents.tolist()
+            )
+        ]
+        return sorted(aggregates, key=lambda aggregate: -aggregate["comp_percent"])
+
+    def device_aggregate(self):
+        """Return the number of devices, and of devices without any non-compliant feature."""
+        return {
+            "total": len(self.device_ids),
+            "compliants": int((~self.non_compliant_devices).sum()),
+        }
+
+    def feature_aggregate(self):
+        """Return the number of results, and of compliant results, of all the features."""
+        return {
+            "total": int(self.feature_counts.sum()),
+            "compliants": int(self.feature_compliants.sum()),
+        }
+
+
+def get_compliance_version():
+    """Return the version of the compliance results, and of the device and feature names they are reported with."""
+    return cache.get_or_set(COMPLIANCE_VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_compliance_matrices():
+    """Change the version of the compliance results, so the matrices are built again on their next use.
+
+    The version changes right away, and again once committed, so no process can build a matrix from the data of before
+    the transaction under the new version. Results changed with `QuerySet.update` or with bulk queries do not send any
+    signal, this has to be called after such changes.
+    """
+    cache.set(COMPLIANCE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    transaction.on_commit(lambda: cache.set(COMPLIANCE_VERSION_KEY, uuid.uuid4().hex, timeout=None))
+
+
+def get_compliance_matrix(queryset):
+    """Return the matrix of a ConfigCompliance queryset, from the cache when the results did not change since built.
+
+    Args:
+        queryset (QuerySet): The ConfigCompliance queryset, e.g. filtered and restricted by a view.
+
+    Returns:
+        ComplianceMatrix: The matrix of the results.
+    """
+    try:
+        # The SQL holds the filters and the permission constraints applied to the queryset.
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        return ComplianceMatrix.empty()
+    key = f"nautobot_golden_config.compliance_matrix.{get_hash(sql, get_compliance_version())}"
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = ComplianceMatrix.from_queryset(queryset)
+        cache.set(key, matrix, MATRIX_CACHE_TIMEOUT)
+    return matrix
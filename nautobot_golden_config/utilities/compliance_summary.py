@@ -0,0 +1,198 @@
+"""Summaries of the compliance results per feature, site, device and for the fleet, updated as the results are written."""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from nautobot.dcim.models import Device
+
+from nautobot_golden_config.models import (
+    ConfigCompliance,
+    DeviceComplianceSummary,
+    FeatureComplianceSummary,
+    FleetComplianceSummary,
+    SiteComplianceSummary,
+)
+from nautobot_golden_config.utilities.compliance_matrix import get_compliance_matrix, invalidate_compliance_matrices
+
+FLEET_SCOPE = "fleet"
+
+
+def _is_compliant(results):
+    """Return whether a device has results, and none of them is non-compliant, the same as the overview counts it."""
+    return bool(results) and all(compliance is not False for _, compliance in results.values())
+
+
+def _add(model, lookup, **deltas):
+    """Add to the counters of a summary row, created on the first increment, and deleted once it counts nothing.
+
+    A missing row counts nothing, so only increments can be found without a row, and only they create it.
+    """
+    if not any(deltas.values()):
+        return
+    increments = {name: F(name) + value for name, value in deltas.items()}
+    if not model.objects.filter(**lookup).update(**increments):
+        if any(value > 0 for value in deltas.values()):
+            try:
+                with transaction.atomic():
+                    model.objects.create(**lookup, **deltas)
+            except IntegrityError:
+                # Created by a concurrent job in the meantime.
+                model.objects.filter(**lookup).update(**increments)
+    elif deltas["count"] < 0:
+        model.objects.filter(**lookup, count__lte=0).delete()
+
+
+def update_device_summary(device_id, deleted=False):
+    """Update the summaries with the difference between the stored and the current compliance results of a device.
+
+    Args:
+        device_id (uuid.UUID): The primary key of the device whose results were written or deleted.
+        deleted (bool): The device is being deleted, its results are removed from the summaries.
+    """
+    with transaction.atomic():
+        # Locking the device serializes the updates of its summary, including the first one.
+        site_id = Device.objects.select_for_update().filter(pk=device_id).values_list("site_id", flat=True).first()
+        summary = DeviceComplianceSummary.objects.filter(device_id=device_id).first()
+        results = {}
+        if site_id and not deleted:
+            results = {
+                str(rule_id): [str(feature_id), compliance]
+                for rule_id, feature_id, compliance in ConfigCompliance.objects.filter(device_id=device_id).values_list(
+                    "rule_id", "rule__feature_id", "compliance"
+                )
+            }
+        if summary is None and not results:
+            return
+        if summary is not None and summary.site_id == site_id and summary.results == results:
+            return
+
+        old_site_id, old_results = (summary.site_id, summary.results) if summary else (None, {})
+        counts, compliants = Counter(), Counter()
+        for sign, site, site_results in ((-1, old_site_id, old_results), (1, site_id, results)):
+            for feature_id, compliance in site_results.values():
+                counts[site, feature_id] += sign
+                compliants[site, feature_id] += sign * (compliance is True)
+
+        # The rows are always updated in the same order, so concurrent updates of several devices can not deadlock.
+        feature_counts, feature_compliants = Counter(), Counter()
+        for (site, feature_id), count in sorted(counts.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+            _add(
+                SiteComplianceSummary,
+                {"site_id": site, "feature_id": feature_id},
+                count=count,
+                compliant=compliants[site, feature_id],
+            )
+            feature_counts[feature_id] += count
+            feature_compliants[feature_id] += compliants[site, feature_id]
+        for feature_id, count in sorted(feature_counts.items()):
+            _add(
+                FeatureComplianceSummary,
+                {"feature_id": feature_id},
+                count=count,
+                compliant=feature_compliants[feature_id],
+            )
+        _add(
+            FleetComplianceSummary,
+            {"scope": FLEET_SCOPE},
+            count=sum(counts.values()),
+            compliant=sum(compliants.values()),
+            devices=bool(results) - bool(old_results),
+            compliant_devices=_is_compliant(results) - _is_compliant(old_results),
+        )
+
+        if not results:
+            summary.delete()
+            return
+        if summary is None:
+            summary = DeviceComplianceSummary(device_id=device_id)
+        summary.site_id = site_id
+        summary.results = results
+        summary.count = len(results)
+        summary.compliant = sum(compliance is True for _, compliance in results.values())
+        summary.save()
+
+
+def rebuild_compliance_summaries():
+    """Rebuild the summaries from the compliance results, and drop the cached compliance matrices.
+
+    Results changed with `QuerySet.update` do not send any signal, this has to be called after such changes.
+    """
+    with transaction.atomic():
+        for model in (FleetComplianceSummary, FeatureComplianceSummary, SiteComplianceSummary, DeviceComplianceSummary):
+            model.objects.all().delete()
+        for device_id in ConfigCompliance.objects.order_by().values_list("device_id", flat=True).distinct():
+            update_device_summary(device_id)
+        invalidate_compliance_matrices()
+
+
+def get_site_summary(site):
+    """Return the number of compliant and non-compliant results of each feature for the devices of a site.
+
+    Args:
+        site (Site): The site to report on.
+
+    Returns:
+        list: A dictionary per feature, sorted by feature name.
+    """
+    return [
+        {"rule__feature__name": name, "compliant": compliant, "non_compliant": count - compliant}
+        for name, count, compliant in SiteComplianceSummary.objects.filter(site=site, count__gt=0)
+        .order_by("feature__name")
+        .values_list("feature__name", "count", "compliant")
+    ]
+
+
+class ComplianceSummary:
+    """The reports of all the compliance results, read from the summaries, the same as from a `ComplianceMatrix`."""
+
+    def feature_aggregates(self):
+        """Return the number of results, compliant and non-compliant, and the compliance percentage of each feature.
+
+        Returns:
+            list: A dictionary per feature, sorted by decreasing compliance percentage.
+        """
+        aggregates = [
+            {
+                "rule__feature__slug": slug,
+                "rule__feature__name": name,
+                "count": count,
+                "compliant": compliant,
+                "non_compliant": count - compliant,
+                "comp_percent": round(100 * compliant / count, 2),
+            }
+            for slug, name, count, compliant in FeatureComplianceSummary.objects.filter(count__gt=0)
+            .order_by("feature__name")
+            .values_list("feature__slug", "feature__name", "count", "compliant")
+        ]
+        return sorted(aggregates, key=lambda aggregate: -aggregate["comp_percent"])
+
+    @staticmethod
+    def _get_fleet():
+        """Return the fleet summary, empty when no result was written yet."""
+        return FleetComplianceSummary.objects.filter(scope=FLEET_SCOPE).first() or FleetComplianceSummary()
+
+    def device_aggregate(self):
+        """Return the number of devices, and of devices without any non-compliant feature."""
+        fleet = self._get_fleet()
+        return {"total": fleet.devices, "compliants": fleet.compliant_devices}
+
+    def feature_aggregate(self):
+        """Return the number of results, and of compliant results, of all the features."""
+        fleet = self._get_fleet()
+        return {"total": fleet.count, "compliants": fleet.compliant}
+
+
+def get_compliance_report(queryset):
+    """Return the reports of a ConfigCompliance queryset, from the summaries when it is neither filtered nor restricted.
+
+    Args:
+        queryset (QuerySet): The ConfigCompliance queryset, e.g. filtered and restricted by a view.
+
+    Returns:
+        ComplianceSummary or ComplianceMatrix: The reports of the results of the queryset.
+    """
+    if not queryset.query.where:
+        return ComplianceSummary()
+    return get_compliance_matrix(queryset)
@@ -0,0 +1,156 @@
+"""Parse a device configuration once, and reuse the parsed lines for every compliance rule of the device."""
+
+from netutils.config.compliance import parser_map
+
+
+class ConfigSection(str):
+    """The text of a configuration section, which keeps the parsed lines it was built from.
+
+    Being a `str`, it can be stored as is in the `actual` and `intended` fields of `ConfigCompliance`, while
+    `section_compliance` leverages the `config_lines` attribute to avoid parsing the section again.
+    """
+
+    def __new__(cls, text, config_lines=None):
+        """Create the string, and attach the parsed lines."""
+        section = super().__new__(cls, text)
+        section.config_lines = config_lines
+        return section
+
+
+class ParsedConfig:
+    """A device configuration, with the parent/child hierarchy built a single time."""
+
+    def __init__(self, config, network_os):
+        """Parse the configuration.
+
+        Args:
+            config (str): The full device configuration.
+            network_os (str): Device network operating system that is in netutils parser_map keys.
+        """
+        self.config = config
+        self.network_os = network_os
+        self.config_lines = parser_map[network_os](config).config_lines
+
+    def section(self, section_starts_with):
+        """Return the section of the configuration matching the provided parent lines.
+
+        This follows the same logic as netutils `section_config`, without parsing the configuration again.
+
+        Args:
+            section_starts_with (list): The lines the parent most configuration start with, e.g. `["router bgp"]`.
+
+        Returns:
+            ConfigSection: The matching configuration, the full configuration if no section is provided.
+        """
+        if not section_starts_with:
+            return self.config
+
+        match = False
+        section_lines = []
+        for line in self.config_lines:
+            if match:
+                if line.parents:
+                    section_lines.append(line)
+                    continue
+                match = False
+            for line_start in section_starts_with:
+                if not match and line.config_line.startswith(line_start):
+                    section_lines.append(line)
+                    match = True
+        return ConfigSection("\n".join(line.config_line for line in section_lines).strip(), section_lines)
+
+
+def _get_config_lines(config, network_os):
+    """Return the parsed lines of a configuration, only parsing it when it is not a `ConfigSection`."""
+    config_lines = getattr(config, "config_lines", None)
+    if config_lines is None:
+        config_lines = parser_map[network_os](config).config_lines
+    return config_lines
+
+
+def _diff_config_lines(compare_lines, base_lines):
+    """Identify which lines in compare_lines are not in base_lines, as netutils `diff_network_config` does."""
+    base = set(base_lines)
+    needed_lines = []
+    seen = set()
+    for line in compare_lines:
+        if line not in base:
+            for parent in line.parents:
+                if parent not in seen:
+                    needed_lines.append(parent)
+                    seen.add(parent)
+            needed_lines.append(line.config_line)
+            seen.add(line.config_line)
+    return "\n".join(needed_lines)
+
+
+def section_compliance(feature, backup_cfg, intended_cfg, network_os):
+    """Report compliance of a single feature, the same as netutils `feature_compliance`.
+
+    When provided `ConfigSection` objects, the lines parsed when sectioning the full configuration are reused.
+
+    Args:
+        feature (dict): A dictionary with the attributes of the feature check.
+        backup_cfg (str): Running config or config backup of a specific feature to compare.
+        intended_cfg (str): Intended config of a specific feature to compare.
+        network_os (str): Device network operating system that is in netutils parser_map keys.
+
+    Returns:
+        dict: Compliance information of a single feature.
+    """
+    feature_data = {
+        "compliant": None,
+        "missing": None,
+        "extra": None,
+        "cannot_parse": True,
+        "unordered_compliant": None,
+        "ordered_compliant": None,
+        "actual": backup_cfg,
+        "intended": intended_cfg,
+    }
+    # Check for ordered compliant which is accomplished with a simple exact match
+    feature_data["ordered_compliant"] = (not intended_cfg and not backup_cfg) or intended_cfg == backup_cfg
+
+    if feature_data["ordered_compliant"]:
+        feature_data.update({"missing": "", "extra": "", "unordered_compliant": True})
+    elif backup_cfg and intended_cfg:
+        backup_lines = _get_config_lines(backup_cfg, network_os)
+        intended_lines = _get_config_lines(intended_cfg, network_os)
+        missing = _diff_config_lines(intended_lines, backup_lines)
+        extra = _diff_config_lines(backup_lines, intended_lines)
+        if not missing and not extra:
+            unordered_compliant = not set(intended_cfg.splitlines()).difference(backup_cfg.splitlines())
+        else:
+            unordered_compliant = False
+        feature_data.update({"missing": missing, "extra": extra, "unordered_compliant": unordered_compliant})
+
+    if feature["ordered"] is True:
+        feature_data["compliant"] = feature_data["ordered_compliant"]
+    elif feature["ordered"] is False:
+        feature_data["compliant"] = feature_data["unordered_compliant"]
+    else:
+        raise ValueError(f"The `ordered` attribute of the feature must be a boolean, got {feature['ordered']}.")
+
+    return feature_data
+
+
+def cli_compliance(feature, backup_cfg, intended_cfg, network_os):
+    """Return the compliance details of a CLI feature, in the format stored on `ConfigCompliance`.
+
+    Args:
+        feature (dict): A dictionary with the attributes of the feature check.
+        backup_cfg (str): Running config or config backup of a specific feature to compare.
+        intended_cfg (str): Intended config of a specific feature to compare.
+        network_os (str): Device network operating system that is in netutils parser_map keys.
+
+    Returns:
+        dict: The `compliance`, `compliance_int`, `ordered`, `missing` and `extra` values.
+    """
+    value = section_compliance(feature, backup_cfg, intended_cfg, network_os)
+    return {
+        "compliance": value["compliant"],
+        "compliance_int": 1 if value["compliant"] else 0,
+        "ordered": value["ordered_compliant"],
+        "missing": value["missing"] or "",
+        "extra": value["extra"] or "",
+    }
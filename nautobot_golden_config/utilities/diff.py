@@ -0,0 +1,238 @@
+"""Unified diff of configurations, with bounded memory and runtime for very large configurations."""
+
+import difflib
+import time
+
+from array import array
+from bisect import bisect_left
+
+# Up to this number of lines, both sides together, the diff is done by `difflib` to keep its exact output.
+DIFFLIB_MAX_LINES = 20000
+# The number of lines the diff is truncated after, when no other limit is set.
+DEFAULT_MAX_LINES = 100000
+
+
+def _intern_lines(lines, line_ids, id_lines):
+    """Return the lines as a compact array of ids, the same line always getting the same id."""
+    ids = array("L")
+    for line in lines:
+        line_id = line_ids.get(line)
+        if line_id is None:
+            line_id = line_ids[line] = len(id_lines)
+            id_lines.append(line)
+        ids.append(line_id)
+    return ids
+
+
+def _unique_anchors(a, b, alo, ahi, blo, bhi):
+    """Return the longest increasing sequence of the lines unique to both ranges, as in the patience diff."""
+    a_count, b_count = {}, {}
+    for i in range(alo, ahi):
+        a_count[a[i]] = i if a[i] not in a_count else None
+    for j in range(blo, bhi):
+        b_count[b[j]] = j if b[j] not in b_count else None
+    pairs = [(i, b_count[line]) for line, i in a_count.items() if i is not None and b_count.get(line) is not None]
+    pairs.sort()
+
+    # Patience sorting on the positions in b, keeping the back references to rebuild the sequence.
+    tails, tails_index, previous = [], [], [None] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        position = bisect_left(tails, j)
+        if position:
+            previous[index] = tails_index[position - 1]
+        if position == len(tails):
+            tails.append(j)
+            tails_index.append(index)
+        else:
+            tails[position] = j
+            tails_index[position] = index
+
+    anchors = []
+    index = tails_index[-1] if tails_index else None
+    while index is not None:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _matching_blocks(a, b, deadline):
+    """Return the matching blocks of two sequences of line ids, and the ranges left when the deadline was reached.
+
+    Common prefix and suffix are matched first, the remaining ranges are split on the lines unique to both sides,
+    and small ranges are handed to `difflib`. The ranges left when the deadline is reached are reported as replaced,
+    they are returned as a set of their `(alo, blo)` starts.
+    """
+    blocks = []
+    timed_out = set()
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > start:
+            blocks.append((start, blo - (alo - start), alo - start))
+        end = ahi
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        if end > ahi:
+            blocks.append((ahi, bhi, end - ahi))
+        if alo == ahi or blo == bhi:
+            continue
+        if time.monotonic() > deadline:
+            timed_out.add((alo, blo))
+            continue
+        if (ahi - alo) + (bhi - blo) <= DIFFLIB_MAX_LINES:
+            matcher = difflib.SequenceMatcher(None, a[alo:ahi], b[blo:bhi], autojunk=False)
+            blocks.extend((alo + i, blo + j, size) for i, j, size in matcher.get_matching_blocks() if size)
+            continue
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        for i, j in anchors:
+            blocks.append((i, j, 1))
+            stack.append((alo, i, blo, j))
+            alo, blo = i + 1, j + 1
+        if anchors:
+            stack.append((alo, ahi, blo, bhi))
+
+    blocks.sort()
+    merged = []
+    for i, j, size in blocks:
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + size)
+        else:
+            merged.append((i, j, size))
+    merged.append((len(a), len(b), 0))
+    return merged, timed_out
+
+
+def _opcodes(blocks):
+    """Convert matching blocks to opcodes, the same as `difflib.SequenceMatcher.get_opcodes`."""
+    codes = []
+    i = j = 0
+    for ai, bj, size in blocks:
+        tag = ""
+        if i < ai and j < bj:
+            tag = "replace"
+        elif i < ai:
+            tag = "delete"
+        elif j < bj:
+            tag = "insert"
+        if tag:
+            codes.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            codes.append(("equal", ai, i, bj, j))
+    return codes
+
+
+def _grouped_opcodes(codes, context):
+    """Group the opcodes in hunks, the same as `difflib.SequenceMatcher.get_grouped_opcodes`."""
+    if not codes:
+        codes = [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > context * 2:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start, stop):
+    """Convert a range to the `start,length` format of the unified diff hunk headers."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _diff_lines(groups, a, b, id_lines, timed_out):
+    """Yield the lines of the hunks, with a single summary line for each range not diffed within the time limit."""
+    yield "--- "
+    yield "+++ "
+    for group in groups:
+        first, last = group[0], group[-1]
+        yield f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + id_lines[line]
+                continue
+            if (i1, j1) in timed_out:
+                yield f"\\ {i2 - i1} lines replaced by {j2 - j1} lines, not diffed within the time limit."
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + id_lines[line]
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + id_lines[line]
+
+
+def unified_diff(a_lines, b_lines, context=3, max_seconds=None, max_lines=None):
+    """Yield the lines of the unified diff of two configurations, the same as `difflib.unified_diff` with `lineterm=""`.
+
+    Up to `DIFFLIB_MAX_LINES` lines the diff is done by `difflib`. Larger configurations are diffed on line ids with a
+    patience diff, so the lines are only kept once in memory and the common lines are matched in close to linear time.
+
+    Args:
+        a_lines (iterable): The lines of the original configuration, e.g. a file object of the backup.
+        b_lines (iterable): The lines of the new configuration, e.g. a file object of the intended configuration.
+        context (int): The number of context lines around the changes.
+        max_seconds (float): When reached, each range not diffed yet is summarized as replaced, in a single line.
+        max_lines (int): The number of lines after which the diff is truncated, with a summary of the whole diff.
+
+    Yields:
+        str: The lines of the diff, followed by a `\\` line when the diff was simplified or truncated.
+    """
+    line_ids, id_lines = {}, []
+    a = _intern_lines(a_lines, line_ids, id_lines)
+    b = _intern_lines(b_lines, line_ids, id_lines)
+    del line_ids
+
+    timed_out = set()
+    if len(a) + len(b) <= DIFFLIB_MAX_LINES:
+        groups = list(difflib.SequenceMatcher(None, a, b).get_grouped_opcodes(context))
+    else:
+        deadline = time.monotonic() + max_seconds if max_seconds else float("inf")
+        blocks, timed_out = _matching_blocks(a, b, deadline)
+        groups = list(_grouped_opcodes(_opcodes(blocks), context))
+    if not groups:
+        return
+
+    count = 0
+    for line in _diff_lines(groups, a, b, id_lines, timed_out):
+        if max_lines and count >= max_lines:
+            removed = added = 0
+            for group in groups:
+                for tag, i1, i2, j1, j2 in group:
+                    removed += i2 - i1 if tag in ("replace", "delete") else 0
+                    added += j2 - j1 if tag in ("replace", "insert") else 0
+            yield (
+                f"\\ Diff truncated after {max_lines} lines, the diff has {len(groups)} hunks, "
+                f"with {removed} lines removed and {added} lines added."
+            )
+            break
+        yield line
+        count += 1
+    if timed_out:
+        yield (
+            f"\\ Diff simplified, the time limit of {max_seconds} seconds was reached, "
+            f"{len(timed_out)} ranges were not diffed."
+        )
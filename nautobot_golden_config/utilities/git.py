@@ -1,11 +1,22 @@
 """Git helper methods and class."""
 
+import collections
+import contextlib
+import io
 import os
 import re
 import logging
+import tempfile
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 from git import Repo
+from git.exc import BadName, BadObject
+from nautobot.extras.datasources.git import ensure_git_repository
+
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
 
 
 LOGGER = logging.getLogger(__name__)
@@ -48,19 +59,281 @@ class GitRepo:
             LOGGER.debug("URL `%s` was not currently set, setting", self.url)
             self.repo.remotes.origin.set_url(self.url)
 
+    @property
+    def head(self):
+        """Return the sha of the commit currently checked out, None for a repository without any commit."""
+        if not self.repo.head.is_valid():
+            return None
+        return self.repo.head.commit.hexsha
+
     def commit_with_added(self, commit_description):
         """Make a force commit.
 
         Args:
             commit_description (str): the description of commit
+
+        Returns:
+            str: The sha of the new commit.
         """
         LOGGER.debug("Committing with message `%s`", commit_description)
         self.repo.git.add(self.repo.untracked_files)
         self.repo.git.add(update=True)
-        self.repo.index.commit(commit_description)
+        commit = self.repo.index.commit(commit_description)
+        LOGGER.debug("Commit completed")
+        return commit.hexsha
+
+    def commit_files(self, files, commit_description):
+        """Make a commit of the files provided only, rather than of every change of the working tree.
+
+        The files are staged with a single `git update-index`, which only reads the files provided, so the cost does not
+        grow with the number of files of the repository.
+
+        Args:
+            files (list): The absolute path of the files written, those outside of the repository are ignored.
+            commit_description (str): the description of commit
+
+        Returns:
+            str: The sha of the new commit.
+        """
+        paths = []
+        for path in files:
+            path = os.path.relpath(path, self.path)
+            if path != os.pardir and not path.startswith(os.pardir + os.sep):
+                paths.append(path)
+        LOGGER.debug("Committing %s files with message `%s`", len(paths), commit_description)
+        if paths:
+            with tempfile.TemporaryFile() as pathspec:
+                pathspec.write(b"".join(path.encode("utf-8") + b"\0" for path in sorted(set(paths))))
+                pathspec.seek(0)
+                self.repo.git.update_index("--add", "-z", "--stdin", istream=pathspec)
+        commit = self.repo.index.commit(commit_description)
         LOGGER.debug("Commit completed")
+        return commit.hexsha
+
+    def changed_files(self, previous_commit, new_commit="HEAD"):
+        """Return the files added, modified or deleted between two commits.
+
+        Args:
+            previous_commit (str): The sha, or any git revision, of the older commit. None when every file of
+                `new_commit` should be considered as changed, such as for a repository that had no commit yet.
+            new_commit (str): The sha, or any git revision, of the newer commit.
+
+        Returns:
+            list: The absolute path of each changed file.
+
+        Raises:
+            ValueError: When a revision is not a commit of the repository.
+        """
+        LOGGER.debug("Diff files between `%s` and `%s`", previous_commit, new_commit)
+        # Only the resolved shas reach the git command line, a revision could otherwise be read as an option.
+        new_commit = self.resolve(new_commit)
+        if previous_commit is None:
+            changed = self.repo.git.ls_tree(new_commit, r=True, name_only=True)
+        else:
+            changed = self.repo.git.diff(self.resolve(previous_commit), new_commit, name_only=True)
+        return [os.path.join(self.path, path) for path in changed.splitlines()]
+
+    def resolve(self, revision):
+        """Return the sha of the commit a revision resolves to.
+
+        Args:
+            revision (str): Any git revision, e.g. a commit sha, a tag or `HEAD~1`.
+
+        Returns:
+            str: The sha of the commit.
+
+        Raises:
+            ValueError: When the revision is not a commit of the repository.
+        """
+        if revision.startswith("-"):
+            raise ValueError(f"The revision `{revision}` is not a commit of the repository at {self.path}.")
+        try:
+            return self.repo.commit(revision).hexsha
+        except (BadName, BadObject, ValueError) as error:
+            raise ValueError(f"The revision `{revision}` is not a commit of the repository at {self.path}.") from error
 
     def push(self):
         """Push latest to the git repo."""
         LOGGER.debug("Push changes to repo")
         self.repo.remotes.origin.push()
+
+
+class GitObjectReader:
+    """Read the files of a revision straight from the object database of the repositories, without any checkout.
+
+    The files are streamed by the persistent `git cat-file --batch` process of each repository, rather than opened one
+    by one. The revision is resolved to a commit once per repository, so a job reads a consistent snapshot, and the
+    reader is shared by the threads of the job.
+    """
+
+    def __init__(self, revision="HEAD"):
+        """Set the revision to read the files of.
+
+        Args:
+            revision (str): Any git revision, e.g. a commit sha, a tag or `HEAD~1`.
+        """
+        self.revision = revision
+        self.repos = {}
+        self.lock = threading.Lock()
+
+    def _get_repo(self, repository_path):
+        """Return the repository, and the commit the revision resolves to in it."""
+        if repository_path not in self.repos:
+            repo = Repo(path=repository_path)
+            try:
+                commit = repo.commit(self.revision).hexsha
+            except (BadName, BadObject, ValueError) as error:
+                repo.close()
+                raise ValueError(
+                    f"The revision `{self.revision}` is not a commit of the repository at {repository_path}."
+                ) from error
+            self.repos[repository_path] = (repo, commit)
+        return self.repos[repository_path]
+
+    def read(self, repository_path, file_path):
+        """Return the content of a file at the revision, the same as it would be read from a checkout of it.
+
+        Args:
+            repository_path (str): The working directory of the repository.
+            file_path (str): The absolute path of the file in the working directory.
+
+        Returns:
+            str: The content of the file, None when there is no such file at the revision.
+        """
+        path = os.path.relpath(file_path, repository_path).replace(os.sep, "/")
+        if path == os.pardir or path.startswith(f"{os.pardir}/") or "\n" in path:
+            return None
+        with self.lock:
+            repo, commit = self._get_repo(repository_path)
+            try:
+                _, type_name, _, data = repo.git.get_object_data(f"{commit}:{path}")
+            except ValueError:
+                return None
+        if type_name not in (b"blob", "blob"):
+            return None
+        # Decoded with universal newlines, the same as a file opened in text mode.
+        return io.StringIO(data.decode("utf-8"), newline=None).read()
+
+    def close(self):
+        """Stop the `git cat-file` processes."""
+        with self.lock:
+            for repo, _ in self.repos.values():
+                repo.close()
+            self.repos = {}
+
+
+def push_repos(repos):
+    """Push several repositories at once, as each push mostly waits on the remote.
+
+    Args:
+        repos (list): The `GitRepo` objects to push.
+    """
+    if not repos:
+        return
+    with ThreadPoolExecutor(max_workers=len(repos)) as executor:
+        for future in [executor.submit(repo.push) for repo in repos]:
+            future.result()
+
+
+class RepositoryManager:
+    """Keep the `GitRepo` of each repository of a worker, so the repositories are opened once and fetched less often.
+
+    A repository is fetched again once the `git_fetch_interval` setting, in seconds, elapsed since its last fetch, but
+    for the repositories a job commits to, which are fetched for every job, as a commit on a stale clone could not be
+    pushed. Within a `session`, such as the jobs chained by the jobs running them all, each repository is fetched once
+    at most. Each repository has its own lock, so the jobs fetching different repositories do not wait on each other.
+    """
+
+    def __init__(self):
+        """Start without any repository."""
+        self.repos = {}
+        self.lock = threading.Lock()
+        self.repo_locks = collections.defaultdict(threading.Lock)
+        self.local = threading.local()
+
+    def _get_lock(self, repository_record):
+        """Return the lock of a repository, guarding its handle and its fetches."""
+        with self.lock:
+            return self.repo_locks[repository_record.pk]
+
+    @staticmethod
+    def _get_key(repository_record):
+        """Return what the `GitRepo` of a repository is built from, a handle is only reused while it is the same."""
+        return (
+            repository_record.filesystem_path,
+            repository_record.remote_url,
+            repository_record.branch,
+            repository_record.username,
+            repository_record._token,  # pylint: disable=protected-access
+        )
+
+    def _get_entry(self, repository_record):
+        """Return the `[key, GitRepo, last fetch]` of a repository, dropped when the record or the clone changed."""
+        entry = self.repos.get(repository_record.pk)
+        if entry and (entry[0] != self._get_key(repository_record) or not os.path.isdir(entry[1].path)):
+            del self.repos[repository_record.pk]
+            return None
+        return entry
+
+    def _add_entry(self, repository_record, fetched):
+        """Open the repository, cloning it when missing, and keep its handle."""
+        entry = [self._get_key(repository_record), GitRepo(repository_record), fetched]
+        self.repos[repository_record.pk] = entry
+        return entry
+
+    def get(self, repository_record):
+        """Return the `GitRepo` of a repository, without fetching it.
+
+        Args:
+            repository_record (GitRepository): Django ORM object from GitRepository.
+
+        Returns:
+            GitRepo: The handle of the repository, shared by the jobs of the worker.
+        """
+        with self._get_lock(repository_record):
+            entry = self._get_entry(repository_record) or self._add_entry(repository_record, float("-inf"))
+            return entry[1]
+
+    def ensure(self, repository_record, job_result, commit=False):
+        """Return the `GitRepo` of a repository, fetched and reset to the latest commit unless it still is fresh.
+
+        Args:
+            repository_record (GitRepository): Django ORM object from GitRepository.
+            job_result (JobResult): The result of the job, the fetch is logged to.
+            commit (bool): Whether the job commits to the repository, it is then fetched regardless of the interval.
+
+        Returns:
+            GitRepo: The handle of the repository, shared by the jobs of the worker.
+        """
+        session = getattr(self.local, "session", None)
+        fetch_interval = 0 if commit else PLUGIN_CFG.get("git_fetch_interval", 0)
+        with self._get_lock(repository_record):
+            entry = self._get_entry(repository_record)
+            fresh = entry is not None and (
+                (session is not None and repository_record.pk in session)
+                or time.monotonic() - entry[2] < fetch_interval
+            )
+            if not fresh:
+                ensure_git_repository(repository_record, job_result)
+                entry = entry or self._add_entry(repository_record, None)
+                entry[2] = time.monotonic()
+            else:
+                LOGGER.debug("Git repository `%s` was fetched recently, reuse it", repository_record)
+            if session is not None:
+                session.add(repository_record.pk)
+            return entry[1]
+
+    @contextlib.contextmanager
+    def session(self):
+        """Fetch each repository once at most until the block exits, e.g. while chained jobs run in this thread."""
+        if getattr(self.local, "session", None) is not None:
+            yield
+            return
+        self.local.session = set()
+        try:
+            yield
+        finally:
+            self.local.session = None
+
+
+repository_manager = RepositoryManager()  # pylint: disable=invalid-name
@@ -1,28 +1,49 @@
 """Example code to execute GraphQL query from the ORM."""
 
 import logging
+import threading
+
+from functools import lru_cache
 
 from django.utils.module_loading import import_string
 from graphene_django.settings import graphene_settings
 from graphql import get_default_backend
 from graphql.error import GraphQLSyntaxError
+from graphql.language import ast
+from graphql.language.parser import parse
+from graphql.language.printer import print_ast
 
 from nautobot_golden_config.utilities.constant import PLUGIN_CFG
 
 LOGGER = logging.getLogger(__name__)
 
+# The number of distinct queries whose parsed and validated document is kept, in practice the settings only hold one.
+DOCUMENT_CACHE_SIZE = 32
+# The alias of the device id added to the batched query, used to split the results per device.
+BATCH_ID_ALIAS = "golden_config_device_id"
+
+
+@lru_cache(maxsize=DOCUMENT_CACHE_SIZE)
+def get_document(schema, query):
+    """Return the parsed and validated GraphQL document of a query, cached per schema and query text.
+
+    The same `sot_agg_query` is run for every device, so only the first call parses and validates it. Queries with
+    a syntax error raise `GraphQLSyntaxError`, and are not cached.
+    """
+    LOGGER.debug("GraphQL - parse query: `%s`", str(query))
+    return get_default_backend().document_from_string(schema, query)
+
 
 def graph_ql_query(request, device, query):
     """Function to run graphql and transposer command."""
     LOGGER.debug("GraphQL - request for `%s`", str(device))
-    backend = get_default_backend()
     schema = graphene_settings.SCHEMA
 
     LOGGER.debug("GraphQL - set query variable to device.")
     variables = {"device_id": str(device.pk)}
     try:
         LOGGER.debug("GraphQL - test query: `%s`", str(query))
-        document = backend.document_from_string(schema, query)
+        document = get_document(schema, query)
 
     except GraphQLSyntaxError as error:
         LOGGER.warning("GraphQL - test query Failed: `%s`", str(query))
@@ -37,6 +58,11 @@ def graph_ql_query(request, device, query):
 
     data = data.get("device", {})
 
+    return _transpose(data)
+
+
+def _transpose(data):
+    """Run the `sot_agg_transposer` function, if any, on the data of a device."""
     if PLUGIN_CFG.get("sot_agg_transposer"):
         LOGGER.debug("GraphQL - tansform data with function: `%s`", str(PLUGIN_CFG.get("sot_agg_transposer")))
         try:
@@ -46,3 +72,129 @@ def graph_ql_query(request, device, query):
 
     LOGGER.debug("GraphQL - request successful")
     return (200, data)
+
+
+def get_batch_query(query):
+    """Convert a single device query into a query for a list of devices.
+
+    The `device(id: $device_id)` field becomes `devices(id: $device_ids)`, and the id of the device is selected under
+    the `BATCH_ID_ALIAS` alias, so the results can be split per device.
+
+    Args:
+        query (str): The `sot_agg_query`, starting with `query ($device_id: ID!)`.
+
+    Returns:
+        str: The query for a list of devices.
+
+    Raises:
+        ValueError: When the query does not have a `device` field filtered on `$device_id`.
+    """
+    document = parse(query)
+    operations = [definition for definition in document.definitions if isinstance(definition, ast.OperationDefinition)]
+    if len(operations) != 1:
+        raise ValueError("The query must have exactly one operation to be run for a batch of devices.")
+    operation = operations[0]
+
+    device_fields = [
+        selection
+        for selection in operation.selection_set.selections
+        if isinstance(selection, ast.Field) and selection.name.value == "device" and selection.alias is None
+    ]
+    device_args = [
+        argument
+        for field in device_fields
+        for argument in field.arguments
+        if argument.name.value == "id"
+        and isinstance(argument.value, ast.Variable)
+        and argument.value.name.value == "device_id"
+    ]
+    if len(device_fields) != 1 or len(device_args) != 1 or len(operation.selection_set.selections) != 1:
+        raise ValueError(
+            "The query must only select the `device(id: $device_id)` field to be run for a batch of devices."
+        )
+
+    device_fields[0].name = ast.Name(value="devices")
+    device_args[0].value = ast.Variable(name=ast.Name(value="device_ids"))
+    device_fields[0].selection_set.selections.append(
+        ast.Field(alias=ast.Name(value=BATCH_ID_ALIAS), name=ast.Name(value="id"))
+    )
+    operation.variable_definitions = [
+        ast.VariableDefinition(
+            variable=ast.Variable(name=ast.Name(value="device_ids")),
+            type=ast.ListType(type=ast.NamedType(name=ast.Name(value="String"))),
+        )
+    ]
+    return print_ast(document)
+
+
+class BatchedSotAggQuery:
+    """Run the `sot_agg_query` for chunks of devices, instead of once per device.
+
+    The chunk of a device is queried the first time the data of one of its devices is requested, and the data is
+    handed over only once, so at most the data of the chunks being rendered is kept in memory. The instance is
+    shared by the Nornir threads of a job, each chunk has its own lock so the chunks are queried concurrently.
+    """
+
+    def __init__(self, request, device_ids, query, batch_size):
+        """Split the devices in chunks, and build the batched query.
+
+        Args:
+            request (WSGIRequest): The request the query is run with.
+            device_ids (list): The primary keys of the devices of the job.
+            query (str): The `sot_agg_query`.
+            batch_size (int): The number of devices queried at once.
+
+        Raises:
+            ValueError: When the query can not be converted to a query for a list of devices.
+        """
+        self.request = request
+        self.batch_query = get_batch_query(query)
+        device_ids = [str(device_id) for device_id in device_ids]
+        self.chunks = {}
+        for index in range(0, len(device_ids), batch_size):
+            chunk = device_ids[index : index + batch_size]
+            for device_id in chunk:
+                self.chunks[device_id] = chunk
+        self.results = {}
+        self.chunk_locks = {}
+        self.lock = threading.Lock()
+
+    def _run_chunk(self, chunk):
+        """Run the batched query for a chunk of devices, and store the status and data of each of them."""
+        LOGGER.debug("GraphQL - execute batched query for %s device(s)", len(chunk))
+        try:
+            document = get_document(graphene_settings.SCHEMA, self.batch_query)
+        except GraphQLSyntaxError as error:
+            self.results.update({device_id: (400, {"error": str(error)}) for device_id in chunk})
+            return
+
+        result = document.execute(context_value=self.request, variable_values={"device_ids": chunk})
+        if result.invalid:
+            LOGGER.warning("GraphQL - batched query executed unsuccessfully")
+            self.results.update({device_id: (400, result.to_dict()) for device_id in chunk})
+            return
+
+        devices = {str(data.pop(BATCH_ID_ALIAS)): data for data in result.data.get("devices") or []}
+        for device_id in chunk:
+            if device_id not in devices:
+                self.results[device_id] = (400, {"error": f"The device {device_id} was not returned by the query."})
+            else:
+                self.results[device_id] = _transpose(devices[device_id])
+
+    def query(self, device):
+        """Return the status and data of a device, the same as `graph_ql_query`.
+
+        Args:
+            device (Device): A device of the job.
+
+        Returns:
+            tuple: The status code, and the data or the error.
+        """
+        device_id = str(device.pk)
+        chunk = self.chunks.get(device_id, [device_id])
+        with self.lock:
+            chunk_lock = self.chunk_locks.setdefault(chunk[0], threading.Lock())
+        with chunk_lock:
+            if device_id not in self.results:
+                self._run_chunk(chunk)
+            return self.results.pop(device_id)
@@ -1,14 +1,16 @@
 """Helper functions."""
 # pylint: disable=raise-missing-from
 
-from jinja2 import exceptions as jinja_errors
+from functools import lru_cache
+
+from jinja2 import exceptions as jinja_errors, nodes as jinja_nodes
 
 from django import forms
-from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.template import engines
 
 from nautobot.dcim.models import Device
 from nautobot.dcim.filters import DeviceFilterSet
-from nautobot.utilities.utils import render_jinja2
 
 from nornir_nautobot.exceptions import NornirNautobotException
 from nornir_nautobot.utils.logger import NornirLogger
@@ -28,9 +30,25 @@ FIELDS = {
     "device_type",
 }
 
+# The number of distinct templates kept compiled, the settings hold a handful of path and matching rule templates.
+TEMPLATE_CACHE_SIZE = 128
+
 
 def get_job_filter(data=None):
-    """Helper function to return a the filterable list of OS's based on platform.slug and a specific custom value."""
+    """Helper function to return a the filterable list of OS's based on platform.slug and a specific custom value.
+
+    The devices are selected by a subquery on the primary keys, so the queryset stays lazy, and a plain Device
+    queryset whatever the filters and scope applied.
+
+    Args:
+        data (dict): The data of the job, with the optional `device` and `FIELDS` filters.
+
+    Returns:
+        QuerySet: The devices of the job.
+
+    Raises:
+        NornirNautobotException: When any of the devices has no platform defined.
+    """
     if not data:
         data = {}
     query = {}
@@ -44,12 +62,13 @@ def get_job_filter(data=None):
         query.update({"id": data["device"].values_list("pk", flat=True)})
 
     base_qs = models.GoldenConfigSetting.objects.first().get_queryset()
-    if DeviceFilterSet(data=query, queryset=base_qs).qs.filter(platform__isnull=True).count() > 0:
+    filtered_qs = DeviceFilterSet(data=query, queryset=base_qs).qs
+    no_platform = list(filtered_qs.filter(platform__isnull=True).values_list("name", flat=True))
+    if no_platform:
         raise NornirNautobotException(
-            f"The following device(s) {', '.join([device.name for device in DeviceFilterSet(data=query, queryset=base_qs).qs.filter(platform__isnull=True)])} have no platform defined. Platform is required."
+            f"The following device(s) {', '.join(no_platform)} have no platform defined. Platform is required."
         )
-
-    return DeviceFilterSet(data=query, queryset=base_qs).qs
+    return Device.objects.filter(pk__in=filtered_qs.values_list("pk", flat=True))
 
 
 def null_to_empty(val):
@@ -67,6 +86,91 @@ def verify_global_settings(logger, global_settings, attrs):
             raise NornirNautobotException()
 
 
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def get_jinja_template(template):
+    """Return the compiled Jinja template of a template string, cached on the template source.
+
+    The same path and matching rule templates are rendered for every device of every play, so they are compiled once
+    with the same engine as nautobot `render_jinja2`. The cache is cleared when the `GoldenConfigSetting` is saved.
+
+    Args:
+        template (str): A Jinja2 template.
+
+    Returns:
+        Template: The compiled template.
+    """
+    return engines["jinja"].from_string(template)
+
+
+def _get_relation(model, attrs):
+    """Return the lookup of the relations an `obj` attribute chain follows, and whether it ends with a to-many relation.
+
+    The chain stops at the first attribute which is not a relation of the model, e.g. a property or a regular field.
+    """
+    lookup = []
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)  # pylint: disable=protected-access
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        lookup.append(attr)
+        if field.many_to_many or field.one_to_many:
+            return "__".join(lookup), True
+        model = field.related_model
+    return "__".join(lookup), False
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def get_template_relations(template):
+    """Return the Device relations a template renders, e.g. `site__region__parent` for `{{ obj.site.region.parent.slug }}`.
+
+    Args:
+        template (str): A Jinja2 template rendered with the Device as `obj`.
+
+    Returns:
+        tuple: The lookups to give to `select_related`, and the lookups to give to `prefetch_related`.
+    """
+    try:
+        ast = engines["jinja"].env.parse(template)
+    except jinja_errors.TemplateSyntaxError:
+        # The error is reported for each device by `render_jinja_template`.
+        return (), ()
+
+    select_related, prefetch_related = set(), set()
+    for node in ast.find_all(jinja_nodes.Getattr):
+        attrs = []
+        while isinstance(node, jinja_nodes.Getattr):
+            attrs.insert(0, node.attr)
+            node = node.node
+        if not isinstance(node, jinja_nodes.Name) or node.name != "obj":
+            continue
+        lookup, to_many = _get_relation(Device, attrs)
+        if lookup:
+            (prefetch_related if to_many else select_related).add(lookup)
+    return tuple(sorted(select_related)), tuple(sorted(prefetch_related))
+
+
+def get_job_queryset(queryset, templates):
+    """Preload the relations the templates of a play render, so each device renders them without further queries.
+
+    Args:
+        queryset (QuerySet): The Device queryset of the job, as returned by `get_job_filter`.
+        templates (list): The path and matching rule templates the play renders for each device, may hold empty ones.
+
+    Returns:
+        QuerySet: The Device queryset, with the `platform` used by every play and the relations of the templates.
+    """
+    select_related, prefetch_related = {"platform"}, set()
+    for template in templates:
+        if template:
+            template_select_related, template_prefetch_related = get_template_relations(template)
+            select_related.update(template_select_related)
+            prefetch_related.update(template_prefetch_related)
+    return queryset.select_related(*sorted(select_related)).prefetch_related(*sorted(prefetch_related))
+
+
 def render_jinja_template(obj, logger, template):
     """
     Helper function to render Jinja templates.
@@ -83,7 +187,8 @@ def render_jinja_template(obj, logger, template):
         NornirNautobotException: When there is an error rendering the ``template``.
     """
     try:
-        return render_jinja2(template_code=template, context={"obj": obj})
+        # The rendered text is marked safe by django-jinja, `str` is used the same as nautobot `render_jinja2`.
+        return str(get_jinja_template(template).render(context={"obj": obj}))
     except jinja_errors.UndefinedError as error:
         error_msg = (
             "Jinja encountered and UndefinedError`, check the template for missing variable definitions.\n"
@@ -130,11 +235,30 @@ def clean_config_settings(repo_type: str, repo_count: int, match_rule: str):
         )
 
 
+def get_repository_routes(repo_type: str, global_settings: models.GoldenConfigSetting) -> dict:
+    """Return the routing table of a repository type, the repository slug to its local filesystem working directory.
+
+    The table is built with a single query, the plays build it once per job run and pass it along to route every device
+    of the job in memory.
+
+    Args:
+        repo_type (str): Either `intended` or `backup` repository
+        global_settings (models.GoldenConfigSetting): Golden Config global settings.
+
+    Returns:
+        dict: The working directory per repository slug, in the order of the repositories.
+    """
+    # Ordered by name, as the repositories are when the first one is looked up without a matching rule.
+    repositories = getattr(global_settings, f"{repo_type}_repository").order_by("name")
+    return {repo.slug: repo.filesystem_path for repo in repositories}
+
+
 def get_repository_working_dir(
     repo_type: str,
     obj: Device,
     logger: NornirLogger,
     global_settings: models.GoldenConfigSetting,
+    routes: dict = None,
 ) -> str:
     """Match the Device to a repository working directory, based on the repository matching rule.
 
@@ -145,19 +269,25 @@ def get_repository_working_dir(
         obj (Device): Django ORM Device object.
         logger (NornirLogger): Logger object
         global_settings (models.GoldenConfigSetting): Golden Config global settings.
+        routes (dict): The routing table of the repository type, as returned by `get_repository_routes`, when None it
+            is looked up for this device.
 
     Returns:
         str: The local filesystem working directory corresponding to the repo slug.
     """
     match_rule = getattr(global_settings, f"{repo_type}_match_rule")
+    if routes is None:
+        routes = get_repository_routes(repo_type, global_settings)
 
     if not match_rule:
+        if routes:
+            return next(iter(routes.values()))
+        # There is no repository configured, the lookup of the first one fails.
         return getattr(global_settings, f"{repo_type}_repository").first().filesystem_path
 
     desired_repository_slug = render_jinja_template(obj, logger, match_rule)
-    matching_repo = getattr(global_settings, f"{repo_type}_repository").filter(slug=desired_repository_slug)
-    if len(matching_repo) == 1:
-        return f"{settings.GIT_ROOT}/{matching_repo[0].slug}"
+    if desired_repository_slug in routes:
+        return routes[desired_repository_slug]
     logger.log_failure(
         obj,
         f"There is no repository slug matching '{desired_repository_slug}' for device. Verify the matching rule and configured Git repositories.",
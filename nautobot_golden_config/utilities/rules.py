@@ -0,0 +1,64 @@
+"""Index of the compliance rules per platform, built once and shared by the compliance jobs of a worker."""
+
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from nautobot_golden_config.models import ComplianceRule
+
+# The version is kept in the Django cache, so the rules saved by any process invalidate the index of every worker.
+RULE_INDEX_VERSION_KEY = "nautobot_golden_config.rule_index.version"
+
+_RULE_INDEX = None
+_RULE_INDEX_LOCK = threading.Lock()
+
+
+class RuleIndex:  # pylint: disable=too-few-public-methods
+    """The compliance rules, with their platform and feature, per primary key and per platform slug.
+
+    The rules of a platform are the ones the compliance job runs, the rules with a config to match. The other rules,
+    e.g. JSON and custom rules without any, are only indexed by primary key, as their results are posted through the API.
+    """
+
+    def __init__(self, version, rule_objs):
+        """Index the rules, in the format used by the compliance job.
+
+        Args:
+            version (str): The version of the rules the index was built from.
+            rule_objs (iterable): The `ComplianceRule` objects.
+        """
+        self.version = version
+        self.platforms = {}
+        self.rules = {}
+        for obj in rule_objs:
+            rule = {"ordered": obj.config_ordered, "obj": obj, "section": (obj.match_config or "").splitlines()}
+            self.rules[obj.pk] = rule
+            # The rules without a config to match, e.g. JSON rules, have their results posted through the API.
+            if obj.match_config:
+                self.platforms.setdefault(str(obj.platform.slug), []).append(rule)
+
+
+def get_rule_index():
+    """Return the index of the compliance rules, rebuilt with a single query when the rules changed since it was built.
+
+    Returns:
+        RuleIndex: The index of the current rules, the rules and their lists are shared and must not be modified.
+    """
+    global _RULE_INDEX  # pylint: disable=global-statement
+    version = cache.get_or_set(RULE_INDEX_VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+    with _RULE_INDEX_LOCK:
+        if _RULE_INDEX is None or _RULE_INDEX.version != version:
+            _RULE_INDEX = RuleIndex(version, ComplianceRule.objects.select_related("platform", "feature"))
+        return _RULE_INDEX
+
+
+def invalidate_rule_index():
+    """Change the version of the rules, so every process rebuilds its index on the next use.
+
+    Rules changed with `QuerySet.update` do not send any signal, this has to be called after such changes.
+    """
+    global _RULE_INDEX  # pylint: disable=global-statement
+    cache.set(RULE_INDEX_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    with _RULE_INDEX_LOCK:
+        _RULE_INDEX = None
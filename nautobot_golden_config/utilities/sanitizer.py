@@ -0,0 +1,197 @@
+"""Compile the `ConfigRemove` and `ConfigReplace` rules of each platform once per job."""
+
+import re
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+NEWLINE = ord("\n")
+# The categories of a character set which include the line break.
+NEWLINE_CATEGORIES = {
+    sre_constants.CATEGORY_SPACE,
+    sre_constants.CATEGORY_NOT_DIGIT,
+    sre_constants.CATEGORY_NOT_WORD,
+    sre_constants.CATEGORY_LINEBREAK,
+}
+# The anchors which only depend on the line the match is in.
+LINE_ANCHORS = {
+    sre_constants.AT_BEGINNING,
+    sre_constants.AT_END,
+    sre_constants.AT_BOUNDARY,
+    sre_constants.AT_NON_BOUNDARY,
+}
+
+
+def _set_has_newline(items):
+    """Return whether a character set, e.g. `[^!]`, includes the line break."""
+    negate, found = False, False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            found = found or av == NEWLINE
+        elif op is sre_constants.RANGE:
+            found = found or av[0] <= NEWLINE <= av[1]
+        elif op is sre_constants.CATEGORY:
+            found = found or av in NEWLINE_CATEGORIES
+        else:
+            return True
+    return found != negate
+
+
+def _may_span_lines(items, dotall):
+    """Return whether a parsed pattern may match a line break, or depend on anything outside of the matched line."""
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            unsafe = av == NEWLINE
+        elif op is sre_constants.NOT_LITERAL:
+            unsafe = av != NEWLINE
+        elif op is sre_constants.ANY:
+            unsafe = dotall
+        elif op is sre_constants.IN:
+            unsafe = _set_has_newline(av)
+        elif op is sre_constants.AT:
+            unsafe = av not in LINE_ANCHORS
+        elif op is sre_constants.BRANCH:
+            unsafe = any(_may_span_lines(branch, dotall) for branch in av[1])
+        elif op is sre_constants.SUBPATTERN:
+            unsafe = _may_span_lines(av[-1], dotall or bool(av[1] & re.DOTALL))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            unsafe = _may_span_lines(av[2], dotall)
+        else:
+            # Lookarounds and group references depend on the text around the match, so they are never merged.
+            unsafe = True
+        if unsafe:
+            return True
+    return False
+
+
+def _is_mergeable(regex):
+    """Return whether a removal pattern can be merged with others, without changing what it removes.
+
+    Only the patterns removing exactly one whole line are merged: anchored to the start of a line, ending with the line
+    break, and not able to match a line break, or look at other lines, in between. Removing a line does not change the
+    other lines, so a single pass with the alternation of those patterns removes the same lines as one pass per pattern.
+    Patterns with inline global flags, e.g. `(?i)`, are not merged, the flags must start the whole expression.
+    """
+    try:
+        flags = re.compile(regex).flags
+        items = list(sre_parse.parse(regex, flags))
+    except (re.error, TypeError):
+        return False
+    if flags & ~re.UNICODE:
+        return False
+    return (
+        len(items) > 2
+        and items[0] == (sre_constants.AT, sre_constants.AT_BEGINNING)
+        and items[-1] == (sre_constants.LITERAL, NEWLINE)
+        and not _may_span_lines(items[1:-1], False)
+    )
+
+
+def merge_remove_lines(remove_lines):
+    """Merge the consecutive whole line removal patterns into a single alternation, keeping the order of the others.
+
+    The patterns which can not be compiled as one, e.g. defining the same group name, are kept apart.
+
+    Args:
+        remove_lines (list): The removal patterns, e.g. `[{"regex": r"^Building\\s+configuration.*\\n"}]`.
+
+    Returns:
+        list: The removal patterns, in the format of netutils `clean_config`.
+    """
+    merged, chunk = [], []
+    for item in remove_lines + [None]:
+        if item and _is_mergeable(item["regex"]):
+            chunk.append(item["regex"])
+            continue
+        if len(chunk) == 1:
+            merged.append({"regex": chunk[0]})
+        elif chunk:
+            regex = "|".join(f"(?:{regex})" for regex in chunk)
+            try:
+                re.compile(regex, re.MULTILINE)
+                merged.append({"regex": regex})
+            except re.error:
+                merged.extend({"regex": regex} for regex in chunk)
+        chunk = []
+        if item:
+            merged.append(item)
+    return merged
+
+
+class PlatformSanitizer:
+    """The removal and replacement rules of a platform, compiled once, and applied the same as netutils does."""
+
+    def __init__(self, remove_lines=None, substitute_lines=None):
+        """Merge and compile the rules.
+
+        A pattern failing to compile does not raise, it is reported by `error`, for the devices of the platform only.
+
+        Args:
+            remove_lines (list): The removal patterns, in the format of netutils `clean_config`.
+            substitute_lines (list): The replacement patterns, in the format of netutils `sanitize_config`.
+        """
+        self.remove_lines = merge_remove_lines(remove_lines or [])
+        self.substitute_lines = list(substitute_lines or [])
+        self.error = None
+        try:
+            self._remove = [self._compile(item["regex"], "ConfigRemove") for item in self.remove_lines]
+            self._replace = [
+                (self._compile(item["regex"], "ConfigReplace"), item["replace"]) for item in self.substitute_lines
+            ]
+        except ValueError as error:
+            self.error = str(error)
+            self._remove, self._replace = [], []
+
+    @staticmethod
+    def _compile(regex, model_name):
+        """Compile a pattern, raising a `ValueError` which names the pattern when it is invalid."""
+        try:
+            return re.compile(regex, re.MULTILINE)
+        except re.error as error:
+            raise ValueError(f"The `{model_name}` regex `{regex}` is invalid: {error}") from error
+
+    def sanitize(self, config):
+        """Remove, then replace, the lines of a configuration, the same as netutils `clean_config` and `sanitize_config`.
+
+        Args:
+            config (str): The configuration of a device.
+
+        Returns:
+            str: The sanitized configuration.
+
+        Raises:
+            ValueError: When a pattern of the platform is invalid.
+        """
+        if self.error:
+            raise ValueError(self.error)
+        for pattern in self._remove:
+            config = pattern.sub("", config)
+        for pattern, replace in self._replace:
+            config = pattern.sub(replace, config)
+        return config
+
+
+def get_sanitizers(config_removes, config_replaces):
+    """Build the sanitizer of each platform from the `ConfigRemove` and `ConfigReplace` objects.
+
+    Args:
+        config_removes (QuerySet): The `ConfigRemove` objects, ordered as they are applied.
+        config_replaces (QuerySet): The `ConfigReplace` objects, ordered as they are applied.
+
+    Returns:
+        dict: The `PlatformSanitizer` per platform slug.
+    """
+    remove_lines, substitute_lines = {}, {}
+    for regex in config_removes.select_related("platform"):
+        remove_lines.setdefault(regex.platform.slug, []).append({"regex": regex.regex})
+    for regex in config_replaces.select_related("platform"):
+        substitute_lines.setdefault(regex.platform.slug, []).append({"replace": regex.replace, "regex": regex.regex})
+    return {
+        platform: PlatformSanitizer(remove_lines.get(platform), substitute_lines.get(platform))
+        for platform in set(remove_lines) | set(substitute_lines)
+    }
@@ -1,4 +1,5 @@
 """Utility functions."""
+import hashlib
 
 from nautobot_golden_config.utilities.constant import PLUGIN_CFG
 
@@ -8,3 +9,13 @@ def get_platform(platform):
     if not PLUGIN_CFG.get("platform_slug_map"):
         return platform
     return PLUGIN_CFG.get("platform_slug_map").get(platform, platform)
+
+
+def get_hash(*values):
+    """Utility method to return a sha256 fingerprint of the provided strings."""
+    content_hash = hashlib.sha256()
+    for value in values:
+        content_hash.update(str(value).encode("utf-8"))
+        # Separate the values, so ("ab", "c") and ("a", "bc") are not the same fingerprint.
+        content_hash.update(b"\0")
+    return content_hash.hexdigest()
@@ -12,10 +12,9 @@ import nautobot
 import numpy as np
 import yaml
 from django.contrib import messages
-from django.db.models import Count, ExpressionWrapper, F, FloatField, Max, ProtectedError, Q
+from django.db.models import ProtectedError
 from django.forms import ModelMultipleChoiceField, MultipleHiddenInput
 from django.shortcuts import redirect, render
-from django_pivot.pivot import pivot
 from nautobot.core.views import generic
 from nautobot.dcim.filters import DeviceFilterSet
 from nautobot.dcim.forms import DeviceFilterForm
@@ -28,13 +27,21 @@ from nautobot.utilities.views import ContentTypePermissionRequiredMixin
 from packaging.version import Version
 
 from nautobot_golden_config import filters, forms, models, tables
+from nautobot_golden_config.utilities.charts import (
+    CHART_MIME_TYPES,
+    GREEN,
+    RED,
+    get_cached_charts,
+    svg_bar_chart,
+    svg_pie_chart,
+)
+from nautobot_golden_config.utilities.compliance_matrix import get_compliance_matrix
+from nautobot_golden_config.utilities.compliance_summary import get_compliance_report
 from nautobot_golden_config.utilities.constant import CONFIG_FEATURES, ENABLE_COMPLIANCE, PLUGIN_CFG
 from nautobot_golden_config.utilities.graphql import graph_ql_query
 
 LOGGER = logging.getLogger(__name__)
 
-GREEN = "#D5E8D4"
-RED = "#F8CECC"
 NAUTOBOT_VERSION = Version(nautobot.__version__)
 
 #
@@ -185,13 +192,8 @@ class ConfigComplianceListView(generic.ObjectListView):
 
     def alter_queryset(self, request):
         """Build actual runtime queryset as the build time queryset provides no information."""
-        return pivot(
-            self.queryset,
-            ["device", "device__name"],
-            "rule__feature__name",
-            "compliance_int",
-            aggregation=Max,
-        )
+        # The filtered queryset is pivoted from the compliance matrix, the same as `django_pivot` on `compliance_int`.
+        return get_compliance_matrix(self.queryset).pivot()
 
     def extra_context(self):
         """Boilerplate code to modify before returning data."""
@@ -324,7 +326,9 @@ class ConfigComplianceDeviceView(ContentTypePermissionRequiredMixin, generic.Vie
     def get(self, request, pk):  # pylint: disable=invalid-name
         """Read request into a view of a single device."""
         device = Device.objects.get(pk=pk)
-        compliance_details = models.ConfigCompliance.objects.filter(device=device)
+        compliance_details = models.ConfigCompliance.objects.filter(device=device).select_related(
+            "actual_blob", "intended_blob"
+        )
 
         config_details = {"compliance_details": compliance_details, "device": device}
 
@@ -345,7 +349,9 @@ class ComplianceDeviceFilteredReport(ContentTypePermissionRequiredMixin, generic
     def get(self, request, pk, compliance):  # pylint: disable=invalid-name
         """Read request into a view of a single device."""
         device = Device.objects.get(pk=pk)
-        compliance_details = models.ConfigCompliance.objects.filter(device=device)
+        compliance_details = models.ConfigCompliance.objects.filter(device=device).select_related(
+            "actual_blob", "intended_blob"
+        )
 
         if compliance == "compliant":
             compliance_details = compliance_details.filter(compliance=True)
@@ -423,7 +429,9 @@ class ConfigComplianceDetails(ContentTypePermissionRequiredMixin, generic.View):
                 # a given device and merges them, sorts them, and diffs them.
                 diff_type = "JSON"
                 # Get all compliance objects for a device.
-                compliance_objects = models.ConfigCompliance.objects.filter(device=device.id)
+                compliance_objects = models.ConfigCompliance.objects.filter(device=device.id).select_related(
+                    "rule__feature", "actual_blob", "intended_blob"
+                )
                 actual = {}
                 intended = {}
                 # Set a starting time that will be older than all last updated objects in compliance objects.
@@ -517,6 +525,7 @@ class ConfigComplianceOverviewOverviewHelper(ContentTypePermissionRequiredMixin,
             # convert graph into string buffer and then we convert 64 bit code into image
             buf = io.BytesIO()
             fig.savefig(buf, format="png")
+            plt.close(fig)
             buf.seek(0)
             string = base64.b64encode(buf.read())
             plt_visual = urllib.parse.quote(string)
@@ -571,11 +580,46 @@ class ConfigComplianceOverviewOverviewHelper(ContentTypePermissionRequiredMixin,
         # convert graph into dtring buffer and then we convert 64 bit code into image
         buf = io.BytesIO()
         fig.savefig(buf, format="png")
+        plt.close(fig)
         buf.seek(0)
         string = base64.b64encode(buf.read())
         bar_chart = urllib.parse.quote(string)
         return bar_chart
 
+    @staticmethod
+    def get_charts(features, device_aggr, feature_aggr):
+        """Return the overview charts in the format of the `chart_format` setting, rendered once per distinct report.
+
+        Args:
+            features (list): The aggregation per feature.
+            device_aggr (dict): The device global report.
+            feature_aggr (dict): The feature global report.
+
+        Returns:
+            dict: The encoded `bar_chart`, `device_visual` and `feature_visual`, and their `chart_mime_type`.
+        """
+        chart_format = PLUGIN_CFG["chart_format"]
+        sizes = [PLUGIN_CFG["per_feature_bar_width"], PLUGIN_CFG["per_feature_width"], PLUGIN_CFG["per_feature_height"]]
+        features = [
+            {key: item[key] for key in ("rule__feature__slug", "compliant", "non_compliant")} for item in features
+        ]
+
+        def render():
+            if chart_format == "svg":
+                return {
+                    "bar_chart": svg_bar_chart(features, *sizes),
+                    "device_visual": svg_pie_chart(device_aggr),
+                    "feature_visual": svg_pie_chart(feature_aggr),
+                }
+            return {
+                "bar_chart": ConfigComplianceOverviewOverviewHelper.plot_barchart_visual(features),
+                "device_visual": ConfigComplianceOverviewOverviewHelper.plot_visual(device_aggr),
+                "feature_visual": ConfigComplianceOverviewOverviewHelper.plot_visual(feature_aggr),
+            }
+
+        charts = get_cached_charts([chart_format, sizes, features, device_aggr, feature_aggr], render)
+        return {**charts, "chart_mime_type": CHART_MIME_TYPES[chart_format]}
+
     @staticmethod
     def calculate_aggr_percentage(aggr):
         """Calculate percentage of compliance given aggregation fields.
@@ -601,16 +645,7 @@ class ConfigComplianceOverview(generic.ObjectListView):
     table = tables.ConfigComplianceGlobalFeatureTable
     template_name = "nautobot_golden_config/compliance_overview_report.html"
     kind = "Features"
-    queryset = (
-        models.ConfigCompliance.objects.values("rule__feature__slug")
-        .annotate(
-            count=Count("rule__feature__slug"),
-            compliant=Count("rule__feature__slug", filter=Q(compliance=True)),
-            non_compliant=Count("rule__feature__slug", filter=~Q(compliance=True)),
-            comp_percent=ExpressionWrapper(100 * F("compliant") / F("count"), output_field=FloatField()),
-        )
-        .order_by("-comp_percent")
-    )
+    queryset = models.ConfigCompliance.objects.all()
 
     # extra content dict to be returned by self.extra_context() method
     extra_content = {}
@@ -619,14 +654,18 @@ class ConfigComplianceOverview(generic.ObjectListView):
         """Using request object to perform filtering based on query params."""
         super().setup(request, *args, **kwargs)
         device_aggr, feature_aggr = self.get_global_aggr(request)
-        feature_qs = self.filterset(request.GET, self.queryset).qs
         self.extra_content = {
-            "bar_chart": ConfigComplianceOverviewOverviewHelper.plot_barchart_visual(feature_qs),
             "device_aggr": device_aggr,
-            "device_visual": ConfigComplianceOverviewOverviewHelper.plot_visual(device_aggr),
             "feature_aggr": feature_aggr,
-            "feature_visual": ConfigComplianceOverviewOverviewHelper.plot_visual(feature_aggr),
         }
+        if "export" not in request.GET:
+            # The CSV export only reports the aggregations, the charts are not drawn for it.
+            report = get_compliance_report(self.filterset(request.GET, self.queryset).qs)
+            self.extra_content.update(
+                ConfigComplianceOverviewOverviewHelper.get_charts(
+                    report.feature_aggregates(), device_aggr, feature_aggr
+                )
+            )
 
     def get_global_aggr(self, request):
         """Get device and feature global reports.
@@ -635,25 +674,23 @@ class ConfigComplianceOverview(generic.ObjectListView):
             device_aggr: device global report dict
             feature_aggr: feature global report dict
         """
-        main_qs = models.ConfigCompliance.objects
+        main_qs = models.ConfigCompliance.objects.all()
 
         device_aggr, feature_aggr = {}, {}
         if self.filterset is not None:
-            device_aggr = (
-                self.filterset(request.GET, main_qs)
-                .qs.values("device")
-                .annotate(compliant=Count("device", filter=Q(compliance=False)))
-                .aggregate(total=Count("device", distinct=True), compliants=Count("compliant", filter=Q(compliant=0)))
-            )
-            feature_aggr = self.filterset(request.GET, main_qs).qs.aggregate(
-                total=Count("rule"), compliants=Count("rule", filter=Q(compliance=True))
-            )
+            report = get_compliance_report(self.filterset(request.GET, main_qs).qs)
+            device_aggr = report.device_aggregate()
+            feature_aggr = report.feature_aggregate()
 
         return (
             ConfigComplianceOverviewOverviewHelper.calculate_aggr_percentage(device_aggr),
             ConfigComplianceOverviewOverviewHelper.calculate_aggr_percentage(feature_aggr),
         )
 
+    def alter_queryset(self, request):
+        """Aggregate the filtered queryset per feature, from the compliance summaries or matrix."""
+        return get_compliance_report(self.queryset).feature_aggregates()
+
     def extra_context(self):
         """Extra content method on."""
         # add global aggregations to extra context.
@@ -685,11 +722,11 @@ class ConfigComplianceOverview(generic.ObjectListView):
         )
         csv_data.append(",".join([]))
 
-        qs = self.queryset.values("rule__feature__name", "count", "compliant", "non_compliant", "comp_percent")
-        csv_data.append(",".join(["Total" if item == "count" else item.capitalize() for item in qs[0].keys()]))
-        for obj in qs:
+        keys = ["rule__feature__name", "count", "compliant", "non_compliant", "comp_percent"]
+        csv_data.append(",".join(["Total" if item == "count" else item.capitalize() for item in keys]))
+        for obj in get_compliance_report(self.queryset).feature_aggregates():
             csv_data.append(
-                ",".join([f"{str(val)} %" if key == "comp_percent" else str(val) for key, val in obj.items()])
+                ",".join([f"{str(obj[key])} %" if key == "comp_percent" else str(obj[key]) for key in keys])
             )
 
         return "\n".join(csv_data)